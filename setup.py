@@ -4,12 +4,16 @@ from setuptools import find_packages
 
 entry_points = {
     'console_scripts': [
-        'nti_scorm_cloud_account_summary = nti.scorm_cloud.utils.account_summary:main'
+        'nti_scorm_cloud_account_summary = nti.scorm_cloud.utils.account_summary:main',
+        'nti_scorm_cloud_standin = nti.scorm_cloud.utils.standin:main',
+        'nti_scorm_cloud_loadtest = nti.scorm_cloud.utils.loadtest:main',
+        'nti_scorm_cloud_benchmarks = nti.scorm_cloud.utils.benchmarks:main',
     ],
 }
 
 TESTS_REQUIRE = [
     'fudge',
+    'msgpack',
     'nti.testing',
     'zope.testrunner',
 ]
@@ -54,12 +58,15 @@ setup(
     namespace_packages=['nti'],
     tests_require=TESTS_REQUIRE,
     install_requires=[
+        'futures; python_version == "2.7"',
         'python-dateutil',
         'nti.common',
         'setuptools',
         'six',
         'requests',
         'zope.component',
+        'zope.deferredimport',
+        'zope.event',
         'zope.interface',
         'zope.schema',
         'zope.security',
@@ -74,6 +81,15 @@ setup(
         ],
         'prometheus': [
             'prometheus_client'
+        ],
+        'msgpack': [
+            'msgpack'
+        ],
+        'parquet': [
+            'pyarrow'
+        ],
+        'lxml': [
+            'lxml'
         ]
     },
     entry_points=entry_points,
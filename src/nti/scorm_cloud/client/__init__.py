@@ -12,34 +12,11 @@ import datetime
 
 from six.moves import urllib_parse
 
-try:
-    from urllib2 import urlopen
-except ImportError:  # pragma: no cover
-    from urllib.request import urlopen
-    
 from zope import interface
 
-from nti.scorm_cloud.client.config import Configuration
-
-from nti.scorm_cloud.client.course import CourseService
-from nti.scorm_cloud.client.course import UploadService
-
-from nti.scorm_cloud.client.debug import DebugService
-
-from nti.scorm_cloud.client.invitation import InvitationService
-
-from nti.scorm_cloud.client.registration import RegistrationService
+import zope.deferredimport
 
-from nti.scorm_cloud.client.reporting import ReportingService
-
-from nti.scorm_cloud.client.request import make_utf8
-from nti.scorm_cloud.client.request import ServiceRequest
-from nti.scorm_cloud.client.request import ScormCloudError
-from nti.scorm_cloud.client.request import ScormCloudUtilities
-
-from nti.scorm_cloud.client.scorm import ScormCloudService
-
-from nti.scorm_cloud.client.tag import TagService
+from nti.scorm_cloud.client.config import Configuration
 
 from nti.scorm_cloud.interfaces import ITagSettings
 from nti.scorm_cloud.interfaces import IDebugService
@@ -52,6 +29,32 @@ from nti.scorm_cloud.interfaces import IRegistrationService
 
 logger = __import__('logging').getLogger(__name__)
 
+# The services (and the v2 SDK they use) are only imported when first
+# accessed, so importing this package stays cheap
+zope.deferredimport.initialize()
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.course',
+                               'CourseService',
+                               'UploadService')
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.debug',
+                               'DebugService')
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.invitation',
+                               'InvitationService')
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.registration',
+                               'RegistrationService')
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.reporting',
+                               'ReportingService')
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.request',
+                               'make_utf8',
+                               'ServiceRequest',
+                               'ScormCloudError',
+                               'ScormCloudUtilities')
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.scorm',
+                               'ScormCloudService')
+zope.deferredimport.defineFrom('nti.scorm_cloud.client.tag',
+                               'TagService')
+zope.deferredimport.defineFrom('six.moves.urllib.request',
+                               'urlopen')
+
 
 @interface.implementer(IDateRangeSettings)
 class DateRangeSettings(object):
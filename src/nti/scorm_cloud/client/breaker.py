@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Circuit breakers shedding the SCORM Cloud calls while it is degraded.
+
+Calls are grouped in families, by default the service area of their
+method (``registration`` for ``rustici.registration.getRegistrationResult``,
+``course`` for ``rustici.course.getCourseDetail``) plus ``launch`` for the
+launch links. Once ``failure_threshold`` calls of a family fail in a row
+its circuit opens, and its calls fail at once with
+:class:`.CircuitOpenError`, or are served from the response cache, even
+if expired, when they can be. After ``reset_timeout`` seconds the next
+call first probes the SCORM Cloud (with :meth:`.DebugService.ping` for
+the circuits of :meth:`.ScormCloudService.start_circuit_breakers`), and
+the circuit closes again if the probe succeeds.
+
+A failure is a call that times out, cannot connect, or gets an HTTP
+error; the errors the SCORM Cloud answers with (a
+:class:`.ScormCloudError` with a code) and the calls out of time before
+being sent do not count.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import time
+import threading
+
+from nti.scorm_cloud.client.request import ScormCloudError
+from nti.scorm_cloud.client.request import CircuitOpenError
+
+logger = __import__('logging').getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+#: The families whose calls are never shed, so that probes get through
+UNGUARDED = frozenset(('debug',))
+
+
+def method_family(method):
+    """
+    Return the default family of the web service ``method``, its service
+    area.
+    """
+    parts = method.split('.')
+    return parts[1] if len(parts) > 2 else method
+
+
+def is_failure(exc):
+    """
+    Return whether the exception ``exc`` raised by a call counts as a
+    failure of the SCORM Cloud.
+    """
+    if not isinstance(exc, Exception) or isinstance(exc, CircuitOpenError):
+        return False
+    if not getattr(exc, 'sent', True):  # out of time before being sent
+        return False
+    if isinstance(exc, ScormCloudError):
+        return exc.code is None
+    status = getattr(exc, 'status', None)  # the errors of the v2 API
+    return not (isinstance(status, int) and 400 <= status < 500)
+
+
+class CircuitBreaker(object):
+    """
+    The circuit of one family of calls, a context manager to make its
+    calls in.
+
+    :param probe: (optional) a callable returning whether the SCORM Cloud
+        is back; without one, the first call after ``reset_timeout`` is
+        the probe
+    """
+
+    def __init__(self, family, failure_threshold=5, reset_timeout=30, probe=None):
+        self.probe = probe
+        self.family = family
+        self.state = CLOSED
+        self.opened = None
+        self.reset_timeout = reset_timeout
+        self.failure_threshold = failure_threshold
+        self.consecutive_failures = 0
+        self.counts = dict.fromkeys(('calls', 'successes', 'failures',
+                                     'rejections', 'opens', 'probes'), 0)
+        self._lock = threading.Lock()
+
+    def retry_after(self):
+        """
+        Return the number of seconds before the circuit is probed, zero
+        unless it is open.
+        """
+        if self.state != OPEN:
+            return 0
+        return max(0, self.opened + self.reset_timeout - time.time())
+
+    def _reject(self):
+        self.counts['rejections'] += 1
+        retry_after = self.retry_after()
+        raise CircuitOpenError('SCORM Cloud Error: the circuit of %s calls is open'
+                               % self.family, retry_after=retry_after)
+
+    def _open(self):
+        self.state = OPEN
+        self.opened = time.time()
+        self.counts['opens'] += 1
+        logger.warning('Opened the circuit of %s calls after %s failure(s)',
+                       self.family, self.consecutive_failures)
+
+    def _close(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        logger.info('Closed the circuit of %s calls', self.family)
+
+    def before(self):
+        """
+        Let a call through, probing the SCORM Cloud first if it is time.
+
+        :raises CircuitOpenError: if the circuit is open
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                self.counts['calls'] += 1
+                return
+            if self.state == HALF_OPEN or self.retry_after() > 0:
+                self._reject()
+            # this call probes, the others are rejected meanwhile
+            self.state = HALF_OPEN
+            self.counts['probes'] += 1
+            if self.probe is None:
+                self.counts['calls'] += 1
+                return
+        try:
+            healthy = self.probe()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Cannot probe the SCORM Cloud')
+            healthy = False
+        with self._lock:
+            if not healthy:
+                self._open()
+                self._reject()
+            self._close()
+            self.counts['calls'] += 1
+
+    def after(self, exc=None):
+        """
+        Record the outcome of a call, ``exc`` being the exception it
+        raised, if any.
+        """
+        with self._lock:
+            if exc is not None and is_failure(exc):
+                self.counts['failures'] += 1
+                self.consecutive_failures += 1
+                if     self.state == HALF_OPEN \
+                    or (self.state == CLOSED
+                        and self.consecutive_failures >= self.failure_threshold):
+                    self._open()
+            else:
+                self.counts['successes'] += 1
+                self.consecutive_failures = 0
+                if self.state == HALF_OPEN:
+                    self._close()
+
+    def metrics(self):
+        """
+        Return a dictionary of the state and the counters of the circuit.
+        """
+        with self._lock:
+            result = dict(self.counts)
+            result.update(family=self.family,
+                          state=self.state,
+                          retry_after=self.retry_after(),
+                          consecutive_failures=self.consecutive_failures)
+        return result
+
+    def __enter__(self):
+        self.before()
+        return self
+
+    def __exit__(self, unused_type, exc, unused_tb):
+        self.after(exc)
+
+    def __repr__(self):
+        return "<%s %s %s>" % (type(self).__name__, self.family, self.state)
+
+
+class CircuitBreakers(object):
+    """
+    The circuit breakers of the families of calls of a service.
+
+    :param thresholds: (optional) a mapping of family names to their own
+        failure thresholds
+    :param families: (optional) a mapping of method names to the family
+        they belong to, overriding their service area
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, probe=None,
+                 thresholds=None, families=None):
+        self.probe = probe
+        self.reset_timeout = reset_timeout
+        self.failure_threshold = failure_threshold
+        self.families = dict(families or {})
+        self.thresholds = dict(thresholds or {})
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def family(self, method):
+        """
+        Return the family of the web service ``method``.
+        """
+        return self.families.get(method) or method_family(method)
+
+    def breaker(self, family):
+        """
+        Return the :class:`CircuitBreaker` of ``family``.
+        """
+        with self._lock:
+            result = self._breakers.get(family)
+            if result is None:
+                threshold = self.thresholds.get(family, self.failure_threshold)
+                result = self._breakers[family] = \
+                    CircuitBreaker(family, threshold, self.reset_timeout, self.probe)
+            return result
+
+    def guard(self, method):
+        """
+        Return the :class:`CircuitBreaker` to make a call of ``method`` in,
+        or None if such calls are never shed.
+        """
+        family = self.family(method)
+        return self.breaker(family) if family not in UNGUARDED else None
+
+    def metrics(self):
+        """
+        Return the metrics of every circuit, by family.
+        """
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.family: b.metrics() for b in breakers}
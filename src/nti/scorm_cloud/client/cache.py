@@ -0,0 +1,450 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Caching of raw SCORM Cloud responses.
+
+Responses are stored compressed, together with an index of the byte
+offsets of well-known elements (registrations, courses, ...), so that a
+cache hit can materialize a single element out of a large list without
+parsing the whole document again.
+
+Assign a cache to :attr:`.ScormCloudService.response_cache` to enable
+caching of read-only methods in :meth:`.ServiceRequest.call_service`.
+Expired responses are kept until replaced or evicted (for
+:class:`MappedFileResponseCache`, at most ``max_stale`` seconds), and
+served when the circuit of their method is open (see :mod:`.breaker`).
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import os
+import json
+import mmap
+import time
+import zlib
+import struct
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from xml.dom import minidom
+from xml.parsers import expat
+
+from zope import interface
+
+from nti.scorm_cloud.compat import bytes_
+from nti.scorm_cloud.compat import native_
+
+from nti.scorm_cloud.interfaces import IResponseCache
+
+from nti.scorm_cloud.parsers import get_parser
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The read-only methods whose responses are cached by default
+CACHEABLE_METHODS = frozenset((
+    'rustici.course.getAttributes',
+    'rustici.course.getCourseDetail',
+    'rustici.course.getCourseList',
+    'rustici.course.getMetadata',
+    'rustici.invitation.getInvitationInfo',
+    'rustici.invitation.getInvitationList',
+    'rustici.registration.getLaunchHistory',
+    'rustici.registration.getLaunchInfo',
+    'rustici.registration.getRegistrationDetail',
+    'rustici.registration.getRegistrationList',
+    'rustici.registration.getRegistrationResult',
+    'rustici.reporting.getAccountInfo',
+    'rustici.tagging.getCourseTags',
+))
+
+#: The elements whose offsets are indexed, keyed by their ``id`` attribute
+#: (or position when there is none)
+INDEXED_TAGS = ('registration', 'course', 'invitationInfo', 'userInvitation',
+                'launch', 'registrationreport')
+
+#: Request parameters that change on every call and are not part of a key
+VOLATILE_PARAMETERS = frozenset(('appid', 'origin', 'ts', 'applib', 'sig'))
+
+_MAGIC = b'NSCR'
+_VERSION = 1
+_HEADER = struct.Struct('!4sBdI')
+
+
+def cache_key(method, parameters, appid=None, serviceurl=None):
+    """
+    Return the cache key for a call of ``method`` with the given request
+    ``parameters``.
+    """
+    items = sorted((k, v) for k, v in parameters.items()
+                   if k not in VOLATILE_PARAMETERS)
+    source = json.dumps([appid, serviceurl, method, items],
+                        sort_keys=True, default=str)
+    return hashlib.sha1(bytes_(source)).hexdigest()
+
+
+def _tag_end(raw, pos):
+    """
+    Return the offset just past the markup starting at ``pos``,
+    skipping quoted attribute values.
+    """
+    quote = None
+    size = len(raw)
+    while pos < size:
+        c = raw[pos:pos + 1]
+        if quote is not None:
+            if c == quote:
+                quote = None
+        elif c in (b'"', b"'"):
+            quote = c
+        elif c == b'>':
+            return pos + 1
+        pos += 1
+    return size
+
+
+def index_elements(raw, tags=INDEXED_TAGS):
+    """
+    Scan the ``raw`` response bytes and return a ``(stat, index)`` tuple,
+    where ``stat`` is the root status and index maps each tag in ``tags``
+    to a list of ``(key, start, end)`` byte ranges.
+    """
+    tags = frozenset(tags)
+    index = {}
+    stack = []
+    state = {}
+    parser = expat.ParserCreate()
+
+    def start(name, attrs):
+        if not state:
+            state['stat'] = attrs.get('stat')
+        if name in tags:
+            stack.append((name, attrs.get('id'), parser.CurrentByteIndex))
+        else:
+            stack.append(None)
+
+    def end(name):
+        entry = stack.pop()
+        if entry is None:
+            return
+        name, key, begin = entry
+        entries = index.setdefault(name, [])
+        if key is None:
+            key = len(entries)
+        pos = parser.CurrentByteIndex
+        # expat reports the end of empty elements (<x/>) just past the tag,
+        # and the start of the end tag (</x>) otherwise
+        if raw[pos - 2:pos] != b'/>' or _tag_end(raw, begin) != pos:
+            pos = _tag_end(raw, pos)
+        entries.append((key, begin, pos))
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(raw, True)
+    return state.get('stat'), index
+
+
+class CachedResponse(object):
+    """
+    A raw response, compressed, with the byte offsets of its indexed elements.
+
+    The raw response is decompressed on each use, except for the responses
+    made with :meth:`fromRaw`, which keep it until stored in a cache.
+    """
+
+    def __init__(self, compressed, index, created=None):
+        self.index = index
+        self.compressed = compressed
+        self.created = time.time() if created is None else created
+        self._raw = None
+        self._lookups = {}
+
+    @classmethod
+    def fromRaw(cls, raw, index=None, level=6):
+        if index is None:
+            _, index = index_elements(raw)
+        result = cls(zlib.compress(raw, level), index)
+        result._raw = raw
+        return result
+
+    @property
+    def raw(self):
+        if self._raw is not None:
+            return self._raw
+        return zlib.decompress(self.compressed)
+
+    def compact(self):
+        """
+        Return this response without its raw response, to be cached.
+        """
+        if self._raw is None:
+            return self
+        return type(self)(self.compressed, self.index, self.created)
+
+    def document(self):
+        """
+        Parse and return the whole response document.
+        """
+        return minidom.parseString(self.raw)
+
+    def keys(self, tag):
+        return [key for key, _, _ in self.index.get(tag, ())]
+
+    def fragment(self, tag, key):
+        """
+        Return the raw bytes of the ``tag`` element identified by ``key``,
+        or None.
+        """
+        lookup = self._lookups.get(tag)
+        if lookup is None:
+            lookup = dict((k, (start, end))
+                          for k, start, end in self.index.get(tag, ()))
+            self._lookups[tag] = lookup
+        offsets = lookup.get(key)
+        return self.raw[offsets[0]:offsets[1]] if offsets else None
+
+    def element(self, tag, key, parser=None):
+        """
+        Parse and return only the ``tag`` element identified by ``key``,
+        or None.
+
+        :param parser: the :mod:`.parsers` backend, minidom by default
+        """
+        fragment = self.fragment(tag, key)
+        if fragment is None:
+            return None
+        return (parser or get_parser('minidom')).parse(fragment)
+
+    def elements(self, tag, keys=None, parser=None):
+        """
+        Yield ``(key, element)`` for the ``tag`` elements whose key is in
+        ``keys`` (all of them by default), parsing each one on its own.
+
+        :param parser: the :mod:`.parsers` backend, minidom by default
+        """
+        keys = frozenset(keys) if keys is not None else None
+        parse = (parser or get_parser('minidom')).parse
+        raw = self.raw
+        for key, start, end in self.index.get(tag, ()):
+            if keys is None or key in keys:
+                yield key, parse(raw[start:end])
+
+    def toBytes(self):
+        index = bytes_(json.dumps(self.index, separators=(',', ':')))
+        return _HEADER.pack(_MAGIC, _VERSION, self.created, len(index)) \
+             + index + self.compressed
+
+    @classmethod
+    def fromBytes(cls, data):
+        """
+        Return the response stored in ``data`` by :meth:`toBytes`, or None
+        if ``data`` is not such a response (truncated, corrupt, or of
+        another version).
+        """
+        try:
+            magic, version, created, size = _HEADER.unpack_from(data)
+            if magic != _MAGIC or version != _VERSION:
+                return None
+            offset = _HEADER.size
+            if offset + size > len(data):
+                return None
+            index = json.loads(native_(bytes(data[offset:offset + size]), 'utf-8'))
+            index = dict((tag, [tuple(e) for e in entries])
+                         for tag, entries in index.items())
+        except (struct.error, ValueError, TypeError, AttributeError):
+            return None
+        return cls(data[offset + size:], index, created)
+
+
+class _ResponseCacheMixin(object):
+
+    ttl = None
+    methods = CACHEABLE_METHODS
+
+    def cacheable(self, method):
+        return method in self.methods
+
+    def _expired(self, response, now=None):
+        if self.ttl is None:
+            return False
+        return (now or time.time()) - response.created > self.ttl
+
+
+@interface.implementer(IResponseCache)
+class MemoryResponseCache(_ResponseCacheMixin):
+    """
+    A thread-safe, in-process LRU response cache.
+
+    :param maxsize: the maximum number of responses kept
+    :param ttl: (optional) the number of seconds responses are valid for
+    :param methods: (optional) the methods to cache
+    """
+
+    def __init__(self, maxsize=128, ttl=300, methods=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        if methods is not None:
+            self.methods = frozenset(methods)
+
+    def get(self, key, stale=False):
+        with self.lock:
+            response = self.entries.get(key)
+            if response is None or (not stale and self._expired(response)):
+                return None
+            del self.entries[key]
+            self.entries[key] = response
+            return response
+
+    def set(self, key, response):
+        response = response.compact()
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = response
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+@interface.implementer(IResponseCache)
+class MappedFileResponseCache(_ResponseCacheMixin):
+    """
+    A response cache storing one file per response in ``directory``,
+    read through memory maps: the responses returned read their
+    compressed bodies from the map, so that processes sharing the
+    directory share its pages. Files are replaced atomically, the maps
+    of the replaced files staying valid until released.
+
+    Files expired for more than ``max_stale`` seconds are removed when
+    read, and the least recently used files are removed when storing a
+    response puts the cache over ``maxsize`` files or ``maxbytes`` bytes.
+
+    :param directory: the cache directory, created if needed
+    :param ttl: (optional) the number of seconds responses are valid for
+    :param methods: (optional) the methods to cache
+    :param maxsize: (optional) the maximum number of responses kept
+    :param maxbytes: (optional) the maximum size of the responses kept
+    :param max_stale: the number of seconds expired responses are kept,
+        to be served while the circuit of their method is open
+    """
+
+    suffix = '.nscr'
+
+    def __init__(self, directory, ttl=300, methods=None, maxsize=1024,
+                 maxbytes=None, max_stale=0):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.max_stale = max_stale
+        self.directory = directory
+        if methods is not None:
+            self.methods = frozenset(methods)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _evictable(self, created, now=None):
+        if self.ttl is None:
+            return False
+        return (now or time.time()) - created > self.ttl + self.max_stale
+
+    def get(self, key, stale=False):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fp:
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            return None
+        try:
+            data = memoryview(mapped)
+        except TypeError:  # pragma: no cover
+            # Python 2
+            data = mapped[:]
+            mapped.close()
+        # the map is closed once the response is released
+        response = CachedResponse.fromBytes(data)
+        if response is None or self._evictable(response.created):
+            self.invalidate(key)
+            return None
+        if self._expired(response):
+            return response if stale else None
+        try:
+            os.utime(path, None)  # the last use, for the eviction
+        except OSError:  # pragma: no cover
+            pass
+        return response
+
+    def _sweep(self):
+        """
+        Remove the files of the expired responses, and the least recently
+        used ones while the cache is over its bounds.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:  # removed meanwhile
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, path in entries:
+            # a file is never older than its response
+            if      not self._evictable(mtime, now) \
+                and (self.maxsize is None or count <= self.maxsize) \
+                and (self.maxbytes is None or total <= self.maxbytes):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            count -= 1
+            total -= size
+
+    def set(self, key, response):
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(response.toBytes())
+            _replace(temp, self._path(key))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Cannot store cached response')
+            if os.path.exists(temp):
+                os.remove(temp)
+            return
+        self._sweep()
+
+    def invalidate(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                self.invalidate(name[:-len(self.suffix)])
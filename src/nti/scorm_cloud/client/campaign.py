@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+High volume invitation campaigns.
+
+An :class:`InvitationCampaign` splits a large list of addresses into
+invitations small enough for a single request, creates them
+concurrently (asynchronously for large batches), polls their creation
+status, and keeps a per-address status index that is only refreshed
+from the invitations that still have learners in progress.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import json
+
+from six.moves import urllib_parse
+
+from nti.scorm_cloud.compat import bytes_
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+from nti.scorm_cloud.client.invitation import InvitationChangeTracker
+
+from nti.scorm_cloud.client.mixins import WithRepr
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The maximum number of addresses in an invitation request
+MAX_ADDRESSES = 200
+
+#: The maximum length of the encoded ``addresses`` request parameter
+MAX_ADDRESSES_LENGTH = 4000
+
+#: The invitation creation statuses
+RUNNING = u'running'
+COMPLETE = u'complete'
+ERROR = u'error'
+
+#: The address statuses
+PENDING = u'pending'
+INVITED = u'invited'
+STARTED = u'started'
+COMPLETED = u'completed'
+FAILED = u'failed'
+
+
+def _encoded_length(address):
+    return len(urllib_parse.quote_plus(bytes_(address)))
+
+
+def batch_addresses(addresses, max_addresses=MAX_ADDRESSES,
+                    max_length=MAX_ADDRESSES_LENGTH):
+    """
+    Split ``addresses`` into lists of at most ``max_addresses`` unique
+    addresses, whose comma joined, URL encoded length is at most
+    ``max_length``.
+    """
+    seen = set()
+    batch, length = [], 0
+    for address in addresses:
+        address = address.strip()
+        if not address or address in seen:
+            continue
+        seen.add(address)
+        # each address but the first adds an encoded comma (%2C)
+        size = _encoded_length(address) + (3 if batch else 0)
+        if batch and (len(batch) >= max_addresses or length + size > max_length):
+            yield batch
+            batch, length = [], 0
+            size = _encoded_length(address)
+        batch.append(address)
+        length += size
+    if batch:
+        yield batch
+
+
+@WithRepr
+class AddressStatus(object):
+    """
+    The status of an invited address.
+    """
+
+    def __init__(self, email, invitationId=None, status=PENDING,
+                 registrationId=None, complete=None, success=None, score=None):
+        self.email = email
+        self.score = score
+        self.status = status
+        self.success = success
+        self.complete = complete
+        self.invitationId = invitationId
+        self.registrationId = registrationId
+
+    def toDict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def fromDict(cls, data):
+        return cls(**data)
+
+
+@WithRepr
+class CampaignInvitation(object):
+    """
+    An invitation created for a batch of campaign addresses.
+    """
+
+    def __init__(self, id_, addresses=(), status=RUNNING, error=None):
+        self.id = id_
+        self.error = error
+        self.status = status
+        self.addresses = list(addresses)
+
+    def toDict(self):
+        return {'id': self.id, 'addresses': self.addresses,
+                'status': self.status, 'error': self.error}
+
+    @classmethod
+    def fromDict(cls, data):
+        return cls(data['id'], data['addresses'], data['status'], data['error'])
+
+
+class InvitationCampaign(object):
+    """
+    Invitations of many addresses to a course.
+
+    :param service: the :class:`.ScormCloudService`
+    :param courseid: the course the addresses are invited to
+    :param async_threshold: batches of more addresses are created
+        with ``createInvitationAsync``
+    :param max_workers: the maximum number of concurrent requests
+    :param rate: the maximum number of requests per second
+    :param options: other :meth:`.InvitationService.create_invitation` arguments
+    """
+
+    max_addresses = MAX_ADDRESSES
+    max_length = MAX_ADDRESSES_LENGTH
+
+    def __init__(self, service, courseid, async_threshold=20, max_workers=8,
+                 rate=10, **options):
+        self.service = service
+        self.courseid = courseid
+        self.options = options
+        self.max_workers = max_workers
+        self.async_threshold = async_threshold
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.invitations = {}
+        self.addresses = {}
+        self.tracker = InvitationChangeTracker(service)
+
+    @property
+    def invitation_service(self):
+        return self.service.get_invitation_service()
+
+    def _run(self, func, items):
+        return run_concurrently(func, items, self.max_workers, self.rate_limiter)
+
+    def _invited(self, address):
+        entry = self.addresses.get(address)
+        return entry is not None and entry.status != FAILED
+
+    def send(self, addresses):
+        """
+        Invite the given addresses that are not already part of the
+        campaign, or whose invitation failed. Returns the list of created
+        :class:`CampaignInvitation`.
+        """
+        addresses = [a.strip() for a in addresses]
+        addresses = [a for a in addresses if not self._invited(a)]
+        batches = list(batch_addresses(addresses, self.max_addresses,
+                                       self.max_length))
+        invitations = self.invitation_service
+
+        def create(batch):
+            async_ = len(batch) > self.async_threshold
+            return invitations.create_invitation(self.courseid,
+                                                 addresses=batch,
+                                                 async_=async_,
+                                                 **self.options)
+        result = []
+        for call in self._run(create, batches):
+            if call.ok:
+                async_ = len(call.item) > self.async_threshold
+                invitation = CampaignInvitation(call.result, call.item,
+                                                RUNNING if async_ else COMPLETE)
+                self.invitations[invitation.id] = invitation
+                result.append(invitation)
+                status = PENDING if async_ else INVITED
+            else:
+                logger.warning('Cannot invite %s addresses: %s',
+                               len(call.item), call.error)
+                status = FAILED
+            for address in call.item:
+                self.addresses[address] = AddressStatus(address, call.result,
+                                                        status)
+        return result
+
+    def poll(self):
+        """
+        Check the creation status of the running invitations. Returns
+        the number of invitations still running.
+        """
+        running = [i for i in self.invitations.values() if i.status == RUNNING]
+        service = self.invitation_service
+        for call in self._run(service.getInvitationStatus,
+                              [i.id for i in running]):
+            invitation = self.invitations[call.item]
+            if not call.ok:
+                invitation.error = str(call.error)
+                continue
+            invitation.status = call.result
+            if call.result in (COMPLETE, ERROR):
+                status = INVITED if call.result == COMPLETE else FAILED
+                for address in invitation.addresses:
+                    self.addresses[address].status = status
+        return sum(1 for i in running if i.status == RUNNING)
+
+    def _update(self, users):
+        for user in users:
+            entry = self.addresses.get(user.email)
+            if entry is None:
+                continue
+            if user.isStarted:
+                entry.status = STARTED
+                entry.registrationId = user.registrationId or None
+            report = user.registrationreport
+            if report is not None:
+                entry.score = report.score
+                entry.success = report.success
+                entry.complete = report.complete
+                if report.complete == 'complete':
+                    entry.status = COMPLETED
+
+    def refresh(self):
+        """
+        Update the address index from the created invitations with
+        addresses that have not completed the course yet. Returns the
+        number of invitations fetched.
+
+        Only the user invitations that changed since the previous
+        refresh are parsed.
+        """
+        ids = set(e.invitationId for e in self.addresses.values()
+                  if e.status in (INVITED, STARTED))
+        ids = [i for i in ids if self.invitations[i].status == COMPLETE]
+        for call in self._run(self.tracker.poll, ids):
+            if call.ok:
+                self._update(call.result.added + call.result.changed)
+            else:
+                logger.warning('Cannot refresh invitation %s: %s',
+                               call.item, call.error)
+        return len(ids)
+
+    def status(self, address):
+        return self.addresses.get(address)
+
+    def summary(self):
+        """
+        Return the number of addresses in each status.
+        """
+        result = {}
+        for entry in self.addresses.values():
+            result[entry.status] = result.get(entry.status, 0) + 1
+        return result
+
+    def dump(self, fp):
+        """
+        Write the campaign invitations and address index as JSON.
+        """
+        json.dump({'courseid': self.courseid,
+                   'invitations': [i.toDict() for i in self.invitations.values()],
+                   'addresses': [a.toDict() for a in self.addresses.values()]},
+                  fp)
+
+    def load(self, fp):
+        """
+        Restore the invitations and address index written by :meth:`dump`.
+        """
+        data = json.load(fp)
+        for item in data['invitations']:
+            invitation = CampaignInvitation.fromDict(item)
+            self.invitations[invitation.id] = invitation
+        for item in data['addresses']:
+            entry = AddressStatus.fromDict(item)
+            self.addresses[entry.email] = entry
+        return self
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A local catalog of the courses of a SCORM Cloud application, answering
+course id regex, tag, learning standard and title queries without
+calling the service.
+
+The catalog is loaded once with :meth:`CourseCatalog.sync` and, once
+attached, kept up to date from the course and tag events notified by
+the :class:`.CourseService` and :class:`.TagService` of any service for
+the same application. Imported courses are marked stale and loaded on
+the next query or sync, not while the import event is notified.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import re
+import threading
+
+import zope.event
+
+from nti.scorm_cloud.client.events import split_tags
+
+from nti.scorm_cloud.interfaces import ICourseDeletedEvent
+from nti.scorm_cloud.interfaces import ICourseImportedEvent
+from nti.scorm_cloud.interfaces import ICourseTagsModifiedEvent
+
+logger = __import__('logging').getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Return the set of lower case word tokens in ``text``.
+    """
+    return set(t.lower() for t in _TOKEN_PATTERN.findall(text or u''))
+
+
+class CourseCatalog(object):
+    """
+    An in-memory course catalog with inverted indexes over tags,
+    learning standards and title tokens.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.lock = threading.RLock()
+        self.courses = {}
+        self.by_tag = {}
+        self.by_token = {}
+        self.by_standard = {}
+        self.stale = set()
+        self._patterns = {}
+        self._attached = False
+
+    # indexing
+
+    @staticmethod
+    def _add(index, key, courseid):
+        index.setdefault(key, set()).add(courseid)
+
+    @staticmethod
+    def _discard(index, key, courseid):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(courseid)
+            if not ids:
+                del index[key]
+
+    def _index(self, course):
+        courseid = course.courseId
+        self._unindex(courseid)
+        course.tags = list(course.tags or ())
+        self.courses[courseid] = course
+        for tag in course.tags:
+            self._add(self.by_tag, tag, courseid)
+        for token in tokenize(course.title):
+            self._add(self.by_token, token, courseid)
+        self._add(self.by_standard, course.learningStandard, courseid)
+
+    def _unindex(self, courseid):
+        course = self.courses.pop(courseid, None)
+        if course is None:
+            return None
+        for tag in course.tags or ():
+            self._discard(self.by_tag, tag, courseid)
+        for token in tokenize(course.title):
+            self._discard(self.by_token, token, courseid)
+        self._discard(self.by_standard, course.learningStandard, courseid)
+        return course
+
+    def sync(self):
+        """
+        Reload all courses (and their tags) from the service.
+        """
+        courses = self.service.get_course_service().get_course_list()
+        with self.lock:
+            self.stale = set()
+            self.courses = {}
+            self.by_tag = {}
+            self.by_token = {}
+            self.by_standard = {}
+            for course in courses:
+                self._index(course)
+        return len(courses)
+
+    def refresh(self, courseid):
+        """
+        Reload a single course from the service.
+        """
+        course = self.service.get_course_service().get_course_detail(courseid)
+        with self.lock:
+            self.stale.discard(courseid)
+            if course is not None:
+                self._index(course)
+            else:
+                self._unindex(courseid)
+        return course
+
+    def mark_stale(self, courseid):
+        """
+        Reload a course on the next query.
+        """
+        with self.lock:
+            self.stale.add(courseid)
+
+    def _refresh_stale(self):
+        with self.lock:
+            stale = list(self.stale)
+        for courseid in stale:
+            try:
+                self.refresh(courseid)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Cannot refresh course %s', courseid)
+
+    def remove(self, courseid):
+        with self.lock:
+            self.stale.discard(courseid)
+            return self._unindex(courseid)
+
+    def update_tags(self, courseid, tags=None, added=(), removed=()):
+        """
+        Update the tags of a catalog course, replacing them with ``tags``
+        if given, then adding and removing the given tags.
+        """
+        with self.lock:
+            course = self.courses.get(courseid)
+            if course is None:
+                return
+            current = list(course.tags) if tags is None else split_tags(tags)
+            current.extend(t for t in split_tags(added) if t not in current)
+            removed = set(split_tags(removed))
+            for tag in course.tags:
+                self._discard(self.by_tag, tag, courseid)
+            course.tags = [t for t in current if t not in removed]
+            for tag in course.tags:
+                self._add(self.by_tag, tag, courseid)
+
+    # events
+
+    def attach(self):
+        """
+        Start following course and tag events.
+        """
+        if not self._attached:
+            zope.event.subscribers.append(self.notify)
+            self._attached = True
+        return self
+
+    def detach(self):
+        if self._attached:
+            zope.event.subscribers.remove(self.notify)
+            self._attached = False
+
+    def _same_application(self, service):
+        mine, theirs = self.service.config, getattr(service, 'config', None)
+        return  theirs is not None \
+            and theirs.appid == mine.appid \
+            and theirs.serviceurl == mine.serviceurl
+
+    def notify(self, event):
+        if not self._same_application(getattr(event, 'service', None)):
+            return
+        # never fail the call that notified the event
+        try:
+            if ICourseTagsModifiedEvent.providedBy(event):
+                self.update_tags(event.courseid, event.tags,
+                                 event.added, event.removed)
+            elif ICourseDeletedEvent.providedBy(event):
+                self.remove(event.courseid)
+            elif ICourseImportedEvent.providedBy(event):
+                self.mark_stale(event.courseid)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Cannot update the catalog from %r', event)
+
+    # queries
+
+    def _pattern(self, regex):
+        pattern = self._patterns.get(regex)
+        if pattern is None:
+            pattern = self._patterns[regex] = re.compile(regex)
+        return pattern
+
+    def query(self, courseIdFilterRegex=None, tags=None, learningStandard=None,
+              title=None):
+        """
+        Return the catalog courses matching all the given criteria,
+        ordered by course id.
+
+        :param courseIdFilterRegex: a regular expression searched in the course ids
+        :param tags: the tags (list or comma separated) courses must all have
+        :param learningStandard: the course learning standard
+        :param title: words that must all be in the course title
+        """
+        self._refresh_stale()
+        with self.lock:
+            candidates = []
+            for tag in split_tags(tags):
+                candidates.append(self.by_tag.get(tag, ()))
+            for token in tokenize(title):
+                candidates.append(self.by_token.get(token, ()))
+            if learningStandard is not None:
+                candidates.append(self.by_standard.get(learningStandard, ()))
+            if candidates:
+                candidates.sort(key=len)
+                ids = set(candidates[0])
+                for other in candidates[1:]:
+                    ids.intersection_update(other)
+            else:
+                ids = self.courses.keys()
+            if courseIdFilterRegex:
+                search = self._pattern(courseIdFilterRegex).search
+                ids = [i for i in ids if search(i)]
+            return [self.courses[i] for i in sorted(ids)]
+
+    def get(self, courseid, default=None):
+        self._refresh_stale()
+        return self.courses.get(courseid, default)
+
+    def __contains__(self, courseid):
+        self._refresh_stale()
+        return courseid in self.courses
+
+    def __len__(self):
+        self._refresh_stale()
+        return len(self.courses)
+
+    def __iter__(self):
+        return iter(self.query())
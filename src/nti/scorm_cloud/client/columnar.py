@@ -0,0 +1,401 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Columnar (array backed) registration reports for analytics.
+
+:class:`ReportColumns` accumulates many registration reports into typed
+:mod:`array` columns, one table each for reports, activities and
+objectives, without creating an object per activity or objective.
+Reports are added from their raw XML (scanned with expat) or from
+parsed :class:`.RegistrationReport` objects. Activity and objective ids
+are dictionary encoded.
+
+Unknown flags are stored as -1 and unknown numbers as NaN. Aggregates
+use NumPy when it is installed; :meth:`ReportColumns.to_numpy` returns
+zero-copy NumPy views of the columns (or copies). The columns cannot grow
+while views of them exist: adding reports then raises
+:exc:`BufferError`, and leaves the tables unchanged.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+from array import array
+from xml.parsers import expat
+
+from nti.scorm_cloud.compat import bytes_
+
+from nti.scorm_cloud.datetimes import parse_duration
+
+logger = __import__('logging').getLogger(__name__)
+
+NAN = float('nan')
+
+_COMPLETE = {'complete': 1, 'completed': 1, 'incomplete': 0}
+_SUCCESS = {'passed': 1, 'failed': 0}
+_BOOLEAN = {'true': 1, 'false': 0}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+def _number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _seconds(text):
+    """
+    Return the seconds of a duration, or NaN.
+    """
+    seconds = parse_duration(text)
+    return NAN if seconds is None else seconds
+
+
+class _Codes(object):
+    """
+    A dictionary encoding of strings.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ReportColumns(object):
+    """
+    Columns of registration reports, activities and objectives.
+
+    Reports: ``regid`` (list), ``report_complete``, ``report_success``
+    (flags), ``report_score``, ``report_time`` (seconds).
+
+    Activities: ``activity_report`` (report row), ``activity_code``
+    (see :attr:`activity_ids`), ``activity_parent`` (activity row or -1),
+    ``activity_attempts``, ``activity_complete``, ``activity_success``
+    (flags), ``activity_score``, ``activity_time`` (seconds).
+
+    Objectives: ``objective_activity`` (activity row), ``objective_code``
+    (see :attr:`objective_ids`), ``objective_measure`` (normalized
+    measure, NaN when not measured), ``objective_satisfied`` (flag).
+    """
+
+    def __init__(self):
+        self.regid = []
+        self.report_complete = array('b')
+        self.report_success = array('b')
+        self.report_score = array('d')
+        self.report_time = array('d')
+
+        self._activities = _Codes()
+        self.activity_report = array('l')
+        self.activity_code = array('l')
+        self.activity_parent = array('l')
+        self.activity_attempts = array('l')
+        self.activity_complete = array('b')
+        self.activity_success = array('b')
+        self.activity_score = array('d')
+        self.activity_time = array('d')
+
+        self._objectives = _Codes()
+        self.objective_activity = array('l')
+        self.objective_code = array('l')
+        self.objective_measure = array('d')
+        self.objective_satisfied = array('b')
+
+    @property
+    def activity_ids(self):
+        return self._activities.values
+
+    @property
+    def objective_ids(self):
+        return self._objectives.values
+
+    def __len__(self):
+        return len(self.regid)
+
+    # building
+
+    def _add_report_row(self, regid, complete, success, score, totaltime):
+        # the list last, appending to the arrays fails while they are viewed
+        self.report_complete.append(_COMPLETE.get(complete, -1))
+        self.report_success.append(_SUCCESS.get(success, -1))
+        self.report_score.append(_number(score))
+        self.report_time.append(_seconds(totaltime))
+        self.regid.append(regid)
+        return len(self.regid) - 1
+
+    def _add_activity_row(self, report, activityid, parent, attempts, complete,
+                          success, score, time_):
+        self.activity_report.append(report)
+        self.activity_code.append(self._activities.encode(activityid))
+        self.activity_parent.append(parent)
+        self.activity_attempts.append(attempts)
+        self.activity_complete.append(_COMPLETE.get(complete, -1))
+        self.activity_success.append(_SUCCESS.get(success, -1))
+        self.activity_score.append(_number(score))
+        self.activity_time.append(_seconds(time_))
+        return len(self.activity_code) - 1
+
+    def _add_objective_row(self, activity, objectiveid, measure, satisfied):
+        self.objective_activity.append(activity)
+        self.objective_code.append(self._objectives.encode(objectiveid))
+        self.objective_measure.append(measure)
+        self.objective_satisfied.append(satisfied)
+
+    def add_report(self, report):
+        """
+        Add a parsed :class:`.RegistrationReport`.
+        """
+        row = self._add_report_row(report.regid, report.complete, report.success,
+                                   report.score, report.totaltime)
+        stack = [(getattr(report, 'activity', None), -1)]
+        while stack:
+            activity, parent = stack.pop()
+            if activity is None:
+                continue
+            index = self._add_activity_row(row, activity.id, parent, activity.attempts,
+                                           activity.complete, activity.success,
+                                           activity.score, activity.time)
+            for objective in activity.objectives or ():
+                measure = objective.normalizedmeasure if objective.measurestatus else NAN
+                self._add_objective_row(index, objective.id, measure,
+                                        1 if objective.satisfiedstatus else 0)
+            for child in reversed(activity.children or ()):
+                stack.append((child, index))
+        return row
+
+    def add_raw(self, raw):
+        """
+        Add the registration reports of a raw response (or postback) XML
+        document, without building any model object.
+        """
+        _RawReportScanner(self).parse(bytes_(raw))
+
+    @classmethod
+    def fromReports(cls, reports):
+        result = cls()
+        for report in reports:
+            result.add_report(report)
+        return result
+
+    # aggregates
+
+    def to_numpy(self, copy=False):
+        """
+        Return a dict of NumPy views of the columns (ids are not included),
+        or of copies if ``copy``. No report can be added while a view is
+        alive.
+        """
+        numpy = _numpy()
+        result = {}
+        for name, value in vars(self).items():
+            if isinstance(value, array):
+                if copy or not len(value):
+                    result[name] = numpy.array(value, dtype=value.typecode)
+                else:
+                    result[name] = numpy.frombuffer(value, dtype=value.typecode)
+        return result
+
+    def completion_rate_by_activity(self):
+        """
+        Return a mapping of activity ids to the fraction of their
+        activity rows that are complete.
+        """
+        numpy = _numpy()
+        ids = self.activity_ids
+        if not ids:
+            return {}
+        if numpy is not None:
+            columns = self.to_numpy()
+            codes = columns['activity_code']
+            totals = numpy.bincount(codes, minlength=len(ids))
+            complete = numpy.bincount(codes, weights=columns['activity_complete'] == 1,
+                                      minlength=len(ids))
+            rates = complete / numpy.maximum(totals, 1)
+            return dict(zip(ids, rates.tolist()))
+        totals = [0] * len(ids)
+        complete = [0] * len(ids)
+        for code, flag in zip(self.activity_code, self.activity_complete):
+            totals[code] += 1
+            complete[code] += flag == 1
+        return dict((ids[i], complete[i] / max(totals[i], 1)) for i in range(len(ids)))
+
+    def _scores(self, activityid=None):
+        if activityid is None:
+            return self.report_score
+        code = self._activities.codes.get(activityid)
+        return [s for c, s in zip(self.activity_code, self.activity_score) if c == code]
+
+    def score_distribution(self, bins=10, low=0.0, high=100.0, activityid=None):
+        """
+        Return the histogram (a list of ``bins`` counts) of the known
+        report scores, or of the scores of an activity, between ``low``
+        and ``high``.
+        """
+        numpy = _numpy()
+        if numpy is not None:
+            scores = numpy.asarray(self._scores(activityid), dtype='d')
+            scores = scores[~numpy.isnan(scores)]
+            counts, _ = numpy.histogram(scores, bins=bins, range=(low, high))
+            return counts.tolist()
+        counts = [0] * bins
+        width = (high - low) / bins
+        for score in self._scores(activityid):
+            if score == score and low <= score <= high:  # not NaN
+                counts[min(int((score - low) / width), bins - 1)] += 1
+        return counts
+
+    def mean_objective_measure(self):
+        """
+        Return a mapping of objective ids to their mean measured
+        normalized measure.
+        """
+        ids = self.objective_ids
+        sums = [0.0] * len(ids)
+        counts = [0] * len(ids)
+        for code, measure in zip(self.objective_code, self.objective_measure):
+            if measure == measure:  # not NaN
+                sums[code] += measure
+                counts[code] += 1
+        return dict((ids[i], sums[i] / counts[i]) for i in range(len(ids)) if counts[i])
+
+
+_REPORT_FIELDS = frozenset(('complete', 'success', 'score', 'totaltime'))
+_ACTIVITY_FIELDS = frozenset(('attempts', 'complete', 'success', 'score', 'time'))
+_OBJECTIVE_FIELDS = frozenset(('measurestatus', 'normalizedmeasure', 'satisfiedstatus'))
+
+
+class _RawReportScanner(object):
+    """
+    Feed the registration reports of an XML document into columns,
+    appending rows when elements start and filling them as their
+    fields end.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.names = []
+        self.text = None
+        self.report = None
+        self.activities = []
+        self.objective = None
+        self.measured = False
+        self.measure = NAN
+
+    def parse(self, raw):
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+        parser.Parse(raw, True)
+
+    def start(self, name, attrs):
+        names = self.names
+        parent = names[-1] if names else None
+        names.append(name)
+        self.text = None
+        columns = self.columns
+        if name == 'registrationreport':
+            self.report = columns._add_report_row(attrs.get('regid'), None, None,
+                                                  None, None)
+        elif name == 'activity' and self.report is not None \
+                and parent in ('registrationreport', 'children'):
+            parent = self.activities[-1] if self.activities else -1
+            self.activities.append(
+                columns._add_activity_row(self.report, attrs.get('id'), parent,
+                                          0, None, None, None, None))
+        elif name == 'objective' and parent == 'objectives' and self.activities \
+                and len(names) > 2 and names[-3] == 'activity':
+            columns._add_objective_row(self.activities[-1], attrs.get('id'), NAN, 0)
+            self.objective = len(columns.objective_code) - 1
+            self.measured, self.measure = False, NAN
+        elif self._is_field(name, parent):
+            self.text = []
+
+    def _is_field(self, name, parent):
+        if parent == 'registrationreport':
+            return name in _REPORT_FIELDS and self.report is not None
+        if parent == 'activity':
+            return name in _ACTIVITY_FIELDS and bool(self.activities)
+        if parent == 'objective':
+            return name in _OBJECTIVE_FIELDS and self.objective is not None
+        return False
+
+    def data(self, text):
+        if self.text is not None:
+            self.text.append(text)
+
+    def end(self, name):
+        names = self.names
+        names.pop()
+        parent = names[-1] if names else None
+        if self.text is not None:
+            text, self.text = u''.join(self.text).strip(), None
+            if parent == 'registrationreport':
+                self._report_field(name, text)
+            elif parent == 'activity':
+                self._activity_field(name, text)
+            else:
+                self._objective_field(name, text)
+        elif name == 'objective' and self.objective is not None:
+            if self.measured:
+                self.columns.objective_measure[self.objective] = self.measure
+            self.objective = None
+        elif name == 'activity' and self.activities \
+                and parent in ('registrationreport', 'children'):
+            self.activities.pop()
+        elif name == 'registrationreport':
+            self.report = None
+
+    def _report_field(self, name, text):
+        columns, row = self.columns, self.report
+        if name == 'complete':
+            columns.report_complete[row] = _COMPLETE.get(text, -1)
+        elif name == 'success':
+            columns.report_success[row] = _SUCCESS.get(text, -1)
+        elif name == 'score':
+            columns.report_score[row] = _number(text)
+        else:
+            columns.report_time[row] = _seconds(text)
+
+    def _activity_field(self, name, text):
+        columns, row = self.columns, self.activities[-1]
+        if name == 'attempts':
+            try:
+                columns.activity_attempts[row] = int(text or 0)
+            except ValueError:
+                pass
+        elif name == 'complete':
+            columns.activity_complete[row] = _COMPLETE.get(text, -1)
+        elif name == 'success':
+            columns.activity_success[row] = _SUCCESS.get(text, -1)
+        elif name == 'score':
+            columns.activity_score[row] = _number(text)
+        else:
+            columns.activity_time[row] = _seconds(text)
+
+    def _objective_field(self, name, text):
+        if name == 'measurestatus':
+            self.measured = text == 'true'
+        elif name == 'normalizedmeasure':
+            self.measure = _number(text)
+        else:
+            self.columns.objective_satisfied[self.objective] = _BOOLEAN.get(text, 0)
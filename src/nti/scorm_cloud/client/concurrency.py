@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Helpers to run many independent SCORM Cloud calls concurrently under a
+request rate limit.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from nti.scorm_cloud.client.deadlines import propagating
+
+logger = __import__('logging').getLogger(__name__)
+
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket allowing ``rate`` calls per second, with
+    bursts of up to ``burst`` calls.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(self.rate, 1))
+        self.tokens = self.burst
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def _take(self):
+        """
+        Take a token if one is available, returning 0, or return the
+        number of seconds until one is.
+        """
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def try_acquire(self):
+        """
+        Return whether a call is allowed now, without blocking.
+        """
+        return not self._take()
+
+    def acquire(self):
+        """
+        Block until a call is allowed.
+        """
+        wait = self._take()
+        while wait:
+            time.sleep(wait)
+            wait = self._take()
+
+
+class CallResult(object):
+    """
+    The outcome of one call made by :func:`run_concurrently`.
+    """
+
+    __slots__ = ('item', 'result', 'error')
+
+    def __init__(self, item, result=None, error=None):
+        self.item = item
+        self.error = error
+        self.result = result
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return "<%s %r %s>" % (type(self).__name__, self.item,
+                               'ok' if self.ok else repr(self.error))
+
+
+def run_concurrently(func, items, max_workers=8, rate_limiter=None,
+                     executor=None):
+    """
+    Call ``func(item)`` for every item using up to ``max_workers``
+    threads, waiting on ``rate_limiter`` (if any) before each call.
+
+    Exceptions are captured, not raised. Returns a list of
+    :class:`CallResult`, in the order of ``items``. The calls run with
+    the current :mod:`.deadlines`, so those made once it has passed fail
+    with :class:`.ScormCloudTimeoutError`.
+
+    :param executor: (optional) an existing executor to submit the calls to
+    """
+    items = list(items)
+
+    @propagating
+    def call(item):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            return CallResult(item, func(item))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.debug('Call for %r failed: %s', item, e)
+            return CallResult(item, error=e)
+
+    if not items:
+        return []
+    if executor is not None:
+        return [f.result() for f in [executor.submit(call, i) for i in items]]
+    workers = max(1, min(max_workers, len(items)))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        return list(pool.map(call, items))
+    finally:
+        pool.shutdown(wait=True)
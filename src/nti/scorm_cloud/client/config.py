@@ -16,14 +16,20 @@ logger = __import__('logging').getLogger(__name__)
 class Configuration(object):
     """
     Stores the configuration elements required by the API.
+
+    ``connect_timeout`` and ``read_timeout`` are the default timeouts,
+    in seconds, of the requests made; by default there are none.
     """
 
     def __init__(self, appid, secret, serviceurl,
-                 origin='rusticisoftware.pythonlibrary.2.0.0'):
+                 origin='rusticisoftware.pythonlibrary.2.0.0',
+                 connect_timeout=None, read_timeout=None):
         self.appid = appid
         self.origin = origin
         self.secret = bytes_(secret)
         self.serviceurl = serviceurl
+        self.read_timeout = read_timeout
+        self.connect_timeout = connect_timeout
 
     def __repr__(self):
         return 'Configuration for AppID %s from origin %s' % (self.appid, self.origin)
@@ -8,21 +8,18 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 
-from rustici_software_cloud_v2.api.course_api import CourseApi as SCV2CourseApi
-
-from rustici_software_cloud_v2.models.launch_auth_schema import LaunchAuthSchema
-
-from rustici_software_cloud_v2.models.launch_link_request_schema import LaunchLinkRequestSchema
-
-from rustici_software_cloud_v2.rest import ApiException
-
 from zope import interface
 
-from nti.common.string import is_true
+from zope.event import notify
 
 from nti.scorm_cloud.client.request import ScormCloudError
 from nti.scorm_cloud.client.request import ScormUpdateError
 
+from nti.scorm_cloud.client.events import CourseDeletedEvent
+from nti.scorm_cloud.client.events import CourseImportedEvent
+
+from nti.scorm_cloud.client.projection import COURSE
+
 from nti.scorm_cloud.client.mixins import get_source
 from nti.scorm_cloud.client.mixins import nodecapture
 
@@ -81,6 +78,7 @@ class CourseService(object):
         if results:
             result = results[0]
             success = result.attributes['successful'].value
+            from nti.common.string import is_true
             if not is_true(success):
                 msg = ''
                 for child_node in result.childNodes or ():
@@ -95,6 +93,7 @@ class CourseService(object):
         result = request.call_service('rustici.course.importCourse')
         self._validate_import(result)
         result = ImportResult.list_from_result(result)
+        notify(CourseImportedEvent(self.service, courseid))
         return result
 
     def _get_token(self, xmldoc):
@@ -126,7 +125,9 @@ class CourseService(object):
     def delete_course(self, courseid):
         request = self.service.request()
         request.parameters['courseid'] = courseid
-        return request.call_service('rustici.course.deleteCourse')
+        result = request.call_service('rustici.course.deleteCourse')
+        notify(CourseDeletedEvent(self.service, courseid))
+        return result
 
     def get_assets(self, courseid, path=None):
         request = self.service.request()
@@ -146,16 +147,20 @@ class CourseService(object):
         courses = CourseData(course_result)
         return courses
 
-    def get_course_list(self, courseIdFilterRegex=None, tags=None):
+    def get_course_list(self, courseIdFilterRegex=None, tags=None, fields=None):
         """
         Fetch the scorm content, filtering by the scorm courseId or
         by the given tags (must match all).
+
+        If ``fields`` are given, return records of only those fields.
         """
         request = self.service.request()
         if courseIdFilterRegex:
             request.parameters['filter'] = courseIdFilterRegex
         if tags:
             request.parameters['tags'] = tags
+        if fields:
+            return COURSE(request, 'rustici.course.getCourseList', fields)
         result = request.call_service('rustici.course.getCourseList')
         courses = CourseData.list_from_result(result)
         return courses
@@ -171,6 +176,11 @@ class CourseService(object):
 
         https://cloud.scorm.com/docs/v2/reference/migration_guide/
         """
+        # The v2 SDK is slow to import, only load it when needed
+        from rustici_software_cloud_v2.api.course_api import CourseApi as SCV2CourseApi
+        from rustici_software_cloud_v2.models.launch_auth_schema import LaunchAuthSchema
+        from rustici_software_cloud_v2.models.launch_link_request_schema import LaunchLinkRequestSchema
+        from rustici_software_cloud_v2.rest import ApiException
         if launchAuth is None:
             launchAuth = LaunchAuthSchema(type=launchAuthType)
         v2_course_api = SCV2CourseApi(api_client=self.service.make_v2_api())
@@ -178,8 +188,9 @@ class CourseService(object):
                                                       css_url=stylesheeturl,
                                                       launch_auth=launchAuth)
         try:
-            result = v2_course_api.build_course_preview_launch_link(courseid, 
-                                                                    launch_link_request)
+            result = self.service.request().call_v2(
+                'launch', v2_course_api.build_course_preview_launch_link,
+                courseid, launch_link_request)
         except ApiException as exc:
             logger.exception("Error while getting scorm preview url")
             raise ScormCloudError('Cannot get scorm preview url')
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Overall deadlines for SCORM Cloud calls.
+
+A :func:`deadline` bounds the time all the calls made in its block may
+take, including those made by the bulk helpers and the executor in
+other threads on behalf of the block. Each request is sent with
+timeouts no longer than the time left, and requests are not sent at all
+(they fail with :class:`.ScormCloudTimeoutError`) once it is gone.
+
+    with deadline(30):
+        service.get_registration_service().getRegistrationResult(regid)
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import time
+import functools
+import threading
+from contextlib import contextmanager
+
+logger = __import__('logging').getLogger(__name__)
+
+_local = threading.local()
+
+
+def current_deadline():
+    """
+    Return the deadline of the current thread, as a :func:`time.time`
+    value, or None.
+    """
+    return getattr(_local, 'deadline', None)
+
+
+def remaining():
+    """
+    Return the number of seconds left before the current deadline (zero
+    or less once passed), or None without a deadline.
+    """
+    result = current_deadline()
+    return result - time.time() if result is not None else None
+
+
+@contextmanager
+def deadline(seconds=None, at=None):
+    """
+    Run the block with a deadline ``seconds`` from now, or ``at`` the
+    given :func:`time.time` value. An enclosing earlier deadline still
+    applies; without either argument the block keeps the current one.
+    """
+    value = at if seconds is None else time.time() + seconds
+    previous = current_deadline()
+    if value is None or (previous is not None and previous < value):
+        value = previous
+    _local.deadline = value
+    try:
+        yield value
+    finally:
+        _local.deadline = previous
+
+
+def propagating(func):
+    """
+    Return a version of ``func`` that runs with the deadline of the
+    current thread, to be called in another thread.
+    """
+    captured = current_deadline()
+    if captured is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with deadline(at=captured):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Events notified (with :func:`zope.event.notify`) when courses and
+registrations are changed through the services.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import six
+
+from zope import interface
+
+from nti.scorm_cloud.interfaces import ICourseEvent
+from nti.scorm_cloud.interfaces import ICourseDeletedEvent
+from nti.scorm_cloud.interfaces import ICourseImportedEvent
+from nti.scorm_cloud.interfaces import ICourseTagsModifiedEvent
+from nti.scorm_cloud.interfaces import IRegistrationEvent
+from nti.scorm_cloud.interfaces import IRegistrationCreatedEvent
+from nti.scorm_cloud.interfaces import IRegistrationDeletedEvent
+
+logger = __import__('logging').getLogger(__name__)
+
+
+def split_tags(tags):
+    """
+    Return a list of tags out of an iterable or a comma separated string.
+    """
+    if tags is None:
+        return []
+    if isinstance(tags, six.string_types):
+        tags = tags.split(',')
+    return [t.strip() for t in tags if t and t.strip()]
+
+
+@interface.implementer(ICourseEvent)
+class CourseEvent(object):
+
+    def __init__(self, service, courseid):
+        self.service = service
+        self.courseid = courseid
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, self.courseid)
+
+
+@interface.implementer(ICourseImportedEvent)
+class CourseImportedEvent(CourseEvent):
+    pass
+
+
+@interface.implementer(ICourseDeletedEvent)
+class CourseDeletedEvent(CourseEvent):
+    pass
+
+
+@interface.implementer(ICourseTagsModifiedEvent)
+class CourseTagsModifiedEvent(CourseEvent):
+
+    def __init__(self, service, courseid, tags=None, added=(), removed=()):
+        CourseEvent.__init__(self, service, courseid)
+        self.tags = split_tags(tags) if tags is not None else None
+        self.added = split_tags(added)
+        self.removed = split_tags(removed)
+
+
+@interface.implementer(IRegistrationEvent)
+class RegistrationEvent(object):
+
+    def __init__(self, service, regid):
+        self.regid = regid
+        self.service = service
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, self.regid)
+
+
+@interface.implementer(IRegistrationCreatedEvent)
+class RegistrationCreatedEvent(RegistrationEvent):
+
+    def __init__(self, service, regid, courseid=None):
+        RegistrationEvent.__init__(self, service, regid)
+        self.courseid = courseid
+
+
+@interface.implementer(IRegistrationDeletedEvent)
+class RegistrationDeletedEvent(RegistrationEvent):
+    pass
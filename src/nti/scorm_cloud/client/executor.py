@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A managed thread pool for calling the blocking service methods from
+concurrent code.
+
+A :class:`ServiceExecutor` runs any service method (or any callable
+making SCORM Cloud calls) in its threads and returns
+:class:`concurrent.futures.Future` objects of the parsed models. All its
+calls go through the connection pool of the service, and no more than
+the global cap of :attr:`.ScormCloudService.concurrency_limit` of them
+are in flight at once, whichever thread makes them.
+
+Calls run with the :mod:`.deadlines` of the code submitting them.
+Calls that have not started by their deadline fail with
+:class:`.ScormCloudTimeoutError` without being made; calls still
+pending when their batch is cancelled, or times out, are cancelled.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import time
+import threading
+
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+
+from nti.scorm_cloud.client.deadlines import deadline as deadline_
+from nti.scorm_cloud.client.deadlines import remaining
+from nti.scorm_cloud.client.deadlines import current_deadline
+
+from nti.scorm_cloud.client.request import ScormCloudTimeoutError
+
+logger = __import__('logging').getLogger(__name__)
+
+
+class ConcurrencyLimit(object):
+    """
+    A cap on the number of SCORM Cloud calls in flight at once.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def __enter__(self):
+        left = remaining()
+        if left is None:
+            self._semaphore.acquire()
+        elif left <= 0 or not self._acquire(left):
+            raise ScormCloudTimeoutError('SCORM Cloud Error: deadline exceeded '
+                                         'waiting for a call slot', sent=False)
+        return self
+
+    def _acquire(self, timeout):
+        try:
+            return self._semaphore.acquire(True, timeout)
+        except TypeError:  # pragma: no cover
+            # Python 2
+            return self._semaphore.acquire()
+
+    def __exit__(self, *unused_exc_info):
+        self._semaphore.release()
+
+
+class ServiceExecutor(object):
+    """
+    A thread pool of ``max_workers`` threads running service calls.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def call(self, func, args=(), kwargs=None, deadline=None):
+        """
+        Schedule ``func(*args, **kwargs)`` and return its future.
+
+        :param deadline: (optional) the time (as returned by
+            :func:`time.time`) by which the call must be done, if earlier
+            than the current deadline
+        """
+        kwargs = kwargs or {}
+        current = current_deadline()
+        if deadline is None or (current is not None and current < deadline):
+            deadline = current
+
+        def run():
+            with deadline_(at=deadline):
+                if deadline is not None and time.time() >= deadline:
+                    raise ScormCloudTimeoutError('SCORM Cloud Error: deadline exceeded '
+                                                 'before the call started', sent=False)
+                return func(*args, **kwargs)
+        return self._pool.submit(run)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedule ``func(*args, **kwargs)`` and return its future.
+        """
+        return self.call(func, args, kwargs)
+
+    def map(self, func, *iterables, **options):
+        """
+        Like :func:`map`, but calling ``func`` concurrently. Results are
+        yielded in order. If a call fails, or ``timeout`` seconds pass,
+        or the iteration is abandoned, the pending calls are cancelled.
+
+        :keyword timeout: (optional) the number of seconds all the calls
+            must be done in
+        """
+        timeout = options.pop('timeout', None)
+        if options:
+            raise TypeError('Unexpected options %s' % ', '.join(options))
+        deadline = time.time() + timeout if timeout is not None else None
+        futures = [self.call(func, args, deadline=deadline)
+                   for args in zip(*iterables)]
+
+        def results():
+            try:
+                for future in futures:
+                    if deadline is None:
+                        yield future.result()
+                        continue
+                    try:
+                        yield future.result(max(0, deadline - time.time()))
+                    except FuturesTimeoutError:
+                        raise ScormCloudTimeoutError('SCORM Cloud Error: deadline '
+                                                     'exceeded waiting for the calls')
+            finally:
+                for future in futures:
+                    future.cancel()
+        return results()
+
+    def shutdown(self, wait=True):
+        """
+        Stop taking calls, cancel the pending ones and, if ``wait``,
+        wait for the running ones.
+        """
+        try:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+        except TypeError:  # pragma: no cover
+            # Python < 3.9
+            self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *unused_exc_info):
+        self.shutdown()
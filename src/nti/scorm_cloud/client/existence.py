@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A local oracle answering whether registrations exist without calling
+``rustici.registration.exists`` for every registration.
+
+The oracle is loaded with the ids of the registration list and, once
+attached, follows the registration created and deleted events notified
+by the :class:`.RegistrationService` of any service for the same
+application. It holds the ids either in an exact set or, to save
+memory, in a Bloom filter; in the latter case only the ids the filter
+may contain are checked with the service.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import math
+import struct
+import hashlib
+import threading
+
+import zope.event
+
+from nti.scorm_cloud.compat import bytes_
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+from nti.scorm_cloud.client.request import ScormCloudError
+
+from nti.scorm_cloud.interfaces import IRegistrationCreatedEvent
+from nti.scorm_cloud.interfaces import IRegistrationDeletedEvent
+
+logger = __import__('logging').getLogger(__name__)
+
+_HASHES = struct.Struct('!QQ')
+
+
+class ExistenceCheckError(ScormCloudError):
+    """
+    Raised by :meth:`RegistrationOracle.exists_many` when some of the
+    checks failed.
+
+    :ivar result: the mapping of the registration ids answered to whether
+        they exist
+    :ivar errors: the mapping of the registration ids not answered to the
+        error of their check
+    """
+
+    def __init__(self, result, errors):
+        ScormCloudError.__init__(self, 'SCORM Cloud Error: cannot check %s'
+                                 % ', '.join(sorted(errors)))
+        self.result = result
+        self.errors = errors
+
+
+class BloomFilter(object):
+    """
+    A Bloom filter sized for ``capacity`` items with a false positive
+    rate of ``error_rate``.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(int(capacity), 1)
+        self.size = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.capacity = capacity
+        self.count = 0
+
+    def _positions(self, item):
+        # double hashing: h1 + i * h2
+        h1, h2 = _HASHES.unpack(hashlib.md5(bytes_(item)).digest())
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+
+class RegistrationOracle(object):
+    """
+    Registration existence checks answered locally when possible.
+
+    :param service: the :class:`.ScormCloudService`
+    :param exact: keep the registration ids in a set (the default), rather
+        than a Bloom filter
+    :param error_rate: the false positive rate of the Bloom filter
+    :param max_workers: the maximum number of concurrent checks
+    :param rate: (optional) the maximum number of checks per second
+    """
+
+    def __init__(self, service, exact=True, error_rate=0.01, max_workers=8,
+                 rate=None):
+        self.exact = exact
+        self.service = service
+        self.error_rate = error_rate
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.lock = threading.RLock()
+        self.members = None
+        self._attached = False
+
+    @property
+    def loaded(self):
+        return self.members is not None
+
+    def _make(self, regids):
+        if self.exact:
+            return set(regids)
+        members = BloomFilter(max(len(regids) * 2, 1024), self.error_rate)
+        for regid in regids:
+            members.add(regid)
+        return members
+
+    def sync(self):
+        """
+        Reload the registration ids from the registration list, without
+        parsing the registrations.
+        """
+        request = self.service.request()
+        request.parameters['appid'] = self.service.config.appid
+        response = request.call_service_raw('rustici.registration.getRegistrationList')
+        regids = response.keys('registration')
+        members = self._make(regids)
+        with self.lock:
+            self.members = members
+        return len(regids)
+
+    def add(self, regid):
+        with self.lock:
+            if self.members is not None:
+                self.members.add(regid)
+
+    def discard(self, regid):
+        # Bloom filters cannot forget; their positives are verified anyway
+        with self.lock:
+            if self.exact and self.members is not None:
+                self.members.discard(regid)
+
+    def known(self, regid):
+        """
+        Return True or False if the oracle knows whether the registration
+        exists, or None if the service must be asked.
+        """
+        with self.lock:
+            if self.members is None:
+                return None
+            if regid not in self.members:
+                return False
+            return True if self.exact else None
+
+    def _check(self, regid):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return self.service.get_registration_service().exists(regid)
+
+    def exists(self, regid):
+        try:
+            return self.exists_many((regid,))[regid]
+        except ExistenceCheckError as e:
+            raise e.errors[regid]
+
+    def exists_many(self, regids):
+        """
+        Return a mapping of each of the given registration ids to whether
+        it exists, asking the service (concurrently) only for the ids the
+        oracle is not sure about.
+
+        :raises ExistenceCheckError: once all the checks are done, if some
+            of them failed
+        """
+        result = {}
+        uncertain = []
+        for regid in regids:
+            known = self.known(regid)
+            if known is None:
+                uncertain.append(regid)
+            else:
+                result[regid] = known
+        errors = {}
+        for call in run_concurrently(self._check, uncertain, self.max_workers):
+            if call.ok:
+                result[call.item] = call.result
+            else:
+                errors[call.item] = call.error
+        if errors:
+            raise ExistenceCheckError(result, errors)
+        return result
+
+    # events
+
+    def attach(self):
+        """
+        Start following registration events.
+        """
+        if not self._attached:
+            zope.event.subscribers.append(self.notify)
+            self._attached = True
+        return self
+
+    def detach(self):
+        if self._attached:
+            zope.event.subscribers.remove(self.notify)
+            self._attached = False
+
+    def _same_application(self, service):
+        mine, theirs = self.service.config, getattr(service, 'config', None)
+        return  theirs is not None \
+            and theirs.appid == mine.appid \
+            and theirs.serviceurl == mine.serviceurl
+
+    def notify(self, event):
+        if not self._same_application(getattr(event, 'service', None)):
+            return
+        if IRegistrationCreatedEvent.providedBy(event):
+            self.add(event.regid)
+        elif IRegistrationDeletedEvent.providedBy(event):
+            self.discard(event.regid)
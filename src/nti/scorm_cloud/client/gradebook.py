@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Streaming gradebook exports.
+
+A :class:`GradebookExport` walks the registration list of a course (or
+of the whole application), fetches the registration results
+concurrently, a chunk at a time, and writes one row per registration
+with a :class:`CSVWriter`, :class:`JSONLinesWriter` or
+:class:`ParquetWriter` (requires ``pyarrow``). Only one chunk of
+results is in memory at any time.
+
+After each chunk the written output, the number of registrations of
+the list consumed and the registrations that failed are recorded in the
+checkpoint file, if any, so that an interrupted export resumes where it
+stopped: output written after the last checkpoint is discarded, and the
+registrations consumed are skipped, but for the failed ones, which are
+tried again. The registration list is walked in a stable order, so the
+checkpoint does not grow with the size of the export.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import os
+import csv
+import json
+import tempfile
+
+import six
+
+from nti.scorm_cloud.compat import bytes_
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+from nti.scorm_cloud.client.registration import Registration
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The gradebook columns
+COLUMNS = ('courseid', 'regid', 'learnerid', 'firstname', 'lastname', 'email',
+           'complete', 'success', 'score', 'totaltime', 'objectives')
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+def objective_scores(activity, result=None):
+    """
+    Return a mapping of ``activity id/objective id`` to the normalized
+    measure of the objectives of an activity tree (None when not measured).
+    """
+    result = {} if result is None else result
+    if activity is None:
+        return result
+    for objective in activity.objectives or ():
+        key = u'%s/%s' % (activity.id, objective.id)
+        result[key] = objective.normalizedmeasure if objective.measurestatus else None
+    for child in activity.children or ():
+        objective_scores(child, result)
+    return result
+
+
+def gradebook_row(registration, report):
+    """
+    Return the gradebook row (a dict) of a :class:`.Registration` and its
+    :class:`.RegistrationReport`.
+    """
+    return {
+        'courseid': registration.courseId,
+        'regid': registration.registrationId,
+        'learnerid': registration.learnerId,
+        'firstname': registration.learnerFirstName,
+        'lastname': registration.learnerLastName,
+        'email': registration.email,
+        'complete': report.complete if report is not None else None,
+        'success': report.success if report is not None else None,
+        'score': report.score if report is not None else None,
+        'totaltime': report.totaltime if report is not None else None,
+        'objectives': objective_scores(getattr(report, 'activity', None)),
+    }
+
+
+class _FileWriter(object):
+    """
+    Base for writers appending rows to a single file.
+    """
+
+    def __init__(self, path, columns=COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.fp = None
+
+    def open(self, state=None):
+        """
+        Open the output, truncated to the checkpointed ``state`` if
+        resuming, and return the initial state.
+        """
+        offset = (state or {}).get('offset')
+        if offset is None or not os.path.exists(self.path):
+            self.fp = open(self.path, 'wb')
+            self.header()
+        else:
+            self.fp = open(self.path, 'r+b')
+            self.fp.truncate(offset)
+            self.fp.seek(offset)
+        return self.flush()
+
+    def header(self):
+        pass
+
+    def flush(self):
+        self.fp.flush()
+        os.fsync(self.fp.fileno())
+        return {'offset': self.fp.tell()}
+
+    def close(self):
+        if self.fp is not None:
+            self.fp.close()
+            self.fp = None
+
+
+class CSVWriter(_FileWriter):
+    """
+    Write gradebook rows as CSV; objective scores are a JSON object.
+    """
+
+    def _line(self, values):
+        values = [u'' if v is None else v for v in values]
+        if six.PY2:  # pragma: no cover
+            values = [bytes_(v) if isinstance(v, six.text_type) else v for v in values]
+        buf = six.StringIO()
+        csv.writer(buf).writerow(values)
+        return bytes_(buf.getvalue())
+
+    def header(self):
+        self.fp.write(self._line(self.columns))
+
+    def write(self, rows):
+        for row in rows:
+            values = [row.get(c) for c in self.columns]
+            values = [json.dumps(v, sort_keys=True) if isinstance(v, dict) else v
+                      for v in values]
+            self.fp.write(self._line(values))
+
+
+class JSONLinesWriter(_FileWriter):
+    """
+    Write gradebook rows as JSON objects, one per line.
+    """
+
+    def write(self, rows):
+        for row in rows:
+            line = json.dumps(dict((c, row.get(c)) for c in self.columns),
+                              sort_keys=True)
+            self.fp.write(bytes_(line) + b'\n')
+
+
+class ParquetWriter(object):
+    """
+    Write gradebook rows as Parquet files, one per chunk, in the
+    ``directory``; objective scores are a JSON string. Requires ``pyarrow``.
+    """
+
+    def __init__(self, directory, columns=COLUMNS):
+        import pyarrow  # pylint: disable=unused-import
+        self.columns = columns
+        self.directory = directory
+        self.part = 0
+
+    def _path(self, part):
+        return os.path.join(self.directory, 'part-%05d.parquet' % part)
+
+    def open(self, state=None):
+        self.part = (state or {}).get('part') or 0
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        # drop the parts written after the checkpoint
+        part = self.part
+        while os.path.exists(self._path(part)):
+            os.remove(self._path(part))
+            part += 1
+        return self.flush()
+
+    def write(self, rows):
+        import pyarrow
+        import pyarrow.parquet
+        if not rows:
+            return
+        data = {}
+        for column in self.columns:
+            values = [row.get(column) for row in rows]
+            data[column] = [json.dumps(v, sort_keys=True) if isinstance(v, dict)
+                            else (None if v is None else u'%s' % v)
+                            for v in values]
+        table = pyarrow.table(dict((c, pyarrow.array(data[c], pyarrow.string()))
+                                   for c in self.columns))
+        pyarrow.parquet.write_table(table, self._path(self.part))
+        self.part += 1
+
+    def flush(self):
+        return {'part': self.part}
+
+    def close(self):
+        pass
+
+
+class GradebookExport(object):
+    """
+    Export the results of the registrations of a course or application.
+
+    :param service: the :class:`.ScormCloudService`
+    :param writer: the row writer
+    :param checkpoint: (optional) the path of the checkpoint file
+    :param resultsformat: the results format fetched; ``activity`` (the
+        default) includes the objectives, ``course`` does not
+    :param max_workers: the maximum number of concurrent requests
+    :param rate: the maximum number of requests per second
+    :param chunk: the number of registrations fetched (and kept in memory)
+        between checkpoints
+    """
+
+    def __init__(self, service, writer, checkpoint=None, resultsformat='activity',
+                 max_workers=8, rate=10, chunk=100):
+        self.chunk = chunk
+        self.writer = writer
+        self.service = service
+        self.checkpoint = checkpoint
+        self.max_workers = max_workers
+        self.resultsformat = resultsformat
+        self.rate_limiter = RateLimiter(rate) if rate else None
+
+    def registrations(self, courseid=None):
+        """
+        Iterate the registrations of a course (or of the application),
+        parsing each one only when reached.
+        """
+        request = self.service.request()
+        request.parameters['appid'] = self.service.config.appid
+        if courseid:
+            request.parameters['courseid'] = courseid
+        response = request.call_service_raw('rustici.registration.getRegistrationList')
+        for _, node in response.elements('registration'):
+            yield Registration.fromMinidom(node)
+
+    def load(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as fp:
+                return json.load(fp)
+        return None
+
+    def save(self, position, failed, writer_state):
+        if not self.checkpoint:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as fp:
+            json.dump({'position': position, 'failed': failed,
+                       'writer': writer_state}, fp)
+        _replace(temp, self.checkpoint)
+
+    def _result(self, registration):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        registrations = self.service.get_registration_service()
+        return registrations.getRegistrationResult(registration.registrationId,
+                                                   self.resultsformat)
+
+    def _export(self, chunk, position, failed):
+        rows = []
+        for call in run_concurrently(self._result, chunk, self.max_workers):
+            regid = call.item.registrationId
+            if call.ok:
+                rows.append(gradebook_row(call.item, call.result))
+                failed.pop(regid, None)
+            else:
+                logger.warning('Cannot fetch the results of %s: %s', regid, call.error)
+                failed[regid] = str(call.error)
+        self.writer.write(rows)
+        self.save(position, failed, self.writer.flush())
+        return len(rows)
+
+    def run(self, courseid=None, progress=None):
+        """
+        Export the registrations of ``courseid`` (all registrations by
+        default), resuming from the checkpoint.
+
+        :param progress: (optional) called with the number of rows
+            exported so far after each chunk
+        :return: a dict with the ``exported`` and ``skipped`` counts and
+            the ``failed`` registrations (mapped to their error)
+        """
+        state = self.load() or {}
+        start = state.get('position') or 0
+        failed = dict(state.get('failed') or {})
+        retry = frozenset(failed)
+        writer_state = self.writer.open(state.get('writer'))
+        self.save(start, failed, writer_state)
+        exported, skipped, position = 0, 0, start
+        try:
+            chunk = []
+            for index, registration in enumerate(self.registrations(courseid)):
+                position = max(start, index + 1)
+                if index < start and registration.registrationId not in retry:
+                    skipped += 1
+                    continue
+                chunk.append(registration)
+                if len(chunk) >= self.chunk:
+                    exported += self._export(chunk, position, failed)
+                    chunk = []
+                    if progress is not None:
+                        progress(exported)
+            if chunk:
+                exported += self._export(chunk, position, failed)
+                if progress is not None:
+                    progress(exported)
+        finally:
+            self.writer.close()
+        return {'exported': exported, 'skipped': skipped, 'failed': failed}
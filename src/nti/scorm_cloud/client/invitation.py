@@ -8,25 +8,36 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 
+import hashlib
+from xml.dom import minidom
+from xml.parsers import expat
+from xml.parsers.expat import ExpatError
+
 from zope import interface
 
+from nti.scorm_cloud.compat import bytes_
+
 from nti.scorm_cloud.interfaces import IInvitationService
 
+from nti.scorm_cloud.client.cache import index_elements
+
 from nti.scorm_cloud.client.mixins import WithRepr
 from nti.scorm_cloud.client.mixins import NodeMixin
 from nti.scorm_cloud.client.mixins import RegistrationMixin
 
 from nti.scorm_cloud.client.mixins import nodecapture
 
+from nti.scorm_cloud.client.projection import INVITATION
+
 from nti.scorm_cloud.client.request import ScormCloudError
 
 from nti.scorm_cloud.minidom import getChildText
 from nti.scorm_cloud.minidom import getChildCDATA
 from nti.scorm_cloud.minidom import getAttributeValue
+from nti.scorm_cloud.minidom import getElementsByName
 
 logger = __import__('logging').getLogger(__name__)
 
-
 @interface.implementer(IInvitationService)
 class InvitationService(object):
 
@@ -90,14 +101,16 @@ class InvitationService(object):
                                       creatingUserEmail, registrationCap, postbackurl, authtype,
                                       urlname, urlpass, resultsformat, expirationdate, True)
 
-    def getInvitationList(self, filter_=None, coursefilter=None):
+    def getInvitationList(self, filter_=None, coursefilter=None, fields=None):
         request = self.service.request()
         if filter_ is not None:
             request.parameters['filter'] = filter_
         if coursefilter is not None:
             request.parameters['coursefilter'] = coursefilter
-        xmldoc = request.call_service('rustici.invitation.getInvitationList')
-        nodes = xmldoc.documentElement.getElementsByTagName('invitationInfo')
+        if fields:
+            return INVITATION(request, 'rustici.invitation.getInvitationList', fields)
+        rsp = request.call_service_element('rustici.invitation.getInvitationList')
+        nodes = getElementsByName(rsp, 'invitationInfo')
         return [InvitationInfo.fromMinidom(n) for n in nodes or ()]
     get_invitation_list = getInvitationList
 
@@ -112,8 +125,8 @@ class InvitationService(object):
         request = self.service.request()
         request.parameters['invitationId'] = invitationId
         request.parameters['detail'] = str(detail).lower()
-        xmldoc = request.call_service('rustici.invitation.getInvitationInfo')
-        nodes = xmldoc.documentElement.getElementsByTagName('invitationInfo')
+        rsp = request.call_service_element('rustici.invitation.getInvitationInfo')
+        nodes = getElementsByName(rsp, 'invitationInfo')
         return InvitationInfo.fromMinidom(nodes[0]) if nodes else None
     get_invitation_info = getInvitationInfo
 
@@ -170,7 +183,7 @@ class UserInvitation(NodeMixin):
     @classmethod
     @nodecapture
     def fromMinidom(cls, node):
-        nodes = node.getElementsByTagName('registrationreport')
+        nodes = getElementsByName(node, 'registrationreport')
         report = RegistrationReport.fromMinidom(nodes[0]) if nodes else None
         return cls(getChildCDATA(node, 'email'),
                    getChildCDATA(node, 'url'),
@@ -201,7 +214,7 @@ class InvitationInfo(NodeMixin):
     @nodecapture
     def fromMinidom(cls, node):
         userInvitations = []
-        for child in node.getElementsByTagName('userInvitation') or ():
+        for child in getElementsByName(node, 'userInvitation') or ():
             userInvitations.append(UserInvitation.fromMinidom(child))
         return cls(getChildCDATA(node, 'id'),
                    getChildCDATA(node, 'body'),
@@ -214,3 +227,108 @@ class InvitationInfo(NodeMixin):
                    getChildText(node, 'created') == 'true',
                    getChildText(node, 'createdDate'),
                    userInvitations or ())
+
+
+@WithRepr
+class InvitationChanges(object):
+    """
+    The user invitations of an invitation added, changed or removed
+    since the previous poll.
+    """
+
+    def __init__(self, invitationId, added=(), changed=(), removed=(),
+                 unchanged=0):
+        self.added = list(added)
+        self.changed = list(changed)
+        self.removed = list(removed)
+        self.unchanged = unchanged
+        self.invitationId = invitationId
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+    __nonzero__ = __bool__
+
+
+def _cdata(fragment):
+    """
+    Return the CDATA of the element in ``fragment``, as
+    :func:`.getChildCDATA` reads it.
+    """
+    result = []
+    state = []
+
+    def data(text):
+        if state:
+            result.append(text)
+
+    parser = expat.ParserCreate()
+    parser.StartCdataSectionHandler = lambda: state.append(True)
+    parser.EndCdataSectionHandler = state.pop
+    parser.CharacterDataHandler = data
+    parser.Parse(fragment, True)
+    return u''.join(result)
+
+
+class InvitationChangeTracker(object):
+    """
+    Poll the detailed info of invitations, remembering a digest of each
+    user invitation so that only the user invitations added or changed
+    since the previous poll are parsed.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.snapshots = {}
+
+    def poll(self, invitationId):
+        """
+        Fetch the detailed info of an invitation and return its
+        :class:`InvitationChanges`. The first poll reports all user
+        invitations as added.
+        """
+        request = self.service.request()
+        request.parameters['invitationId'] = invitationId
+        request.parameters['detail'] = 'true'
+        url = request.construct_url('rustici.invitation.getInvitationInfo')
+        raw = bytes_(request.send_post(url))
+        try:
+            stat, index = index_elements(raw, ('userInvitation', 'email'))
+        except ExpatError:
+            stat = None
+        if stat != 'ok':
+            request.get_xml(raw)  # raises the SCORM Cloud error
+            raise ScormCloudError('SCORM Cloud Error: invalid response')
+        previous = self.snapshots.get(invitationId, {})
+        current = {}
+        result = InvitationChanges(invitationId)
+        # the user invitations are sliced out of the response with the
+        # offsets found by a (C speed) expat scan, and parsed only when
+        # added or changed
+        emails = iter(index.get('email', ()))
+        email_range = next(emails, None)
+        for position, (_, start, end) in enumerate(index.get('userInvitation', ())):
+            fragment = raw[start:end]
+            email = None
+            # both lists are in document order
+            while email_range is not None and email_range[1] < start:
+                email_range = next(emails, None)
+            if email_range is not None and email_range[2] <= end:
+                email = _cdata(raw[email_range[1]:email_range[2]])
+                email_range = next(emails, None)
+            if not email:
+                email = position
+            digest = hashlib.sha1(fragment).digest()
+            current[email] = digest
+            old = previous.get(email)
+            if old == digest:
+                result.unchanged += 1
+                continue
+            node = minidom.parseString(fragment).documentElement
+            user = UserInvitation.fromMinidom(node)
+            (result.added if old is None else result.changed).append(user)
+        result.removed = [e for e in previous if e not in current]
+        self.snapshots[invitationId] = current
+        return result
+
+    def forget(self, invitationId):
+        self.snapshots.pop(invitationId, None)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Support for models parsed lazily from their raw XML.
+
+A lazy model keeps the raw bytes of its element, a :class:`Retained`
+fragment, together with a shallow scan of it: the attributes of the
+element, the text of its leaf children, and the byte ranges of its
+children and grandchildren. Simple fields are read from the scan, while
+nested structures are :class:`LazyAttribute` attributes, parsed from
+their byte range on first access.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+from xml.parsers import expat
+
+from nti.scorm_cloud.client.mixins import NodeMixin
+
+from nti.scorm_cloud.parsers import get_parser
+
+logger = __import__('logging').getLogger(__name__)
+
+
+class _Stop(Exception):
+    pass
+
+
+def scan(raw, stop=()):
+    """
+    Scan the element in the ``raw`` bytes and return a tuple of its
+    attributes, a mapping of the names of its leaf children to their
+    text, and a mapping of the names of its children, and of
+    ``child/grandchild`` paths, to lists of ``(start, end)`` byte ranges.
+
+    :param stop: the names of children that end the scan; such a child
+        must be the last child of the element
+    """
+    attrs = {}
+    fields = {}
+    parts = {}
+    stack = []
+    text = []
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+
+    def start(name, attributes):
+        depth = len(stack)
+        if depth == 0:
+            attrs.update(attributes)
+        else:
+            parent = stack[-1]
+            parent[2] = parent[3] = False  # neither a leaf nor empty
+            if depth == 1:
+                if name in stop:
+                    end = raw.rindex(b'</')
+                    parts[name] = [(parser.CurrentByteIndex, end)]
+                    raise _Stop()
+                del text[:]
+        # name, start, leaf, empty
+        stack.append([name, parser.CurrentByteIndex, True, True])
+
+    def end(unused_name):
+        name, begin, leaf, empty = stack.pop()
+        depth = len(stack)
+        if depth == 1:
+            if leaf:
+                fields.setdefault(name, u''.join(text))
+        elif depth == 2:
+            name = stack[-1][0] + '/' + name
+        else:
+            return
+        # expat reports the end of empty elements (<x/>) just past the
+        # tag, and the start of the end tag (</x>) otherwise
+        pos = parser.CurrentByteIndex
+        if not empty or raw[pos - 2:pos] != b'/>':
+            pos = raw.index(b'>', pos) + 1
+        parts.setdefault(name, []).append((begin, pos))
+
+    def data(value):
+        stack[-1][3] = False
+        if len(stack) == 2:
+            text.append(value)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = data
+    try:
+        parser.Parse(raw, True)
+    except _Stop:
+        pass
+    return attrs, fields, parts
+
+
+class Retained(object):
+    """
+    The raw bytes of an element and their shallow :func:`scan`.
+    """
+
+    def __init__(self, raw, stop=()):
+        self.raw = raw
+        self.attrs, self.fields, self.parts = scan(raw, stop)
+
+    def attribute(self, name):
+        return self.attrs.get(name)
+
+    def field(self, name):
+        return self.fields.get(name)
+
+    def fragments(self, path):
+        """
+        Return the raw bytes of the children (``name``) or grandchildren
+        (``child/grandchild``) at ``path``.
+        """
+        raw = self.raw
+        return [raw[start:end] for start, end in self.parts.get(path, ())]
+
+    def nodes(self, path):
+        """
+        Parse and return the elements at ``path`` with the default
+        parser backend.
+        """
+        parse = get_parser().parse
+        return [parse(f) for f in self.fragments(path)]
+
+    def node(self, path):
+        nodes = self.nodes(path)
+        return nodes[0] if nodes else None
+
+    def __repr__(self):
+        return '<%s %d bytes>' % (type(self).__name__, len(self.raw))
+
+
+class LazyAttribute(object):
+    """
+    A decorator computing an attribute on first access and storing it on
+    the instance, so that later accesses are plain attribute reads.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, inst, cls):
+        if inst is None:
+            return self
+        value = self.func(inst)
+        inst.__dict__[self.name] = value
+        return value
+
+
+class LazyNodeMixin(NodeMixin):
+    """
+    Base class for lazy models, keeping their :class:`Retained` fragment
+    in ``_v_retained``.
+    """
+
+    def __init__(self, retained):
+        self._v_retained = retained
+
+    @classmethod
+    def lazy_attributes(cls):
+        names = cls.__dict__.get('_lazy_attributes')
+        if names is None:
+            names = tuple(name for name in dir(cls)
+                          if isinstance(getattr(cls, name, None), LazyAttribute))
+            cls._lazy_attributes = names
+        return names
+
+    @property
+    def materialized(self):
+        return all(name in self.__dict__ for name in self.lazy_attributes())
+
+    def materialize(self):
+        """
+        Parse all the lazy attributes of this object.
+        """
+        for name in self.lazy_attributes():
+            getattr(self, name)
+        return self
+
+    def __getstate__(self):
+        # the retained fragment is volatile, parse what it holds
+        self.materialize()
+        return NodeMixin.__getstate__(self)
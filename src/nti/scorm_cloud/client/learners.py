@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Batch updates of learner names, emails and ids.
+
+A :class:`LearnerSnapshot` of the learners known from registrations is
+used to drop the changes that would not modify anything; the remaining
+``rustici.registration.updateLearnerInfo`` calls are made concurrently
+under a rate limit.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+from collections import OrderedDict
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+from nti.scorm_cloud.client.mixins import WithRepr
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The outcomes of a learner change
+UPDATED = u'updated'
+UNCHANGED = u'unchanged'
+FAILED = u'failed'
+
+
+@WithRepr
+class LearnerInfo(object):
+
+    def __init__(self, learnerId, firstName=None, lastName=None, email=None):
+        self.email = email
+        self.lastName = lastName
+        self.learnerId = learnerId
+        self.firstName = firstName
+
+    def toDict(self):
+        return dict(self.__dict__)
+
+
+class LearnerSnapshot(object):
+    """
+    The names and emails of learners, by learner id.
+    """
+
+    def __init__(self, learners=()):
+        self.learners = dict((l.learnerId, l) for l in learners)
+
+    @classmethod
+    def fromRegistrations(cls, registrations):
+        result = cls()
+        for reg in registrations:
+            if reg.learnerId:
+                result.learners[reg.learnerId] = LearnerInfo(reg.learnerId,
+                                                             reg.learnerFirstName,
+                                                             reg.learnerLastName,
+                                                             reg.email or None)
+        return result
+
+    @classmethod
+    def fromService(cls, service, courseid=None, after=None, until=None):
+        """
+        Take a snapshot of the learners of the registration list.
+        """
+        registrations = service.get_registration_service().getRegistrationList(
+            courseid, None, after, until)
+        return cls.fromRegistrations(registrations)
+
+    def toDict(self):
+        return [l.toDict() for l in self.learners.values()]
+
+    @classmethod
+    def fromDict(cls, data):
+        return cls(LearnerInfo(**item) for item in data)
+
+    def get(self, learnerid, default=None):
+        return self.learners.get(learnerid, default)
+
+    def __contains__(self, learnerid):
+        return learnerid in self.learners
+
+    def __len__(self):
+        return len(self.learners)
+
+
+@WithRepr
+class LearnerChange(object):
+    """
+    A change of a learner; attributes left to None are not changed.
+    """
+
+    def __init__(self, learnerid, fname=None, lname=None, email=None, newid=None):
+        self.fname = fname
+        self.lname = lname
+        self.email = email
+        self.newid = newid
+        self.learnerid = learnerid
+
+    def merge(self, other):
+        for name in ('fname', 'lname', 'email', 'newid'):
+            value = getattr(other, name)
+            if value is not None:
+                setattr(self, name, value)
+        return self
+
+    def noop(self, learner):
+        """
+        Return whether applying this change to the :class:`LearnerInfo`
+        would change nothing.
+        """
+        return  (self.fname is None or self.fname == learner.firstName) \
+            and (self.lname is None or self.lname == learner.lastName) \
+            and (self.email is None or self.email == learner.email) \
+            and (self.newid is None or self.newid == self.learnerid)
+
+
+@WithRepr
+class LearnerUpdateResult(object):
+
+    def __init__(self, learnerid, status, change=None, error=None):
+        self.error = error
+        self.change = change
+        self.status = status
+        self.learnerid = learnerid
+
+
+def _as_change(item):
+    if isinstance(item, LearnerChange):
+        return item
+    return LearnerChange(**item)
+
+
+def update_learners(service, changes, snapshot=None, max_workers=8, rate=10):
+    """
+    Apply many learner changes.
+
+    :param service: the :class:`.ScormCloudService`
+    :param changes: an iterable of :class:`LearnerChange` or of mappings with
+        ``learnerid`` and the optional ``fname``, ``lname``, ``email`` and
+        ``newid`` keys; changes of the same learner are merged
+    :param snapshot: (optional) a :class:`LearnerSnapshot` used to skip the
+        changes that change nothing and to complete the names;
+        updated with the applied changes
+    :param max_workers: the maximum number of concurrent requests
+    :param rate: the maximum number of requests per second
+    :return: an ordered mapping of learner ids to :class:`LearnerUpdateResult`
+    """
+    merged = OrderedDict()
+    for change in changes:
+        change = _as_change(change)
+        if change.learnerid in merged:
+            merged[change.learnerid].merge(change)
+        else:
+            merged[change.learnerid] = change
+
+    results = OrderedDict()
+    todo = []
+    for learnerid, change in merged.items():
+        learner = snapshot.get(learnerid) if snapshot is not None else None
+        if learner is not None:
+            if change.noop(learner):
+                results[learnerid] = LearnerUpdateResult(learnerid, UNCHANGED, change)
+                continue
+            # the service requires both names
+            if change.fname is None:
+                change.fname = learner.firstName
+            if change.lname is None:
+                change.lname = learner.lastName
+        if change.fname is None or change.lname is None:
+            results[learnerid] = LearnerUpdateResult(learnerid, FAILED, change,
+                                                     ValueError('Unknown learner name'))
+            continue
+        results[learnerid] = LearnerUpdateResult(learnerid, UPDATED, change)
+        todo.append(change)
+
+    registrations = service.get_registration_service()
+
+    def apply(change):
+        registrations.updateLearnerInfo(change.learnerid, change.fname, change.lname,
+                                        change.newid, change.email)
+    limiter = RateLimiter(rate) if rate else None
+    for call in run_concurrently(apply, todo, max_workers, limiter):
+        change = call.item
+        result = results[change.learnerid]
+        if not call.ok:
+            logger.warning('Cannot update learner %s: %s', change.learnerid, call.error)
+            result.status, result.error = FAILED, call.error
+        elif snapshot is not None:
+            learner = snapshot.learners.pop(change.learnerid, None) \
+                or LearnerInfo(change.learnerid)
+            learner.firstName, learner.lastName = change.fname, change.lname
+            learner.email = change.email or learner.email
+            learner.learnerId = change.newid or change.learnerid
+            snapshot.learners[learner.learnerId] = learner
+    return results
+
+
+def summarize(results):
+    """
+    Return the number of learner changes of each outcome.
+    """
+    summary = {}
+    for result in results.values():
+        summary[result.status] = summary.get(result.status, 0) + 1
+    return summary
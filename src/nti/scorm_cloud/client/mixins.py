@@ -39,6 +39,11 @@ class NodeMixin(object):
     def _node(self):
         return getattr(self, '_v_node', None)
 
+    def __getstate__(self):
+        # The source node is volatile, don't pickle it
+        return dict((k, v) for k, v in self.__dict__.items()
+                    if not k.startswith('_v_'))
+
 
 class RegistrationMixin(NodeMixin):
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Lazy, windowed iteration over date-ranged list endpoints.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import datetime
+import threading
+
+from six.moves import queue
+
+from nti.scorm_cloud.client.deadlines import propagating
+
+from nti.scorm_cloud.datetimes import parse_timestamp as _parse_timestamp
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The timestamp format the SCORM Cloud accepts for ``after``/``until``
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+_DONE = object()
+
+
+def format_timestamp(value):
+    """
+    Format a datetime as a SCORM Cloud UTC timestamp. Strings are
+    returned untouched.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(_UTC).replace(tzinfo=None)
+        return value.strftime(TIMESTAMP_FORMAT)
+    return value
+
+
+def parse_timestamp(value):
+    """
+    Return a naive UTC datetime for the given datetime or timestamp string.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime.datetime):
+        value = _parse_timestamp(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(_UTC).replace(tzinfo=None)
+    return value
+
+
+class _UTCZone(datetime.tzinfo):
+
+    def utcoffset(self, unused_dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, unused_dt):
+        return 'UTC'
+
+    def dst(self, unused_dt):
+        return datetime.timedelta(0)
+
+_UTC = _UTCZone()
+
+
+class AdaptiveWindowIterator(object):
+    """
+    Iterates the items of a date-ranged list endpoint by splitting the
+    ``[start, end]`` range into consecutive ``(after, until]`` windows.
+
+    The width of the next window adapts to the size of the last
+    response: it is halved when the response had more than twice
+    ``target_size`` items and doubled when it had less than half of
+    ``target_size``, always staying between ``min_window`` and
+    ``max_window``.
+
+    Windows are fetched ahead of the consumer by a background thread,
+    holding at most ``prefetch`` fetched windows in memory, so network
+    time overlaps with processing.
+
+    :param fetch: callable of ``(after, until)`` returning a list of items;
+        both arguments are SCORM Cloud timestamp strings
+    """
+
+    def __init__(self, fetch, start, end=None, window=datetime.timedelta(days=1),
+                 min_window=datetime.timedelta(minutes=1),
+                 max_window=datetime.timedelta(days=30),
+                 target_size=500, prefetch=2):
+        assert target_size > 0 and prefetch > 0
+        self.fetch = fetch
+        self.prefetch = prefetch
+        self.target_size = target_size
+        self.start = parse_timestamp(start)
+        self.end = parse_timestamp(end) or datetime.datetime.utcnow()
+        self.min_window = min_window
+        self.max_window = max_window
+        self.window = min(max(window, min_window), max_window)
+
+    def next_window(self, window, count):
+        """
+        Return the width of the window following one of the given
+        ``window`` width that returned ``count`` items.
+        """
+        if count > self.target_size * 2:
+            window = window // 2
+        elif count < self.target_size // 2:
+            window = window * 2
+        return min(max(window, self.min_window), self.max_window)
+
+    def windows(self):
+        """
+        Fetch every window in turn, yielding ``(after, until, items)``.
+        """
+        window = self.window
+        after = self.start
+        while after < self.end:
+            until = min(after + window, self.end)
+            items = self.fetch(format_timestamp(after), format_timestamp(until))
+            yield after, until, items
+            window = self.next_window(window, len(items))
+            after = until
+
+    @staticmethod
+    def _put(results, stopped, item):
+        # give up once the consumer is gone
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self, results, stopped):
+        try:
+            for window in self.windows():
+                if not self._put(results, stopped, window):
+                    return
+            self._put(results, stopped, _DONE)
+        except Exception as e:  # pylint: disable=broad-except
+            self._put(results, stopped, e)
+
+    def __iter__(self):
+        stopped = threading.Event()
+        results = queue.Queue(maxsize=self.prefetch)
+        # the windows are fetched under the deadline of the consumer
+        producer = threading.Thread(target=propagating(self._produce),
+                                    args=(results, stopped),
+                                    name='scorm-cloud-window-prefetch')
+        producer.daemon = True
+        producer.start()
+        try:
+            while True:
+                window = results.get()
+                if window is _DONE:
+                    break
+                if isinstance(window, Exception):
+                    raise window
+                after, until, items = window
+                logger.debug('Fetched %s item(s) from %s to %s',
+                             len(items), after, until)
+                for item in items:
+                    yield item
+                del items, window
+        finally:
+            stopped.set()
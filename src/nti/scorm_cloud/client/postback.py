@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A WSGI application receiving the registration results SCORM Cloud posts
+to the ``postbackurl`` of registrations, and a manager to change the
+postback settings of many registrations.
+
+SCORM Cloud posts a form with the registration report XML in its ``data``
+field, authenticated with the ``urlname`` and ``urlpass`` of the
+registration, either as ``username`` and ``password`` form fields
+(``form`` authtype) or with HTTP basic authentication (``httpbasic``).
+Parsed reports are put on a bounded queue; when the queue is full the
+application answers 503 so SCORM Cloud retries the postback later.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import os
+import hmac
+import json
+import time
+import base64
+import binascii
+import tempfile
+from xml.dom import minidom
+from xml.parsers.expat import ExpatError
+
+from six.moves import queue
+from six.moves import urllib_parse
+
+from nti.scorm_cloud.compat import bytes_
+from nti.scorm_cloud.compat import native_
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+from nti.scorm_cloud.client.mixins import WithRepr
+
+from nti.scorm_cloud.client.registration import RegistrationReport
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The postback authentication types
+FORM = 'form'
+HTTPBASIC = 'httpbasic'
+
+
+@WithRepr
+class Postback(object):
+    """
+    A registration report received from SCORM Cloud.
+    """
+
+    def __init__(self, report, data=None, received=None):
+        self.data = data
+        self.report = report
+        self.received = time.time() if received is None else received
+
+    @property
+    def regid(self):
+        return self.report.regid
+
+
+def parse_postback(data):
+    """
+    Parse the posted registration report XML into a
+    :class:`.RegistrationReport`, or return None.
+    """
+    nodes = minidom.parseString(bytes_(data)).getElementsByTagName('registrationreport')
+    return RegistrationReport.fromMinidom(nodes[0]) if nodes else None
+
+
+def _equals(a, b):
+    return hmac.compare_digest(bytes_(a or ''), bytes_(b or ''))
+
+
+class PostbackApplication(object):
+    """
+    A WSGI application queuing the registration reports posted by
+    SCORM Cloud.
+
+    :param authtype: (optional) ``form`` or ``httpbasic``; postbacks are not
+        authenticated if not given
+    :param urlname: the login name postbacks must present
+    :param urlpass: the password postbacks must present
+    :param queue: (optional) the queue receiving the :class:`Postback`
+        objects, a bounded queue of ``maxsize`` by default
+    :param maxsize: the size of the default queue
+    :param max_content_length: the largest postback accepted, in bytes
+    """
+
+    realm = 'SCORM Cloud postback'
+
+    def __init__(self, authtype=None, urlname=None, urlpass=None, queue=None,
+                 maxsize=1000, max_content_length=10 * 1024 * 1024):
+        if authtype not in (None, FORM, HTTPBASIC):
+            raise ValueError('Invalid postback authtype %r' % authtype)
+        self.authtype = authtype
+        self.urlname = urlname
+        self.urlpass = urlpass
+        self.max_content_length = max_content_length
+        self.queue = queue if queue is not None else self._queue(maxsize)
+
+    @staticmethod
+    def _queue(maxsize):
+        return queue.Queue(maxsize)
+
+    @classmethod
+    def fromPostbackInfo(cls, info, **kwargs):
+        """
+        Create an application authenticating postbacks as configured by
+        a :class:`.PostbackInfo`.
+        """
+        return cls(info.authtype or None, info.login, info.password, **kwargs)
+
+    def authenticate(self, environ, form):
+        if self.authtype == FORM:
+            return  _equals(form.get('username'), self.urlname) \
+                and _equals(form.get('password'), self.urlpass)
+        if self.authtype == HTTPBASIC:
+            header = environ.get('HTTP_AUTHORIZATION') or ''
+            scheme, _, credentials = header.partition(' ')
+            if scheme.lower() != 'basic':
+                return False
+            try:
+                credentials = base64.b64decode(bytes_(credentials.strip()))
+            except (TypeError, ValueError, binascii.Error):
+                return False
+            name, _, password = native_(credentials, 'utf-8').partition(':')
+            return _equals(name, self.urlname) and _equals(password, self.urlpass)
+        return True
+
+    def _read_form(self, environ):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > self.max_content_length:
+            return None
+        body = environ['wsgi.input'].read(length) if length else b''
+        form = urllib_parse.parse_qs(native_(body, 'utf-8'))
+        return dict((k, v[0]) for k, v in form.items())
+
+    def __call__(self, environ, start_response):
+        def respond(status, body=u'', headers=()):
+            body = bytes_(body)
+            start_response(status, [('Content-Type', 'text/plain; charset=utf-8'),
+                                    ('Content-Length', str(len(body)))]
+                           + list(headers))
+            return [body]
+
+        if environ.get('REQUEST_METHOD') != 'POST':
+            return respond('405 Method Not Allowed', headers=[('Allow', 'POST')])
+        form = self._read_form(environ)
+        if form is None:
+            return respond('413 Request Entity Too Large')
+        if not self.authenticate(environ, form):
+            headers = ()
+            if self.authtype == HTTPBASIC:
+                headers = [('WWW-Authenticate', 'Basic realm="%s"' % self.realm)]
+            return respond('401 Unauthorized', headers=headers)
+
+        data = form.get('data')
+        try:
+            report = parse_postback(data) if data else None
+        except ExpatError:
+            report = None
+        if report is None:
+            logger.warning('Invalid registration postback')
+            return respond('400 Bad Request')
+        try:
+            self.queue.put_nowait(Postback(report, data))
+        except queue.Full:
+            logger.warning('Postback queue full, rejecting %s', report.regid)
+            return respond('503 Service Unavailable', headers=[('Retry-After', '60')])
+        return respond('200 OK', u'OK')
+
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+@WithRepr
+class PostbackProgress(object):
+    """
+    The progress of a :class:`PostbackManager` run.
+
+    ``done`` holds the registrations checked (and updated if needed),
+    ``updated`` those that were updated and ``failed`` maps the
+    registrations that could not be checked or updated to their error.
+    """
+
+    def __init__(self, total=0, done=(), updated=(), failed=None):
+        self.total = total
+        self.done = set(done)
+        self.updated = set(updated)
+        self.failed = dict(failed or {})
+
+    @property
+    def remaining(self):
+        return max(self.total - len(self.done) - len(self.failed), 0)
+
+    def toDict(self):
+        return {'total': self.total,
+                'done': sorted(self.done),
+                'updated': sorted(self.updated),
+                'failed': self.failed}
+
+    @classmethod
+    def fromDict(cls, data):
+        return cls(data.get('total', 0), data.get('done', ()),
+                   data.get('updated', ()), data.get('failed'))
+
+
+class PostbackManager(object):
+    """
+    Point the postbacks of many registrations to a URL.
+
+    The current postback info of the registrations is fetched
+    concurrently and only the registrations whose URL or authentication
+    differ are updated. Progress is saved to the ``checkpoint`` file (if
+    any) after each chunk of registrations, so an interrupted run resumes
+    where it stopped; failed registrations are retried.
+
+    :param service: the :class:`.ScormCloudService`
+    :param url: the new postback URL
+    :param authtype: (optional) ``form`` or ``httpbasic``
+    :param login: (optional) the postback login name
+    :param password: (optional) the postback password
+    :param resultsformat: (optional) the results format sent on updates
+    :param checkpoint: (optional) the path of the progress file
+    :param max_workers: the maximum number of concurrent requests
+    :param rate: the maximum number of requests per second
+    :param chunk: the number of registrations between checkpoints
+    """
+
+    def __init__(self, service, url, authtype=None, login=None, password=None,
+                 resultsformat=None, checkpoint=None, max_workers=8, rate=10,
+                 chunk=100):
+        self.url = url
+        self.chunk = chunk
+        self.login = login
+        self.service = service
+        self.password = password
+        self.authtype = authtype
+        self.checkpoint = checkpoint
+        self.max_workers = max_workers
+        self.resultsformat = resultsformat
+        self.rate_limiter = RateLimiter(rate) if rate else None
+
+    @property
+    def registration_service(self):
+        return self.service.get_registration_service()
+
+    def select(self, courseid=None, learnerid=None, after=None, until=None):
+        """
+        Return the ids of the registrations of a course, a learner or
+        updated in a date window, without parsing the registrations.
+        """
+        request = self.service.request()
+        request.parameters['appid'] = self.service.config.appid
+        if courseid:
+            request.parameters['courseid'] = courseid
+        if learnerid:
+            request.parameters['learnerid'] = learnerid
+        if after:
+            request.parameters['after'] = after
+        if until:
+            request.parameters['until'] = until
+        response = request.call_service_raw('rustici.registration.getRegistrationList')
+        return response.keys('registration')
+
+    def differs(self, info):
+        """
+        Return whether the :class:`.PostbackInfo` of a registration must
+        be updated.
+        """
+        return info is None \
+            or (info.url or None) != self.url \
+            or (info.authtype or None) != self.authtype \
+            or (info.login or None) != self.login \
+            or (info.password or None) != self.password
+
+    def load(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as fp:
+                return PostbackProgress.fromDict(json.load(fp))
+        return PostbackProgress()
+
+    def save(self, progress):
+        if not self.checkpoint:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as fp:
+            json.dump(progress.toDict(), fp)
+        _replace(temp, self.checkpoint)
+
+    def _update(self, regid):
+        service = self.registration_service
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        info = service.getPostbackInfo(regid)
+        if not self.differs(info):
+            return False
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        service.updatePostbackInfo(regid, self.url, self.login, self.password,
+                                   self.authtype, self.resultsformat)
+        return True
+
+    def run(self, regids=None, progress=None, **selection):
+        """
+        Update the postback settings of the given registrations (or the
+        ones :meth:`select`-ed by ``selection``), skipping those already
+        done according to the checkpoint.
+
+        :param progress: (optional) called with the :class:`PostbackProgress`
+            after each chunk
+        :return: the :class:`PostbackProgress`
+        """
+        if regids is None:
+            regids = self.select(**selection)
+        regids = list(regids)
+        state = self.load()
+        state.total = len(regids)
+        todo = [r for r in regids if r not in state.done]
+        for start in range(0, len(todo), self.chunk):
+            chunk = todo[start:start + self.chunk]
+            for call in run_concurrently(self._update, chunk, self.max_workers):
+                if call.ok:
+                    state.done.add(call.item)
+                    state.failed.pop(call.item, None)
+                    if call.result:
+                        state.updated.add(call.item)
+                else:
+                    logger.warning('Cannot update the postback of %s: %s',
+                                   call.item, call.error)
+                    state.failed[call.item] = str(call.error)
+            self.save(state)
+            if progress is not None:
+                progress(state)
+        return state
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Field projection for the list endpoints.
+
+Rather than building a model object (and its nested objects) per list
+item, a :class:`Projection` extracts only the requested fields of each
+item with a single expat pass over the raw response, and returns them
+as lightweight :func:`collections.namedtuple` records. Elements that
+hold no requested field are tokenized but never built.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+from collections import namedtuple
+from xml.parsers import expat
+
+import six
+
+from nti.scorm_cloud.compat import bytes_
+
+from nti.scorm_cloud.client.request import ScormCloudError
+
+logger = __import__('logging').getLogger(__name__)
+
+#: Field sources
+ATTRIBUTE = 'attribute'
+TEXT = 'text'
+TEXTS = 'texts'
+
+
+def _true(value):
+    return value == 'true'
+
+
+def _or_none(value):
+    return value or None
+
+
+class _Scanner(object):
+    """
+    The expat handlers collecting the projected fields of the items.
+    """
+
+    def __init__(self, projection, fields):
+        self.tag = projection.tag
+        self.size = len(fields)
+        self.record = projection.record_type(fields)
+        self.lists = []
+        self.children = {}
+        self.attributes = []
+        self.converters = []
+        self.grandchildren = {}
+        for index, name in enumerate(fields):
+            source, path, converter = projection.fields[name]
+            if source == ATTRIBUTE:
+                self.attributes.append((path, index))
+            elif source == TEXT:
+                self.children[path] = index
+            else:
+                self.lists.append(index)
+                self.grandchildren[tuple(path.split('/'))] = index
+            if converter is not None:
+                self.converters.append((index, converter))
+        self.stat = None
+        self.depth = 0
+        self.text = []
+        self.values = None
+        self.parent = None
+        self.capture = None
+        self.capture_depth = 0
+        self.records = []
+
+    def start(self, name, attrs):
+        if self.stat is None:
+            self.stat = attrs.get('stat', '')
+        values = self.values
+        if values is None:
+            if name == self.tag:
+                values = self.values = [None] * self.size
+                for index in self.lists:
+                    values[index] = []
+                for attribute, index in self.attributes:
+                    values[index] = attrs.get(attribute)
+                self.depth = 1
+            return
+        self.depth += 1
+        if self.depth == 2:
+            self.parent = name
+            index = self.children.get(name)
+        elif self.depth == 3:
+            index = self.grandchildren.get((self.parent, name))
+        else:
+            return
+        if index is not None:
+            self.capture = index
+            self.capture_depth = self.depth
+            del self.text[:]
+
+    def end(self, unused_name):
+        values = self.values
+        if values is None:
+            return
+        index = self.capture
+        if index is not None and self.depth == self.capture_depth:
+            value = u''.join(self.text)
+            if isinstance(values[index], list):
+                values[index].append(value)
+            elif values[index] is None:
+                values[index] = value
+            self.capture = None
+        self.depth -= 1
+        if not self.depth:
+            for index, converter in self.converters:
+                values[index] = converter(values[index])
+            self.records.append(self.record(*values))
+            self.values = None
+
+    def data(self, value):
+        if self.capture is not None:
+            self.text.append(value)
+
+
+class Projection(object):
+    """
+    The projectable fields of the ``tag`` items of a list response.
+
+    :param tag: the name of the item elements
+    :param name: the name of the record types
+    :param fields: a mapping of field names to ``(source, path, converter)``
+        tuples; the source is :data:`ATTRIBUTE` (an attribute of the item),
+        :data:`TEXT` (the text of a child) or :data:`TEXTS` (the texts of
+        the ``child/grandchild`` elements, as a list)
+    """
+
+    def __init__(self, tag, name, fields):
+        self.tag = tag
+        self.name = name
+        self.fields = fields
+        self._types = {}
+
+    def record_type(self, fields):
+        """
+        Return the (cached) namedtuple type of records of ``fields``.
+        """
+        result = self._types.get(fields)
+        if result is None:
+            result = self._types[fields] = namedtuple(self.name, fields)
+        return result
+
+    def validate(self, fields):
+        if isinstance(fields, six.string_types):
+            fields = (fields,)
+        fields = tuple(fields)
+        unknown = [f for f in fields if f not in self.fields]
+        if unknown or not fields:
+            raise ValueError('Cannot project %s on %s; the fields are %s'
+                             % (', '.join(unknown) or 'nothing', self.tag,
+                                ', '.join(sorted(self.fields))))
+        return fields
+
+    def parse(self, raw, fields):
+        """
+        Return the records of ``fields`` of the items of the ``raw``
+        response, and the response status.
+        """
+        scanner = _Scanner(self, self.validate(fields))
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = scanner.start
+        parser.EndElementHandler = scanner.end
+        parser.CharacterDataHandler = scanner.data
+        parser.Parse(raw, True)
+        return scanner.records, scanner.stat
+
+    def __call__(self, request, method, fields):
+        """
+        Call ``method`` with the :class:`.ServiceRequest` and return the
+        records of ``fields`` of the items of the response.
+        """
+        cache = getattr(request.service, 'response_cache', None)
+        if cache is not None and cache.cacheable(method):
+            raw = request.call_service_raw(method).raw
+        else:
+            raw = bytes_(request.send_post(request.construct_url(method)))
+        try:
+            records, stat = self.parse(raw, fields)
+        except expat.ExpatError:
+            stat = None
+        if stat != 'ok':
+            if stat is not None:
+                request.get_xml(raw)  # raises the SCORM Cloud error
+            raise ScormCloudError('SCORM Cloud Error: invalid response')
+        return records
+
+
+REGISTRATION = Projection('registration', 'RegistrationRecord', dict(
+    (name, (TEXT, name, None))
+    for name in ('appId', 'registrationId', 'courseId', 'courseTitle',
+                 'lastCourseVersionLaunched', 'learnerId', 'learnerFirstName',
+                 'learnerLastName', 'email', 'createDate', 'firstAccessDate',
+                 'lastAccessDate', 'completedDate')))
+
+INVITATION = Projection('invitationInfo', 'InvitationRecord', {
+    'id': (TEXT, 'id', None),
+    'url': (TEXT, 'url', None),
+    'body': (TEXT, 'body', None),
+    'public': (TEXT, 'public', _true),
+    'created': (TEXT, 'created', _true),
+    'subject': (TEXT, 'subject', None),
+    'courseId': (TEXT, 'courseId', None),
+    'allowLaunch': (TEXT, 'allowLaunch', _true),
+    'createdDate': (TEXT, 'createdDate', None),
+    'allowNewRegistrations': (TEXT, 'allowNewRegistrations', _true),
+})
+
+COURSE = Projection('course', 'CourseRecord', {
+    'tags': (TEXTS, 'tags/tag', None),
+    'title': (ATTRIBUTE, 'title', None),
+    'courseId': (ATTRIBUTE, 'id', None),
+    'numberOfVersions': (ATTRIBUTE, 'versions', None),
+    'learningStandard': (TEXT, 'learningStandard', _or_none),
+    'numberOfRegistrations': (ATTRIBUTE, 'registrations', None),
+})
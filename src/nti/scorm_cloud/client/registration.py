@@ -14,13 +14,16 @@ from six.moves import urllib_parse
 
 from zope import interface
 
-from rustici_software_cloud_v2.api.registration_api import RegistrationApi as SCV2RegistrationApi
+from zope.event import notify
 
-from rustici_software_cloud_v2.models.launch_auth_schema import LaunchAuthSchema
+from nti.scorm_cloud.client.events import RegistrationCreatedEvent
+from nti.scorm_cloud.client.events import RegistrationDeletedEvent
 
-from rustici_software_cloud_v2.models.launch_link_request_schema import LaunchLinkRequestSchema
+from nti.scorm_cloud.client.lazy import Retained
+from nti.scorm_cloud.client.lazy import LazyAttribute
+from nti.scorm_cloud.client.lazy import LazyNodeMixin
 
-from rustici_software_cloud_v2.rest import ApiException
+from nti.scorm_cloud.client.learners import update_learners
 
 from nti.scorm_cloud.client.mixins import WithRepr
 from nti.scorm_cloud.client.mixins import NodeMixin
@@ -28,15 +31,27 @@ from nti.scorm_cloud.client.mixins import RegistrationMixin
 
 from nti.scorm_cloud.client.mixins import nodecapture
 
+from nti.scorm_cloud.client.paging import AdaptiveWindowIterator
+
+from nti.scorm_cloud.client.projection import REGISTRATION
+
 from nti.scorm_cloud.client.request import ScormCloudError
 
+from nti.scorm_cloud.client.streaming import iter_launches
+from nti.scorm_cloud.client.streaming import iter_runtime_events
+
+from nti.scorm_cloud.datetimes import parse_duration
+from nti.scorm_cloud.datetimes import parse_timestamp
+
 from nti.scorm_cloud.interfaces import IRegistrationService
 
 from nti.scorm_cloud.minidom import getChildren
+from nti.scorm_cloud.minidom import getAttributes
 from nti.scorm_cloud.minidom import getChildText
 from nti.scorm_cloud.minidom import getFirstChild
 from nti.scorm_cloud.minidom import getTextOrCDATA
 from nti.scorm_cloud.minidom import getAttributeValue
+from nti.scorm_cloud.minidom import getElementsByName
 from nti.scorm_cloud.minidom import getChildTextOrCDATA
 
 logger = __import__('logging').getLogger(__name__)
@@ -83,6 +98,7 @@ class RegistrationService(object):
         successNodes = xmldoc.getElementsByTagName('success')
         if not successNodes:
             raise ScormCloudError("Create Registration failed.")
+        notify(RegistrationCreatedEvent(self.service, regid, courseid))
         return regid
     create_registration = createRegistration
 
@@ -103,6 +119,7 @@ class RegistrationService(object):
         successNodes = xmldoc.getElementsByTagName('success')
         if not successNodes:
             raise ScormCloudError("Delete Registration failed.")
+        notify(RegistrationDeletedEvent(self.service, regid))
     delete_registration = deleteRegistration
 
     def resetRegistration(self, regid):
@@ -115,7 +132,8 @@ class RegistrationService(object):
             raise ScormCloudError("Reset Registration failed.")
     reset_registration = resetRegistration
 
-    def getRegistrationList(self, courseid=None, learnerid=None, after=None, until=None):
+    def getRegistrationList(self, courseid=None, learnerid=None, after=None, until=None,
+                            fields=None):
         request = self.service.request()
         request.parameters['appid'] = self.service.config.appid
         if courseid:
@@ -126,21 +144,61 @@ class RegistrationService(object):
             request.parameters['after'] = after
         if until:
             request.parameters['until'] = until
-        xmldoc = request.call_service('rustici.registration.getRegistrationList')
-        nodes = xmldoc.documentElement.getElementsByTagName('registration')
+        if fields:
+            return REGISTRATION(request, 'rustici.registration.getRegistrationList', fields)
+        rsp = request.call_service_element('rustici.registration.getRegistrationList')
+        nodes = getElementsByName(rsp, 'registration')
         return [Registration.fromMinidom(n) for n in nodes or ()]
     get_registration_list = getRegistrationList
 
+    def findRegistrations(self, regids, courseid=None, learnerid=None,
+                          after=None, until=None):
+        """
+        Return the registrations with the given ids out of the (possibly
+        cached) registration list, parsing only those registrations.
+        """
+        request = self.service.request()
+        request.parameters['appid'] = self.service.config.appid
+        if courseid:
+            request.parameters['courseid'] = courseid
+        if learnerid:
+            request.parameters['learnerid'] = learnerid
+        if after:
+            request.parameters['after'] = after
+        if until:
+            request.parameters['until'] = until
+        response = request.call_service_raw('rustici.registration.getRegistrationList')
+        return [Registration.fromMinidom(node)
+                for _, node in response.elements('registration', regids, request.parser)]
+    find_registrations = findRegistrations
+
+    def iterRegistrationList(self, after, until=None, courseid=None, learnerid=None,
+                             **kwargs):
+        """
+        Lazily iterate the registrations updated between ``after`` and
+        ``until`` (default now), fetching adaptive date windows ahead of
+        time in the background.
+
+        Extra keyword arguments are passed to
+        :class:`.AdaptiveWindowIterator`.
+        """
+        def fetch(window_after, window_until):
+            return self.getRegistrationList(courseid, learnerid,
+                                            window_after, window_until)
+        return iter(AdaptiveWindowIterator(fetch, after, until, **kwargs))
+    iter_registration_list = iterRegistrationList
+
     def getRegistrationDetail(self, regid):
         request = self.service.request()
         request.parameters['regid'] = regid
         request.parameters['appid'] = self.service.config.appid
-        xmldoc = request.call_service('rustici.registration.getRegistrationDetail')
-        nodes = xmldoc.getElementsByTagName('registration')
+        rsp = request.call_service_element('rustici.registration.getRegistrationDetail')
+        nodes = getElementsByName(rsp, 'registration')
         return Registration.fromMinidom(nodes[0]) if nodes else None
     get_registration_detail = getRegistrationDetail
 
-    def getRegistrationResult(self, regid, resultsformat=None, instanceid=None):
+    def getRegistrationResult(self, regid, resultsformat=None, instanceid=None,
+                              lazy=False):
         request = self.service.request()
         request.parameters['regid'] = regid
         request.parameters['appid'] = self.service.config.appid
@@ -148,8 +206,12 @@ class RegistrationService(object):
             request.parameters['instanceid'] = instanceid
         if resultsformat:
             request.parameters['resultsformat'] = resultsformat
-        xmldoc = request.call_service('rustici.registration.getRegistrationResult')
-        nodes = xmldoc.getElementsByTagName('registrationreport')
+        if lazy:
+            response = request.call_service_raw('rustici.registration.getRegistrationResult')
+            raw = response.fragment('registrationreport', 0)
+            return LazyRegistrationReport.fromBytes(raw) if raw else None
+        rsp = request.call_service_element('rustici.registration.getRegistrationResult')
+        nodes = getElementsByName(rsp, 'registrationreport')
         return RegistrationReport.fromMinidom(nodes[0]) if nodes else None
     get_registration_result = getRegistrationResult
 
@@ -165,6 +227,11 @@ class RegistrationService(object):
 
         https://cloud.scorm.com/docs/v2/reference/migration_guide/
         """
+        # The v2 SDK is slow to import, only load it when needed
+        from rustici_software_cloud_v2.api.registration_api import RegistrationApi as SCV2RegistrationApi
+        from rustici_software_cloud_v2.models.launch_auth_schema import LaunchAuthSchema
+        from rustici_software_cloud_v2.models.launch_link_request_schema import LaunchLinkRequestSchema
+        from rustici_software_cloud_v2.rest import ApiException
         if launchAuth is None:
             launchAuth = LaunchAuthSchema(type=launchAuthType)
         
@@ -182,8 +249,9 @@ class RegistrationService(object):
             launch_auth=launchAuth
         )
         try:
-            result = v2regservice.build_registration_launch_link(regid, 
-                                                                 launch_link_request)
+            result = self.service.request().call_v2(
+                'launch', v2regservice.build_registration_launch_link,
+                regid, launch_link_request)
         except ApiException as exc:
             logger.exception("Error while getting scorm launch url")
             raise ScormCloudError('Cannot get scorm launch url')
@@ -194,8 +262,8 @@ class RegistrationService(object):
         request = self.service.request()
         request.parameters['regid'] = regid
         request.parameters['appid'] = self.service.config.appid
-        xmldoc = request.call_service('rustici.registration.getLaunchHistory')
-        nodes = xmldoc.getElementsByTagName('launchhistory')
+        rsp = request.call_service_element('rustici.registration.getLaunchHistory')
+        nodes = getElementsByName(rsp, 'launchhistory')
         return LaunchHistory.fromMinidom(nodes[0]) if nodes else None
     get_launch_history = getLaunchHistory
 
@@ -203,11 +271,50 @@ class RegistrationService(object):
         request = self.service.request()
         request.parameters['launchid'] = launchid
         request.parameters['appid'] = self.service.config.appid
-        xmldoc = request.call_service('rustici.registration.getLaunchInfo')
-        nodes = xmldoc.getElementsByTagName('launch')
+        rsp = request.call_service_element('rustici.registration.getLaunchInfo')
+        nodes = getElementsByName(rsp, 'launch')
         return Launch.fromMinidom(nodes[0]) if nodes else None
     get_launch_info = getLaunchInfo
 
+    def iterLaunchHistory(self, regid):
+        """
+        Stream the launch history of the given registration, yielding a
+        compact :class:`.LaunchRecord` per launch.
+
+        The request is made when the iteration starts, and its response
+        is closed when the iteration ends or is closed.
+        """
+        request = self.service.request()
+        request.parameters['regid'] = regid
+        request.parameters['appid'] = self.service.config.appid
+        stream = request.call_service_stream('rustici.registration.getLaunchHistory')
+        try:
+            for record in iter_launches(stream):
+                yield record
+        finally:
+            stream.close()
+    iter_launch_history = iterLaunchHistory
+
+    def iterRuntimeEvents(self, launchid, events=None, start=None, end=None):
+        """
+        Stream the runtime log of the given launch, yielding a compact
+        :class:`.RuntimeEventRecord` per ``RuntimeEvent``, optionally
+        filtered by event type and time of day while parsing.
+
+        The request is made when the iteration starts, and its response
+        is closed when the iteration ends or is closed.
+        """
+        request = self.service.request()
+        request.parameters['launchid'] = launchid
+        request.parameters['appid'] = self.service.config.appid
+        stream = request.call_service_stream('rustici.registration.getLaunchInfo')
+        try:
+            for record in iter_runtime_events(stream, events, start, end):
+                yield record
+        finally:
+            stream.close()
+    iter_runtime_events = iterRuntimeEvents
+
     def resetGlobalObjectives(self, regid):
         request = self.service.request()
         request.parameters['regid'] = regid
@@ -234,12 +341,22 @@ class RegistrationService(object):
             raise ScormCloudError("Update learner information failed.")
     update_learner_info = updateLearnerInfo
 
+    def updateLearnerInfoMany(self, changes, snapshot=None, max_workers=8, rate=10):
+        """
+        Apply many learner changes concurrently, skipping those the
+        ``snapshot`` shows would change nothing.
+
+        See :func:`nti.scorm_cloud.client.learners.update_learners`.
+        """
+        return update_learners(self.service, changes, snapshot, max_workers, rate)
+    update_learner_info_many = updateLearnerInfoMany
+
     def getPostbackInfo(self, regid):
         request = self.service.request()
         request.parameters['regid'] = regid
         request.parameters['appid'] = self.service.config.appid
-        xmldoc = request.call_service('rustici.registration.getPostbackInfo')
-        nodes = xmldoc.getElementsByTagName('postbackinfo')
+        rsp = request.call_service_element('rustici.registration.getPostbackInfo')
+        nodes = getElementsByName(rsp, 'postbackinfo')
         return PostbackInfo.fromMinidom(nodes[0]) if nodes else None
     get_postback_info = getPostbackInfo
 
@@ -323,6 +440,10 @@ class Interaction(NodeMixin):
         self.learner_response = learner_response
         self.correct_responses = correct_responses
 
+    @property
+    def latency_seconds(self):
+        return parse_duration(self.latency)
+
     @classmethod
     @nodecapture
     def fromMinidom(cls, node):
@@ -417,13 +538,21 @@ class Runtime(NodeMixin):
         self.comments_from_lms = comments_from_lms
         self.comments_from_learner = comments_from_learner
 
+    @property
+    def total_time_seconds(self):
+        return parse_duration(self.total_time)
+
+    @property
+    def timetracked_seconds(self):
+        return parse_duration(self.timetracked)
+
     @classmethod
     @nodecapture
     def fromMinidom(cls, node):
         pref = getFirstChild(node, 'learnerpreference')
-        learnerpref = LearnerPreference.fromMinidom(pref) if pref else None
+        learnerpref = LearnerPreference.fromMinidom(pref) if pref is not None else None
         static = getFirstChild(node, 'static')
-        static = Static.fromMinidom(static) if pref else None
+        static = Static.fromMinidom(static) if static is not None else None
         comments_from_learner = []
         for n in getChildren(node, 'comments_from_learner', 'comment') or ():
             comments_from_learner.append(Comment.fromMinidom(n))
@@ -531,11 +660,15 @@ class RegistrationReport(RegistrationMixin):
         self.complete = complete
         self.totaltime = totaltime
 
+    @property
+    def totaltime_seconds(self):
+        return parse_duration(self.totaltime)
+
     @classmethod
     @nodecapture
     def fromMinidom(cls, node):
         activity = getFirstChild(node, 'activity')
-        activity = Activity.fromMinidom(activity) if activity else None
+        activity = Activity.fromMinidom(activity) if activity is not None else None
         return cls(getAttributeValue(node, 'format'),
                    getAttributeValue(node, 'regid'),
                    getAttributeValue(node, 'instanceid'),
@@ -606,6 +739,10 @@ class Activity(NodeMixin):
         self.objectives = objectives
         self.progressstatus = progressstatus
 
+    @property
+    def time_seconds(self):
+        return parse_duration(self.time)
+
     @classmethod
     @nodecapture
     def fromMinidom(cls, node):
@@ -616,7 +753,7 @@ class Activity(NodeMixin):
         for n in getChildren(node, 'children', 'activity') or ():
             children.append(Activity.fromMinidom(n))
         runtime = getFirstChild(node, 'runtime')
-        runtime = Runtime.fromMinidom(runtime) if runtime else None
+        runtime = Runtime.fromMinidom(runtime) if runtime is not None else None
         return cls(getAttributeValue(node, 'id'),
                    getChildText(node, 'title'),
                    getChildText(node, 'complete'),
@@ -633,6 +770,139 @@ class Activity(NodeMixin):
                    runtime)
 
 
+@WithRepr
+class LazyRuntime(LazyNodeMixin, Runtime):
+    """
+    A :class:`Runtime` whose learner preference, static data, comments,
+    interactions and objectives are parsed on first access.
+    """
+
+    def __init__(self, retained):
+        LazyNodeMixin.__init__(self, retained)
+        field = retained.field
+        self.mode = field('mode')
+        self.exit = field('exit')
+        self.entry = field('entry')
+        self.credit = field('credit')
+        self.location = field('location')
+        self.score_raw = field('score_raw')
+        self.total_time = field('total_time')
+        self.timetracked = field('timetracked')
+        self.score_scaled = field('score_scaled')
+        self.suspend_data = field('suspend_data')
+        self.success_status = field('success_status')
+        self.progress_measure = field('progress_measure')
+        self.completion_status = field('completion_status')
+
+    @classmethod
+    def fromBytes(cls, raw):
+        return cls(Retained(raw))
+
+    @LazyAttribute
+    def learnerpreference(self):
+        node = self._v_retained.node('learnerpreference')
+        return LearnerPreference.fromMinidom(node) if node is not None else None
+
+    @LazyAttribute
+    def static(self):
+        node = self._v_retained.node('static')
+        return Static.fromMinidom(node) if node is not None else None
+
+    @LazyAttribute
+    def comments_from_learner(self):
+        nodes = self._v_retained.nodes('comments_from_learner/comment')
+        return [Comment.fromMinidom(n) for n in nodes] or ()
+
+    @LazyAttribute
+    def comments_from_lms(self):
+        nodes = self._v_retained.nodes('comments_from_lms/comment')
+        return [Comment.fromMinidom(n) for n in nodes] or ()
+
+    @LazyAttribute
+    def interactions(self):
+        nodes = self._v_retained.nodes('interactions/interaction')
+        return [Interaction.fromMinidom(n) for n in nodes] or ()
+
+    @LazyAttribute
+    def objectives(self):
+        nodes = self._v_retained.nodes('objectives/objective')
+        return [Objective.fromMinidom(n) for n in nodes] or ()
+
+
+@WithRepr
+class LazyActivity(LazyNodeMixin, Activity):
+    """
+    An :class:`Activity` whose objectives, children and runtime are
+    parsed on first access.
+    """
+
+    def __init__(self, retained):
+        LazyNodeMixin.__init__(self, retained)
+        field = retained.field
+        self.id = retained.attribute('id')
+        self.time = field('time')
+        self.title = field('title')
+        self.score = field('score')
+        self.success = field('success')
+        self.complete = field('complete')
+        self.attempts = int(field('attempts') or '0')
+        self.suspended = field('suspended') == 'true'
+        self.completed = field('completed') == 'true'
+        self.satisfied = field('satisfied') == 'true'
+        self.progressstatus = field('progressstatus') == 'true'
+
+    @classmethod
+    def fromBytes(cls, raw):
+        return cls(Retained(raw))
+
+    @LazyAttribute
+    def objectives(self):
+        nodes = self._v_retained.nodes('objectives/objective')
+        return [Objective.fromMinidom(n) for n in nodes] or ()
+
+    @LazyAttribute
+    def children(self):
+        fragments = self._v_retained.fragments('children/activity')
+        return [LazyActivity.fromBytes(f) for f in fragments] or ()
+
+    @LazyAttribute
+    def runtime(self):
+        fragments = self._v_retained.fragments('runtime')
+        return LazyRuntime.fromBytes(fragments[0]) if fragments else None
+
+
+@WithRepr
+class LazyRegistrationReport(LazyNodeMixin, RegistrationReport):
+    """
+    A :class:`RegistrationReport` whose activity tree is parsed on first
+    access. Creating it only scans the report up to its activity.
+    """
+
+    def __init__(self, retained):
+        LazyNodeMixin.__init__(self, retained)
+        RegistrationMixin.__init__(self, retained.attribute('format'),
+                                   retained.attribute('regid'),
+                                   retained.attribute('instanceid'))
+        field = retained.field
+        self.score = field('score')
+        self.success = field('success')
+        self.complete = field('complete')
+        self.totaltime = field('totaltime')
+
+    @classmethod
+    def fromBytes(cls, raw):
+        """
+        Create a report from the raw bytes of a ``registrationreport``
+        element.
+        """
+        return cls(Retained(raw, stop=('activity',)))
+
+    @LazyAttribute
+    def activity(self):
+        fragments = self._v_retained.fragments('activity')
+        return LazyActivity.fromBytes(fragments[0]) if fragments else None
+
+
 @WithRepr
 class RuntimeEvent(NodeMixin):
 
@@ -644,7 +914,7 @@ class RuntimeEvent(NodeMixin):
     @nodecapture
     def fromMinidom(cls, node):
         values = {}
-        for name, value in node.attributes.items():
+        for name, value in getAttributes(node):
             values[name] = value
         return cls(**values)
 
@@ -661,10 +931,10 @@ class RuntimeLog(NodeMixin):
     @nodecapture
     def fromMinidom(cls, node):
         values = {}
-        for name, value in node.attributes.items():
+        for name, value in getAttributes(node):
             values[name] = value
         events = []
-        for n in node.getElementsByTagName("RuntimeEvent") or ():
+        for n in getElementsByName(node, "RuntimeEvent") or ():
             events.append(RuntimeEvent.fromMinidom(n))
         return cls(events or (), **values)
 
@@ -686,12 +956,24 @@ class Launch(NodeMixin):
         self.normalized_measure = normalized_measure
         self.experienced_duration_tracked = experienced_duration_tracked
 
+    @property
+    def launch_datetime(self):
+        return parse_timestamp(self.launch_time)
+
+    @property
+    def exit_datetime(self):
+        return parse_timestamp(self.exit_time)
+
+    @property
+    def update_datetime(self):
+        return parse_timestamp(self.update_dt)
+
     @classmethod
     @nodecapture
     def fromMinidom(cls, node):
         log = getFirstChild(node, 'log')
-        runtimelog = getFirstChild(log, 'RuntimeLog') if log else None
-        runtimelog = RuntimeLog.fromMinidom(runtimelog) if runtimelog else None
+        runtimelog = getFirstChild(log, 'RuntimeLog') if log is not None else None
+        runtimelog = RuntimeLog.fromMinidom(runtimelog) if runtimelog is not None else None
         return cls(getAttributeValue(node, 'id'),
                    getChildText(node, 'completion'),
                    getChildText(node, 'satisfaction'),
@@ -715,7 +997,7 @@ class LaunchHistory(NodeMixin):
     @nodecapture
     def fromMinidom(cls, node):
         launches = []
-        for n in node.getElementsByTagName("launch") or ():
+        for n in getElementsByName(node, "launch") or ():
             launches.append(Launch.fromMinidom(n))
         return cls(getAttributeValue(node, 'regid'),
                    launches or ())
@@ -63,7 +63,7 @@ class AccountInfo(object):
         self._node = node
 
         usage_dom = getFirstChild(node, 'usage')
-        self.usage = AccountUsageInfo.createFromMinidom(usage_dom) if usage_dom else None
+        self.usage = AccountUsageInfo.createFromMinidom(usage_dom) if usage_dom is not None else None
 
         self.email = getChildText(node, 'email')
         self.firstname = getChildText(node, 'firstname')
@@ -19,14 +19,18 @@ from six.moves import urllib_parse
 
 from requests import Session
 
+from requests.exceptions import Timeout
 from requests.exceptions import RequestException
 
-from nti.common.iterables import is_nonstr_iterable
+from nti.scorm_cloud.client.deadlines import remaining
 
 from nti.scorm_cloud.compat import bytes_
 from nti.scorm_cloud.compat import native_
 
 from nti.scorm_cloud.minidom import getAttributeValue
+from nti.scorm_cloud.minidom import getChildNodesByName
+
+from nti.scorm_cloud.parsers import get_parser
 
 logger = __import__('logging').getLogger(__name__)
 
@@ -38,6 +42,7 @@ def make_utf8(dictionary):
 
     Returns a copy of the dictionary, doesn't touch the original.
     """
+    from nti.common.iterables import is_nonstr_iterable
     result = {}
     for key, value in dictionary.items():
         if isinstance(value, text_type):
@@ -62,6 +67,71 @@ class ScormUpdateError(ScormCloudError):
     pass
 
 
+class ScormCloudTimeoutError(ScormCloudError):
+    """
+    A call timed out, or was not made (``sent`` is False) because its
+    deadline had passed.
+    """
+
+    def __init__(self, msg, code=None, json=None, sent=True):
+        ScormCloudError.__init__(self, msg, code, json)
+        self.sent = sent
+
+
+class CircuitOpenError(ScormCloudError):
+    """
+    A call was not made because the circuit of its family is open (see
+    :mod:`nti.scorm_cloud.client.breaker`), for ``retry_after`` more
+    seconds.
+    """
+
+    def __init__(self, msg, code=None, json=None, retry_after=None):
+        ScormCloudError.__init__(self, msg, code, json)
+        self.retry_after = retry_after
+
+
+def _method_of(url):
+    query = urllib_parse.urlsplit(url).query
+    return urllib_parse.parse_qs(query).get('method', [None])[0]
+
+
+class _NoContext(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *unused_exc_info):
+        pass
+
+
+_NO_CONTEXT = _NoContext()
+
+
+class _ResponseStream(object):
+    """
+    The body of a streamed response, closing the response, and so
+    releasing its connection, when closed.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self.raw = response.raw
+        if hasattr(self.raw, 'decode_content'):
+            self.raw.decode_content = True
+
+    def read(self, *args):
+        return self.raw.read(*args)
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *unused_exc_info):
+        self.close()
+
+
 class ServiceRequest(object):
     """
     Helper object that handles the details of web service URLs and parameter
@@ -72,6 +142,9 @@ class ServiceRequest(object):
 
     def __init__(self, service):
         self.file_ = None
+        # (optional) the timeout of this call, in seconds, or a
+        # (connect, read) tuple, overriding those of the configuration
+        self.timeout = None
         self.service = service
         self.parameters = dict()
 
@@ -90,6 +163,10 @@ class ServiceRequest(object):
         :type serviceurl: dict
         """
 
+        cache = getattr(self.service, 'response_cache', None)
+        if      cache is not None and postparams is None \
+            and self.file_ is None and cache.cacheable(method):
+            return self.call_service_raw(method, serviceurl).document()
         url = self.construct_url(method, serviceurl)
         rawresponse = self.send_post(url, postparams)
         try:
@@ -99,6 +176,138 @@ class ServiceRequest(object):
             response = rawresponse
         return response
 
+    def call_service_raw(self, method, serviceurl=None):
+        """
+        Calls the specified web service method using any parameters set on the
+        ServiceRequest, returning a :class:`.CachedResponse` holding the raw
+        response and the offsets of its indexed elements.
+
+        The response is served from and stored in the service
+        ``response_cache``, if any and if the method is cacheable.
+
+        :param method: the full name of the web service method to call.
+            For example: rustici.registration.getRegistrationList
+        :param serviceurl: (optional) used to override the service host URL for a
+            single call
+        :type method: str
+        :type serviceurl: str
+        """
+        from nti.scorm_cloud.client.cache import cache_key
+        from nti.scorm_cloud.client.cache import index_elements
+        from nti.scorm_cloud.client.cache import CachedResponse
+        cache = getattr(self.service, 'response_cache', None)
+        if cache is not None and not cache.cacheable(method):
+            cache = None
+        if cache is not None:
+            key = cache_key(method, self.parameters, self.service.config.appid,
+                            serviceurl or self.service.config.serviceurl)
+            response = cache.get(key)
+            if response is not None:
+                return response
+        try:
+            raw = bytes_(self.send_post(self.construct_url(method, serviceurl)))
+        except CircuitOpenError:
+            response = cache.get(key, stale=True) if cache is not None else None
+            if response is None:
+                raise
+            logger.info('Serving a cached %s response, its circuit is open', method)
+            return response
+        try:
+            stat, index = index_elements(raw)
+        except ExpatError:
+            stat = None
+        if stat != 'ok':
+            if stat is not None:
+                self.get_xml(raw)  # raises the SCORM Cloud error
+            raise ScormCloudError('SCORM Cloud Error: invalid response')
+        response = CachedResponse.fromRaw(raw, index)
+        if cache is not None:
+            cache.set(key, response)
+        return response
+
+    @property
+    def parser(self):
+        """
+        The parser backend of the service.
+        """
+        return get_parser(getattr(self.service, 'parser', None))
+
+    def call_service_element(self, method, serviceurl=None):
+        """
+        Calls the specified web service method using any parameters set on the
+        ServiceRequest, returning the ``rsp`` root element of the response as
+        parsed by the service parser backend (see :mod:`nti.scorm_cloud.parsers`).
+
+        The response is served from and stored in the service
+        ``response_cache``, if any and if the method is cacheable.
+
+        :param method: the full name of the web service method to call.
+            For example: rustici.registration.getRegistrationResult
+        :param serviceurl: (optional) used to override the service host URL for a
+            single call
+        :type method: str
+        :type serviceurl: str
+        """
+        cache = getattr(self.service, 'response_cache', None)
+        if cache is not None and cache.cacheable(method):
+            raw = self.call_service_raw(method, serviceurl).raw
+        else:
+            raw = self.send_post(self.construct_url(method, serviceurl))
+        return self.get_element(raw)
+
+    def get_element(self, raw):
+        """
+        Parses the raw response string with the service parser backend and
+        asserts that there was no error in the result.
+
+        :param raw: the raw response string from an API method call
+        :type raw: str
+        """
+        parser = self.parser
+        try:
+            rsp = parser.parse(raw)
+        except parser.errors:
+            logger.info(u'rawresponse could not be decoded into XML')
+            raise ScormCloudError('SCORM Cloud Error: invalid response')
+        if getAttributeValue(rsp, 'stat') != 'ok':
+            err = getChildNodesByName(rsp, '*')
+            err = err[0] if err else rsp
+            msg = getAttributeValue(err, 'msg')
+            code = getAttributeValue(err, 'code')
+            raise ScormCloudError(msg='SCORM Cloud Error: %s - %s' % (code, msg),
+                                  code=code, json=msg)
+        return rsp
+
+    def call_service_stream(self, method, serviceurl=None):
+        """
+        Calls the specified web service method using any parameters set on the
+        ServiceRequest, returning a file-like object over the (undecoded)
+        response body so it can be parsed incrementally. Closing it closes
+        the response and releases its connection.
+
+        :param method: the full name of the web service method to call.
+            For example: rustici.registration.getLaunchInfo
+        :param serviceurl: (optional) used to override the service host URL for a
+            single call
+        :type method: str
+        :type serviceurl: str
+        """
+        url = self.construct_url(method, serviceurl)
+        timeout = self.timeouts()
+        with self.guarded(method):
+            with self.in_flight():
+                try:
+                    response = self.session().get(url, stream=True, timeout=timeout)
+                except Timeout as exc:
+                    raise ScormCloudTimeoutError('SCORM Cloud Error: %s' % exc)
+            try:
+                response.raise_for_status()
+            except RequestException as exc:
+                response.close()
+                logger.warn('HTTP error while posting to scorm cloud (%s)', exc)
+                raise ScormUpdateError(str(exc))
+        return _ResponseStream(response)
+
     def construct_url(self, method, serviceurl=None):
         """
         Gets the full URL for a Cloud web service call, including parameters.
@@ -145,12 +354,73 @@ class ServiceRequest(object):
         return xmldoc
 
     def session(self):
-        result = Session()
+        get_session = getattr(self.service, 'get_session', None)
+        result = get_session() if get_session is not None else Session()
         return result
 
+    def in_flight(self):
+        """
+        Return the context manager to make a call in, holding a slot of
+        the service ``concurrency_limit``, if any.
+        """
+        limit = getattr(self.service, 'concurrency_limit', None)
+        return limit if limit is not None else _NO_CONTEXT
+
+    def guarded(self, method):
+        """
+        Return the context manager to make a call of ``method`` in, its
+        circuit breaker in the service ``circuit_breakers``, if any.
+        """
+        breakers = getattr(self.service, 'circuit_breakers', None)
+        guard = breakers.guard(method) if breakers is not None and method else None
+        return guard if guard is not None else _NO_CONTEXT
+
+    def timeouts(self):
+        """
+        Return the ``(connect, read)`` timeouts of the next call, in
+        seconds, capped by the time left before the current deadline.
+
+        :raises ScormCloudTimeoutError: if the deadline has passed
+        """
+        timeout = self.timeout
+        if timeout is None:
+            config = self.service.config
+            timeout = (getattr(config, 'connect_timeout', None),
+                       getattr(config, 'read_timeout', None))
+        elif not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        left = remaining()
+        if left is not None:
+            if left <= 0:
+                raise ScormCloudTimeoutError('SCORM Cloud Error: deadline exceeded',
+                                             sent=False)
+            timeout = tuple(left if t is None else min(t, left) for t in timeout)
+        return timeout
+
+    def call_v2(self, family, func, *args, **kwargs):
+        """
+        Call the v2 SDK method ``func`` with the timeouts of this request,
+        through the circuit breaker of the calls of ``family``.
+
+        :raises ScormCloudTimeoutError: if the call times out
+        """
+        from urllib3.exceptions import MaxRetryError
+        from urllib3.exceptions import TimeoutError as Urllib3TimeoutError
+        kwargs['_request_timeout'] = self.timeouts()
+        with self.guarded(family):
+            with self.in_flight():
+                try:
+                    return func(*args, **kwargs)
+                except (Urllib3TimeoutError, MaxRetryError) as exc:
+                    if     isinstance(exc, MaxRetryError) \
+                       and not isinstance(exc.reason, Urllib3TimeoutError):
+                        raise
+                    logger.warn('Timeout while calling scorm cloud (%s)', exc)
+                    raise ScormCloudTimeoutError('SCORM Cloud Error: %s' % exc)
+
     def send_post(self, url, postparams=None):
         """
-        Send request
+        Send request, through the circuit breaker of the method of ``url``
 
         :param url: request URL
         :param postparams: (optional) POST request params
@@ -159,21 +429,28 @@ class ServiceRequest(object):
         """
 
         session = self.session()
-        if self.file_ is not None:
-            response = session.post(url, postparams,
-                                 files={u'file': self.file_})
-            reply = response.text
-        elif not postparams:
-            response = session.get(url)
-            reply = response.content
-        else:
-            response = session.post(url, postparams)
-            reply = response.text
-        try:
-            response.raise_for_status()
-        except RequestException as exc:
-            logger.warn('HTTP error while posting to scorm cloud (%s)', exc)
-            raise ScormUpdateError(exc.message)
+        timeout = self.timeouts()
+        with self.guarded(_method_of(url)):
+            with self.in_flight():
+                try:
+                    if self.file_ is not None:
+                        response = session.post(url, postparams, timeout=timeout,
+                                                files={u'file': self.file_})
+                        reply = response.text
+                    elif not postparams:
+                        response = session.get(url, timeout=timeout)
+                        reply = response.content
+                    else:
+                        response = session.post(url, postparams, timeout=timeout)
+                        reply = response.text
+                except Timeout as exc:
+                    logger.warn('Timeout while posting to scorm cloud (%s)', exc)
+                    raise ScormCloudTimeoutError('SCORM Cloud Error: %s' % exc)
+            try:
+                response.raise_for_status()
+            except RequestException as exc:
+                logger.warn('HTTP error while posting to scorm cloud (%s)', exc)
+                raise ScormUpdateError(str(exc))
         return reply
 
     def encode_and_sign(self, dictionary):
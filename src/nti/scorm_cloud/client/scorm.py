@@ -8,25 +8,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 
-from rustici_software_cloud_v2.configuration import Configuration as SCV2Configuration
-from rustici_software_cloud_v2.api_client import ApiClient as SCV2ApiClient
+import threading
 
 from zope import interface
 
-from nti.scorm_cloud.client import CourseService
-from nti.scorm_cloud.client import UploadService
-from nti.scorm_cloud.client import ServiceRequest
-from nti.scorm_cloud.client import ReportingService
-
 from nti.scorm_cloud.client.config import Configuration
 
-from nti.scorm_cloud.client.debug import DebugService
-
-from nti.scorm_cloud.client.invitation import InvitationService
-
-from nti.scorm_cloud.client.registration import RegistrationService
-
-from nti.scorm_cloud.client.tag import TagService
+from nti.scorm_cloud.compat import native_
 
 from nti.scorm_cloud.interfaces import IScormCloudService
 
@@ -36,13 +24,40 @@ logger = __import__('logging').getLogger(__name__)
 @interface.implementer(IScormCloudService)
 class ScormCloudService(object):
 
+    # The v2 SDK and the sub-services are imported on first use, most
+    # callers only need one or two of them and the SDK is slow to import.
+
     def __init__(self, configuration):
         self.config = configuration
-        self.v2config = SCV2Configuration()
-        self.v2config.username = self.config.appid
-        self.v2config.password = self.config.secret
+        self._v2config = None
+        # An optional IResponseCache for read-only calls
+        self.response_cache = None
+        # The name of the XML parser backend, the fastest available by default
+        self.parser = None
+        # An optional ConcurrencyLimit on the calls in flight
+        self.concurrency_limit = None
+        # Optional CircuitBreakers shedding the calls while the SCORM Cloud
+        # is degraded
+        self.circuit_breakers = None
+        self.executor = None
+        self._session = None
+        self._lock = threading.RLock()
         self.__handler_cache = {}
 
+    @property
+    def v2config(self):
+        if self._v2config is None:
+            from rustici_software_cloud_v2.configuration import Configuration as SCV2Configuration
+            v2config = SCV2Configuration()
+            v2config.username = self.config.appid
+            v2config.password = native_(self.config.secret, 'utf-8')
+            self._v2config = v2config
+        return self._v2config
+
+    @v2config.setter
+    def v2config(self, value):
+        self._v2config = value
+
     @classmethod
     def withconfig(cls, config):
         """
@@ -57,7 +72,8 @@ class ScormCloudService(object):
 
     @classmethod
     def withargs(cls, appid, secret, serviceurl,
-                 origin='rusticisoftware.pythonlibrary.2.0.0'):
+                 origin='rusticisoftware.pythonlibrary.2.0.0',
+                 connect_timeout=None, read_timeout=None):
         """
         Named constructor that creates a ScormCloudService with the specified
         configuration values.
@@ -70,39 +86,140 @@ class ScormCloudService(object):
             example, http://cloud.scorm.com/EngineWebServices
         origin -- the origin string for the application software using the
             API/Python client library
+        connect_timeout -- the default connect timeout of the requests, in
+            seconds
+        read_timeout -- the default read timeout of the requests, in seconds
         """
-        return cls(Configuration(appid, secret, serviceurl, origin))
+        return cls(Configuration(appid, secret, serviceurl, origin,
+                                 connect_timeout, read_timeout))
 
     def make_v2_api(self):
         # TODO should this be Lazy, or CachedProperty?
         # it wraps a ConnectionPool which could be useful to share
+        from rustici_software_cloud_v2.api_client import ApiClient as SCV2ApiClient
         return SCV2ApiClient(configuration=self.v2config)
 
     def get_tag_service(self):
+        from nti.scorm_cloud.client.tag import TagService
         return TagService(self)
 
     def get_course_service(self):
+        from nti.scorm_cloud.client.course import CourseService
         return CourseService(self)
 
     def get_debug_service(self):
+        from nti.scorm_cloud.client.debug import DebugService
         return DebugService(self)
 
     def get_registration_service(self):
+        from nti.scorm_cloud.client.registration import RegistrationService
         return RegistrationService(self)
 
     def get_invitation_service(self):
+        from nti.scorm_cloud.client.invitation import InvitationService
         return InvitationService(self)
 
     def get_reporting_service(self):
+        from nti.scorm_cloud.client.reporting import ReportingService
         return ReportingService(self)
 
     def get_upload_service(self):
+        from nti.scorm_cloud.client.course import UploadService
         return UploadService(self)
 
+    def get_session(self):
+        """
+        Return the :class:`requests.Session` shared by the calls of this
+        service, so that they reuse its pool of connections.
+        """
+        with self._lock:
+            if self._session is None:
+                from requests import Session
+                self._session = Session()
+                self._size_pool()
+            return self._session
+
+    def _size_pool(self):
+        # one connection per executor thread
+        from requests.adapters import HTTPAdapter
+        size = max(10, self.executor.max_workers if self.executor is not None else 0)
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def start_executor(self, max_workers=8, max_concurrency=None):
+        """
+        Create the managed :class:`.ServiceExecutor` of this service,
+        with ``max_workers`` threads, and cap the number of calls in
+        flight, from any thread, to ``max_concurrency`` (if given).
+        """
+        from nti.scorm_cloud.client.executor import ServiceExecutor
+        from nti.scorm_cloud.client.executor import ConcurrencyLimit
+        with self._lock:
+            if self.executor is not None:
+                raise ValueError('The executor is already started')
+            self.executor = ServiceExecutor(max_workers)
+            if max_concurrency:
+                self.concurrency_limit = ConcurrencyLimit(max_concurrency)
+            if self._session is not None:
+                self._size_pool()
+        return self.executor
+
+    def start_circuit_breakers(self, failure_threshold=5, reset_timeout=30,
+                               thresholds=None, families=None):
+        """
+        Guard the calls of this service with :class:`.CircuitBreakers`
+        opening after ``failure_threshold`` failures in a row and probed
+        with :meth:`.DebugService.ping` every ``reset_timeout`` seconds.
+        """
+        from nti.scorm_cloud.client.breaker import CircuitBreakers
+        probe = self.get_debug_service().ping
+        self.circuit_breakers = CircuitBreakers(failure_threshold, reset_timeout,
+                                                probe, thresholds, families)
+        return self.circuit_breakers
+
+    def _executor(self):
+        with self._lock:
+            if self.executor is None:
+                self.start_executor()
+            return self.executor
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Call the service method ``func`` with the given arguments in the
+        managed executor (started if needed) and return the future of
+        its result.
+        """
+        return self._executor().submit(func, *args, **kwargs)
+
+    def map(self, func, *iterables, **options):
+        """
+        Call the service method ``func`` with the arguments taken from
+        ``iterables`` in the managed executor (started if needed) and
+        yield its results in order.
+
+        See :meth:`.ServiceExecutor.map`.
+        """
+        return self._executor().map(func, *iterables, **options)
+
+    def shutdown(self, wait=True):
+        """
+        Shut the managed executor down, cancelling its pending calls, and
+        close the shared session.
+        """
+        with self._lock:
+            executor, self.executor = self.executor, None
+            session, self._session = self._session, None
+        if executor is not None:
+            executor.shutdown(wait)
+        if session is not None:
+            session.close()
+
     def request(self):
         """
         Convenience method to create a new ServiceRequest.
         """
+        from nti.scorm_cloud.client.request import ServiceRequest
         return ServiceRequest(self)
 
     def make_call(self, method):
@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compact, versioned binary serialization of parsed SCORM Cloud models,
+for sharing them through caches (memcached, redis) or with worker
+processes without re-parsing the XML.
+
+Every registered model class has a fixed field schema. Objects are
+encoded positionally as nested tuples of plain values and packed with
+`msgpack <https://msgpack.org>`_ when available, or :mod:`pickle`
+otherwise. The minidom source node is never serialized, so loaded
+objects have no ``_node``.
+
+*IMPORTANT* Payloads packed with pickle must only be loaded from
+trusted sources.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import struct
+import datetime
+
+from six.moves import cPickle as pickle
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+from nti.scorm_cloud.client.course import CourseData
+
+from nti.scorm_cloud.client.invitation import InvitationInfo
+from nti.scorm_cloud.client.invitation import UserInvitation
+from nti.scorm_cloud.client.invitation import RegistrationReport as InvitationRegistrationReport
+
+from nti.scorm_cloud.client.registration import Static
+from nti.scorm_cloud.client.registration import Comment
+from nti.scorm_cloud.client.registration import Runtime
+from nti.scorm_cloud.client.registration import Activity
+from nti.scorm_cloud.client.registration import Instance
+from nti.scorm_cloud.client.registration import Response
+from nti.scorm_cloud.client.registration import Objective
+from nti.scorm_cloud.client.registration import Interaction
+from nti.scorm_cloud.client.registration import LazyRuntime
+from nti.scorm_cloud.client.registration import LazyActivity
+from nti.scorm_cloud.client.registration import Registration
+from nti.scorm_cloud.client.registration import LearnerPreference
+from nti.scorm_cloud.client.registration import RegistrationReport
+from nti.scorm_cloud.client.registration import LazyRegistrationReport
+
+from nti.scorm_cloud.client.reporting import AccountInfo
+from nti.scorm_cloud.client.reporting import AccountUsageInfo
+
+from nti.scorm_cloud.datetimes import fixed_offset
+
+logger = __import__('logging').getLogger(__name__)
+
+#: Bump whenever a registered schema changes; older payloads are rejected
+SCHEMA_VERSION = 1
+
+MAGIC = b'NSC'
+
+PICKLE = b'p'
+MSGPACK = b'm'
+
+_HEADER = struct.Struct('!3sBc')
+
+#: Field kinds
+MODEL = 'model'
+MODELS = 'models'
+DATETIME = 'datetime'
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class SerializationError(ValueError):
+    """
+    Raised for payloads that cannot be loaded, including payloads
+    written with another :data:`SCHEMA_VERSION`.
+    """
+
+
+def _encode_datetime(value):
+    if value is None:
+        return None
+    offset = value.utcoffset()
+    if offset is not None:
+        naive = value.replace(tzinfo=None) - offset
+        offset = offset.days * 86400 + offset.seconds
+    else:
+        naive = value
+    delta = naive - _EPOCH
+    return (delta.days, delta.seconds, delta.microseconds, offset)
+
+
+def _decode_datetime(value):
+    if value is None:
+        return None
+    days, seconds, microseconds, offset = value
+    result = _EPOCH + datetime.timedelta(days, seconds, microseconds)
+    if offset is not None:
+        tz = fixed_offset(offset)
+        result = (result + datetime.timedelta(seconds=offset)).replace(tzinfo=tz)
+    return result
+
+
+class _Schema(object):
+
+    def __init__(self, cls, code, fields, defaults=None):
+        self.cls = cls
+        self.code = code
+        self.fields = fields
+        self.defaults = defaults or {}
+        self.names = tuple(f if isinstance(f, str) else f[0] for f in fields)
+
+    def compile(self):
+        encoders = []
+        decoders = []
+        for field in self.fields:
+            if isinstance(field, str):
+                encoders.append(None)
+                decoders.append(None)
+                continue
+            _, kind, target = (tuple(field) + (None,))[:3]
+            if kind == DATETIME:
+                encoders.append(_encode_datetime)
+                decoders.append(_decode_datetime)
+            elif kind == MODEL:
+                encoders.append(_model_encoder(target))
+                decoders.append(_model_decoder(target))
+            elif kind == MODELS:
+                encoders.append(_models_encoder(target))
+                decoders.append(_models_decoder(target))
+            else:
+                raise ValueError('Unknown field kind %s' % kind)
+        self.encoders = tuple(zip(self.names, encoders))
+        self.decoders = tuple(zip(self.names, decoders))
+
+    def encode(self, obj):
+        result = []
+        for name, encoder in self.encoders:
+            value = getattr(obj, name, None)
+            result.append(encoder(value) if encoder is not None else value)
+        return result
+
+    def decode(self, values):
+        cls = self.cls
+        obj = cls.__new__(cls)
+        state = obj.__dict__
+        if self.defaults:
+            state.update(self.defaults)
+        for (name, decoder), value in zip(self.decoders, values):
+            state[name] = decoder(value) if decoder is not None else value
+        return obj
+
+
+_SCHEMAS = {}
+_CODES = {}
+
+
+def _model_encoder(cls):
+    def encode(value):
+        return None if value is None else _SCHEMAS[cls].encode(value)
+    return encode
+
+
+def _model_decoder(cls):
+    def decode(values):
+        return None if values is None else _SCHEMAS[cls].decode(values)
+    return decode
+
+
+def _models_encoder(cls):
+    def encode(values):
+        schema = _SCHEMAS[cls]
+        return [schema.encode(v) for v in values or ()]
+    return encode
+
+
+def _models_decoder(cls):
+    def decode(values):
+        schema = _SCHEMAS[cls]
+        return [schema.decode(v) for v in values] if values else ()
+    return decode
+
+
+def register(cls, code, fields, defaults=None):
+    """
+    Register the serialization schema of a model class.
+
+    :param code: a short, unique string identifying the class in payloads
+    :param fields: a sequence of attribute names, or ``(name, kind[, cls])``
+        tuples where kind is one of :data:`MODEL`, :data:`MODELS` or
+        :data:`DATETIME`
+    :param defaults: (optional) extra attributes set on loaded objects
+    """
+    if code in _CODES and _CODES[code].cls is not cls:
+        raise ValueError('Duplicate serialization code %s' % code)
+    schema = _Schema(cls, code, fields, defaults)
+    _SCHEMAS[cls] = _CODES[code] = schema
+    schema.compile()
+    return schema
+
+
+def _pack(payload, codec):
+    if codec == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+
+
+def _unpack(body, codec):
+    if codec == MSGPACK:
+        if msgpack is None:
+            raise SerializationError('msgpack is not available')
+        return msgpack.unpackb(body, raw=False)
+    if codec == PICKLE:
+        return pickle.loads(body)
+    raise SerializationError('Unknown codec %r' % codec)
+
+
+def dumps(obj, codec=None):
+    """
+    Serialize a registered model object, or a list of objects of the same
+    registered class, to bytes.
+
+    :param codec: (optional) :data:`MSGPACK` or :data:`PICKLE`. Defaults
+        to msgpack when it is installed.
+    """
+    codec = codec or (MSGPACK if msgpack is not None else PICKLE)
+    many = isinstance(obj, (list, tuple))
+    items = obj if many else (obj,)
+    if not items:
+        payload = (None, True, ())
+    else:
+        try:
+            schema = _SCHEMAS[type(items[0])]
+        except KeyError:
+            raise TypeError('Cannot serialize %s' % type(items[0]).__name__)
+        payload = (schema.code, many, [schema.encode(item) for item in items])
+    return _HEADER.pack(MAGIC, SCHEMA_VERSION, codec) + _pack(payload, codec)
+
+
+def loads(data):
+    """
+    Load an object (or list of objects) serialized with :func:`dumps`.
+
+    :raises SerializationError: if the payload is invalid or was written
+        with a different :data:`SCHEMA_VERSION`
+    """
+    if len(data) < _HEADER.size:
+        raise SerializationError('Truncated payload')
+    magic, version, codec = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SerializationError('Not a serialized SCORM Cloud model')
+    if version != SCHEMA_VERSION:
+        raise SerializationError('Unsupported schema version %s' % version)
+    code, many, items = _unpack(data[_HEADER.size:], codec)
+    if code is None:
+        return []
+    try:
+        schema = _CODES[code]
+    except KeyError:
+        raise SerializationError('Unknown model code %s' % code)
+    result = [schema.decode(item) for item in items]
+    return result if many else result[0]
+
+
+register(Response, 'response', ('id', 'value'))
+
+register(Comment, 'comment', ('value', 'location', 'date_time'))
+
+register(Objective, 'objective',
+         ('id', 'measurestatus', 'normalizedmeasure', 'progressstatus',
+          'satisfiedstatus', 'score_scaled', 'score_min', 'score_raw',
+          'success_status', 'completion_status', 'progress_measure',
+          'description'))
+
+register(Interaction, 'interaction',
+         ('id', 'timestamp', 'weighting', 'learner_response', 'result',
+          'latency', 'description',
+          ('objectives', MODELS, Objective),
+          ('correct_responses', MODELS, Response)))
+
+register(LearnerPreference, 'learnerpreference',
+         ('audio_level', 'language', 'delivery_speed', 'audio_captioning'))
+
+register(Static, 'static',
+         ('completion_threshold', 'launch_data', 'learner_id', 'learner_name',
+          'max_time_allowed', 'scaled_passing_score', 'time_limit_action'))
+
+register(Runtime, 'runtime',
+         ('completion_status', 'credit', 'entry', 'exit', 'location', 'mode',
+          'progress_measure', 'score_scaled', 'score_raw', 'total_time',
+          'timetracked', 'success_status', 'suspend_data',
+          ('learnerpreference', MODEL, LearnerPreference),
+          ('static', MODEL, Static),
+          ('comments_from_learner', MODELS, Comment),
+          ('comments_from_lms', MODELS, Comment),
+          ('interactions', MODELS, Interaction),
+          ('objectives', MODELS, Objective)))
+
+register(Activity, 'activity',
+         ('id', 'title', 'complete', 'success', 'satisfied', 'completed',
+          'progressstatus', 'attempts', 'suspended', 'time', 'score',
+          ('objectives', MODELS, Objective),
+          ('children', MODELS, Activity),
+          ('runtime', MODEL, Runtime)))
+
+register(RegistrationReport, 'report',
+         ('format', 'regid', 'instanceid', 'complete', 'success',
+          'totaltime', 'score',
+          ('activity', MODEL, Activity)))
+
+register(Instance, 'instance', ('instanceId', 'courseVersion', 'updateDate'))
+
+register(Registration, 'registration',
+         ('appId', 'registrationId', 'courseId', 'courseTitle',
+          'lastCourseVersionLaunched', 'learnerId', 'learnerFirstName',
+          'learnerLastName', 'email', 'createDate', 'firstAccessDate',
+          'lastAccessDate', 'completedDate',
+          ('instances', MODELS, Instance)))
+
+register(InvitationRegistrationReport, 'invitation.report',
+         ('format', 'regid', 'instanceid', 'complete', 'success',
+          'totaltime', 'score'))
+
+register(UserInvitation, 'invitation.user',
+         ('email', 'url', 'isStarted', 'registrationId',
+          ('registrationreport', MODEL, InvitationRegistrationReport)))
+
+register(InvitationInfo, 'invitation',
+         ('id', 'body', 'courseId', 'subject', 'url', 'allowLaunch',
+          'allowNewRegistrations', 'public', 'created', 'createdDate',
+          ('userInvitations', MODELS, UserInvitation)))
+
+register(CourseData, 'course',
+         ('courseId', 'title', 'numberOfVersions', 'numberOfRegistrations',
+          'tags', 'learningStandard'))
+
+register(AccountUsageInfo, 'account.usage',
+         ('reg_count', 'total_registrations', 'total_courses',
+          ('month_start', DATETIME)),
+         defaults={'_node': None})
+
+register(AccountInfo, 'account',
+         (('usage', MODEL, AccountUsageInfo),
+          'email', 'firstname', 'lastname', 'account_type', 'reg_limit',
+          'strict_limit',
+          ('create_date', DATETIME)),
+         defaults={'_node': None})
+
+# lazy models are serialized (fully parsed) as their eager class
+_SCHEMAS[LazyRuntime] = _SCHEMAS[Runtime]
+_SCHEMAS[LazyActivity] = _SCHEMAS[Activity]
+_SCHEMAS[LazyRegistrationReport] = _SCHEMAS[RegistrationReport]
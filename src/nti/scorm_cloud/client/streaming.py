@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Incremental parsing of large SCORM Cloud responses, such as
+debug-mode runtime logs, into compact records.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+try:
+    from xml.etree import cElementTree as ElementTree
+except ImportError:  # pragma: no cover
+    from xml.etree import ElementTree
+
+from nti.scorm_cloud.client.request import ScormCloudError
+
+logger = __import__('logging').getLogger(__name__)
+
+
+def iterparse_elements(stream, tags):
+    """
+    Incrementally parse a SCORM Cloud response from ``stream``, yielding
+    every completed element whose tag is in ``tags``.
+
+    Yielded elements are cleared and detached once the consumer moves on,
+    so memory use does not grow with the size of the response. The
+    ``stream`` is closed once parsed, or when the generator is closed.
+
+    :raises ScormCloudError: if the response ``stat`` is not ``ok``
+    """
+    tags = frozenset(tags)
+    root = None
+    parents = []
+    try:
+        for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                parents.append(elem)
+                continue
+            parents.pop()
+            if elem is root:
+                break
+            if root.get('stat') != 'ok':
+                # The error element is the first (and only) child of the root
+                code, msg = elem.get('code'), elem.get('msg')
+                raise ScormCloudError(msg='SCORM Cloud Error: %s - %s' % (code, msg),
+                                      code=code, json=msg)
+            if elem.tag in tags:
+                yield elem
+                elem.clear()
+                if parents:
+                    parents[-1].remove(elem)
+        if root is not None and root.get('stat') != 'ok':
+            raise ScormCloudError(msg='SCORM Cloud Error: unknown')
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+
+
+def parse_time_of_day(value):
+    """
+    Return the number of seconds since midnight for a runtime log timestamp,
+    either a bare ``HH:MM:SS.ss`` time or a full ISO 8601 timestamp.
+    Numbers are returned as floats.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return None if value is None else float(value)
+    if 'T' in value:
+        value = value.split('T', 1)[1]
+    for sep in ('Z', '+', '-'):
+        value = value.split(sep, 1)[0]
+    hours, minutes, seconds = (value.split(':') + ['0', '0'])[:3]
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds or 0)
+
+
+class RuntimeEventRecord(object):
+    """
+    A compact, slotted runtime log event. Attributes other than the
+    well-known ones are kept in :attr:`extra`.
+    """
+
+    __slots__ = ('id', 'event', 'attemptNo', 'itemIdentifier',
+                 'timestamp', 'title', 'extra')
+
+    def __init__(self, id_=None, event=None, attemptNo=None, itemIdentifier=None,
+                 timestamp=None, title=None, extra=None):
+        self.id = id_
+        self.event = event
+        self.title = title
+        self.attemptNo = attemptNo
+        self.timestamp = timestamp
+        self.itemIdentifier = itemIdentifier
+        self.extra = extra
+
+    @classmethod
+    def fromElement(cls, elem):
+        attrs = dict(elem.attrib)
+        return cls(attrs.pop('id', None),
+                   attrs.pop('event', None),
+                   attrs.pop('attemptNo', None),
+                   attrs.pop('itemIdentifier', None),
+                   attrs.pop('timestamp', None),
+                   attrs.pop('title', None),
+                   attrs or None)
+
+    def __getattr__(self, name):
+        extra = object.__getattribute__(self, 'extra')
+        if extra and name in extra:
+            return extra[name]
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return "<%s %s %s at %s>" % (type(self).__name__, self.id,
+                                     self.event, self.timestamp)
+
+
+class LaunchRecord(object):
+    """
+    A compact, slotted launch history entry.
+    """
+
+    __slots__ = ('id', 'completion', 'satisfaction', 'measure_status',
+                 'normalized_measure', 'experienced_duration_tracked',
+                 'launch_time', 'exit_time', 'update_dt')
+
+    def __init__(self, id_, **kwargs):
+        self.id = id_
+        for name in self.__slots__[1:]:
+            setattr(self, name, kwargs.get(name))
+
+    @classmethod
+    def fromElement(cls, elem):
+        values = {}
+        for child in elem:
+            if child.tag in cls.__slots__:
+                values[child.tag] = child.text
+        return cls(elem.get('id'), **values)
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, self.id)
+
+
+def iter_runtime_events(stream, events=None, start=None, end=None):
+    """
+    Yield a :class:`RuntimeEventRecord` for each ``RuntimeEvent`` in the
+    response ``stream``.
+
+    :param events: (optional) only yield events whose ``event`` attribute
+        is in this collection
+    :param start: (optional) only yield events at or after this time of day
+    :param end: (optional) only yield events at or before this time of day
+    """
+    events = frozenset(events) if events else None
+    start = parse_time_of_day(start)
+    end = parse_time_of_day(end)
+    for elem in iterparse_elements(stream, ('RuntimeEvent',)):
+        if events is not None and elem.get('event') not in events:
+            continue
+        if start is not None or end is not None:
+            timestamp = elem.get('timestamp')
+            if timestamp is None:
+                continue
+            seconds = parse_time_of_day(timestamp)
+            if     (start is not None and seconds < start) \
+                or (end is not None and seconds > end):
+                continue
+        yield RuntimeEventRecord.fromElement(elem)
+
+
+def iter_launches(stream):
+    """
+    Yield a :class:`LaunchRecord` for each ``launch`` in the response ``stream``.
+    """
+    for elem in iterparse_elements(stream, ('launch',)):
+        yield LaunchRecord.fromElement(elem)
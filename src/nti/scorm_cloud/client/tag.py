@@ -10,11 +10,89 @@ from __future__ import absolute_import
 
 from zope import interface
 
+from zope.event import notify
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+from nti.scorm_cloud.client.events import split_tags
+from nti.scorm_cloud.client.events import CourseTagsModifiedEvent
+
+from nti.scorm_cloud.client.mixins import WithRepr
+
 from nti.scorm_cloud.interfaces import ITagService
 
 logger = __import__('logging').getLogger(__name__)
 
 
+@WithRepr
+class TagChangeResult(object):
+    """
+    The computed (and, unless a dry run, applied) tag change of a course.
+
+    ``calls`` lists the ``(method, argument)`` calls needed to go from
+    the ``current`` to the ``desired`` tags; ``error`` is the exception
+    raised while reading or changing the tags, if any.
+    """
+
+    def __init__(self, courseId, current=None, desired=None, calls=(),
+                 error=None):
+        self.calls = list(calls)
+        self.error = error
+        self.courseId = courseId
+        self.current = current
+        self.desired = desired
+
+    @property
+    def added(self):
+        current = self.current or ()
+        return [t for t in self.desired or () if t not in current]
+
+    @property
+    def removed(self):
+        desired = self.desired or ()
+        return [t for t in self.current or () if t not in desired]
+
+    @property
+    def changed(self):
+        return bool(self.calls)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def desired_tags(current, change):
+    """
+    Return the tags a course should have once ``change`` (a mapping with
+    optional ``set``, ``add`` and ``remove`` tags) is applied to its
+    ``current`` tags.
+    """
+    tags = change.get('set')
+    tags = split_tags(current if tags is None else tags)
+    tags.extend(t for t in split_tags(change.get('add')) if t not in tags)
+    removed = set(split_tags(change.get('remove')))
+    result = []
+    for tag in tags:
+        if tag not in removed and tag not in result:
+            result.append(tag)
+    return result
+
+
+def tag_calls(current, desired):
+    """
+    Return the fewest ``(method, argument)`` calls changing the
+    ``current`` tags of a course into the ``desired`` ones.
+    """
+    added = [t for t in desired if t not in current]
+    removed = [t for t in current if t not in desired]
+    calls = [('add_scorm_tag', t) for t in added] \
+          + [('remove_scorm_tag', t) for t in removed]
+    if len(calls) > 1 and desired:
+        calls = [('set_scorm_tags', u','.join(desired))]
+    return calls
+
+
 @interface.implementer(ITagService)
 class TagService(object):
 
@@ -46,6 +124,7 @@ class TagService(object):
         request.parameters['courseid'] = scorm_id
         request.parameters['tags'] = tags
         result = request.call_service('rustici.tagging.setCourseTags')
+        notify(CourseTagsModifiedEvent(self.service, scorm_id, tags=tags))
         return result
 
     def add_scorm_tag(self, scorm_id, tag):
@@ -58,7 +137,9 @@ class TagService(object):
         request = self.service.request()
         request.parameters['courseid'] = scorm_id
         request.parameters['tag'] = tag
-        return request.call_service('rustici.tagging.addCourseTag')
+        result = request.call_service('rustici.tagging.addCourseTag')
+        notify(CourseTagsModifiedEvent(self.service, scorm_id, added=(tag,)))
+        return result
 
     def remove_scorm_tag(self, scorm_id, tag):
         """
@@ -70,4 +151,60 @@ class TagService(object):
         request = self.service.request()
         request.parameters['courseid'] = scorm_id
         request.parameters['tag'] = tag
-        return request.call_service('rustici.tagging.removeCourseTag')
+        result = request.call_service('rustici.tagging.removeCourseTag')
+        notify(CourseTagsModifiedEvent(self.service, scorm_id, removed=(tag,)))
+        return result
+
+    def bulk_update_tags(self, changes, current=None, dry_run=False,
+                         max_workers=8, rate=10):
+        """
+        Change the tags of many courses concurrently.
+
+        :param changes: a mapping of course ids to their change, a mapping
+            with optional ``set``, ``add`` and ``remove`` tags
+        :param current: (optional) a mapping of course ids to their current
+            tags (a :class:`.CourseCatalog` works); missing courses have
+            their tags fetched
+        :param dry_run: only compute the calls, do not make them
+        :param max_workers: the maximum number of concurrent requests
+        :param rate: the maximum number of requests per second
+        :return: a mapping of course ids to :class:`TagChangeResult`
+        """
+        limiter = RateLimiter(rate) if rate else None
+        results = dict((courseid, TagChangeResult(courseid))
+                       for courseid in changes)
+
+        def known_tags(courseid):
+            tags = current.get(courseid) if current is not None else None
+            if tags is None:
+                return None
+            # catalog courses or tags
+            return split_tags(getattr(tags, 'tags', tags))
+
+        missing = []
+        for courseid, result in results.items():
+            result.current = known_tags(courseid)
+            if result.current is None:
+                missing.append(courseid)
+        for call in run_concurrently(self.get_scorm_tags, missing,
+                                     max_workers, limiter):
+            results[call.item].current = call.result
+            results[call.item].error = call.error
+
+        todo = []
+        for courseid, result in results.items():
+            if result.ok:
+                result.desired = desired_tags(result.current, changes[courseid])
+                result.calls = tag_calls(result.current, result.desired)
+                todo.extend((courseid, c) for c in result.calls)
+        if dry_run:
+            return results
+
+        def apply(item):
+            courseid, (method, argument) = item
+            return getattr(self, method)(courseid, argument)
+        for call in run_concurrently(apply, todo, max_workers, limiter):
+            result = results[call.item[0]]
+            if result.error is None:
+                result.error = call.error
+        return results
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Fast decoding of the durations and timestamps found in SCORM Cloud
+responses.
+
+Durations are either ISO 8601 time intervals (``PT1H2M3.5S``, SCORM
+2004), ``HHHH:MM:SS.SS`` times (SCORM 1.2) or plain seconds, and are
+decoded to float seconds. Timestamps in the fixed formats SCORM Cloud
+returns (``2011-04-05T19:06:37.780+0000``, ``20110405190637``...) are
+decoded with a regular expression; anything else falls back to
+``dateutil``. Decoded values are memoized in bounded caches, as the same
+values recur across the registrations of a course.
+
+:func:`parse_durations` and :func:`parse_timestamps` decode many values
+at once into arrays of doubles (NaN for missing or invalid values),
+ready for :mod:`numpy`.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import re
+import datetime
+from array import array
+
+logger = __import__('logging').getLogger(__name__)
+
+NAN = float('nan')
+
+#: The maximum number of values memoized by each decoder
+CACHE_SIZE = 4096
+
+# ISO 8601 durations; a year is 365 days and a month 30 days
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+_ISO_DURATION = re.compile(r'^P(?!$)(?:%sY)?(?:%sM)?(?:%sW)?(?:%sD)?'
+                           r'(?:T(?=\d)(?:%sH)?(?:%sM)?(?:%sS)?)?$'
+                           % ((_NUMBER,) * 7))
+_ISO_UNITS = (365 * 86400, 30 * 86400, 7 * 86400, 86400, 3600, 60, 1)
+
+# SCORM 1.2 CMITimespan, HHHH:MM:SS.SS
+_TIMESPAN = re.compile(r'^(\d+):(\d{1,2}):(\d{1,2}(?:\.\d+)?)$')
+
+_TIMESTAMP = re.compile(r'^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})'
+                        r'(?:[.,](\d+))?\s*(Z|[+-]\d{2}(?::?\d{2})?)?$')
+_COMPACT_TIMESTAMP = re.compile(r'^(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})$')
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+class FixedOffset(datetime.tzinfo):
+    """
+    A time zone at a fixed offset, in seconds, east of UTC.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._offset = datetime.timedelta(seconds=seconds)
+
+    def __getinitargs__(self):
+        return (self.seconds,)
+
+    def utcoffset(self, unused_dt):
+        return self._offset
+
+    def dst(self, unused_dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, unused_dt):
+        return 'UTC' if not self.seconds else None
+
+    def __repr__(self):
+        return '%s(%d)' % (type(self).__name__, self.seconds)
+
+
+_OFFSETS = {}
+
+
+def fixed_offset(seconds):
+    """
+    Return the (shared) :class:`FixedOffset` of ``seconds`` east of UTC.
+    """
+    result = _OFFSETS.get(seconds)
+    if result is None:
+        result = _OFFSETS[seconds] = FixedOffset(seconds)
+    return result
+
+
+UTC = fixed_offset(0)
+
+
+def _memoize(cache, key, value):
+    if len(cache) >= CACHE_SIZE:
+        cache.clear()
+    cache[key] = value
+    return value
+
+
+def _float(text):
+    return float(text.replace(',', '.'))
+
+
+def _decode_duration(text):
+    text = text.strip()
+    match = _ISO_DURATION.match(text)
+    if match is not None:
+        return sum(_float(value) * unit
+                   for value, unit in zip(match.groups(), _ISO_UNITS)
+                   if value is not None)
+    match = _TIMESPAN.match(text)
+    if match is not None:
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+_DURATIONS = {}
+
+
+def parse_duration(text):
+    """
+    Return the seconds of an ISO 8601, ``HHHH:MM:SS.SS`` or plain seconds
+    duration, or None if ``text`` is empty or not a duration.
+    """
+    if isinstance(text, (int, float)):
+        return float(text)
+    if not text:
+        return None
+    try:
+        return _DURATIONS[text]
+    except KeyError:
+        return _memoize(_DURATIONS, text, _decode_duration(text))
+
+
+def _zone(text):
+    if not text:
+        return None
+    if text == 'Z':
+        return UTC
+    sign = -1 if text[0] == '-' else 1
+    digits = text[1:].replace(':', '')
+    minutes = int(digits[:2]) * 60 + int(digits[2:4] or 0)
+    return fixed_offset(sign * minutes * 60)
+
+
+def _fields(text):
+    """
+    Return the ``(year, month, day, hour, minute, second, microsecond,
+    tzinfo)`` of a timestamp in one of the SCORM Cloud formats, or None.
+    """
+    match = _TIMESTAMP.match(text) or _COMPACT_TIMESTAMP.match(text)
+    if match is None:
+        return None
+    groups = match.groups()
+    fraction = groups[6] if len(groups) > 6 else None
+    micros = int((fraction + '00000')[:6]) if fraction else 0
+    zone = _zone(groups[7]) if len(groups) > 7 else None
+    return tuple(int(g) for g in groups[:6]) + (micros, zone)
+
+
+def _decode_timestamp(text):
+    fields = _fields(text)
+    if fields is not None:
+        return datetime.datetime(*fields)
+    from dateutil.parser import parse
+    return parse(text)
+
+
+_TIMESTAMPS = {}
+
+
+def parse_timestamp(text):
+    """
+    Return the datetime of a timestamp, aware if it has an offset, or
+    None if ``text`` is empty.
+
+    :raises ValueError: if ``text`` is not a timestamp
+    """
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        return _TIMESTAMPS[text]
+    except KeyError:
+        return _memoize(_TIMESTAMPS, text, _decode_timestamp(text))
+
+
+def timestamp_seconds(text):
+    """
+    Return the POSIX time of a timestamp (taken as UTC if it has no
+    offset), or NaN if ``text`` is empty or not a timestamp.
+    """
+    if not text:
+        return NAN
+    fields = _fields(text.strip())
+    if fields is not None:
+        # skip building the datetime
+        year, month, day, hour, minute, second, micros, zone = fields
+        try:
+            days = datetime.date(year, month, day).toordinal() - _EPOCH_ORDINAL
+        except ValueError:
+            return NAN
+        offset = zone.seconds if zone is not None else 0
+        return days * 86400 + hour * 3600 + minute * 60 + second \
+            + micros / 1e6 - offset
+    try:
+        value = parse_timestamp(text)
+    except (ValueError, OverflowError):
+        return NAN
+    offset = value.utcoffset()
+    value = value.replace(tzinfo=None) - (offset or datetime.timedelta(0))
+    delta = value - datetime.datetime(1970, 1, 1)
+    return delta.days * 86400 + delta.seconds + delta.microseconds / 1e6
+
+
+def parse_durations(values):
+    """
+    Decode many durations into an ``array('d')`` of seconds, with NaN for
+    missing or invalid durations.
+    """
+    result = array('d')
+    append = result.append
+    cache = _DURATIONS
+    for text in values:
+        if not text:
+            append(NAN)
+            continue
+        seconds = cache.get(text)
+        if seconds is None:
+            seconds = parse_duration(text)
+        append(NAN if seconds is None else seconds)
+    return result
+
+
+def parse_timestamps(values):
+    """
+    Decode many timestamps into an ``array('d')`` of POSIX times (UTC if
+    they have no offset), with NaN for missing or invalid timestamps.
+    """
+    result = array('d')
+    append = result.append
+    for text in values:
+        append(timestamp_seconds(text))
+    return result
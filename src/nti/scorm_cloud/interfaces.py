@@ -82,6 +82,49 @@ class IScormCloudService(interface.Interface):
         :rtype: :class:`.IUploadService`
         """
 
+    def submit(func, *args, **kwargs):
+        """
+        Call a service method in the managed executor of the service,
+        starting it if needed.
+
+        :param func: the service method, e.g. a bound method of the
+            :class:`.IRegistrationService`
+        :return: the future of the result of the call
+        :rtype: :class:`concurrent.futures.Future`
+        """
+
+    def map(func, *iterables, **options):
+        """
+        Call a service method concurrently, once per set of arguments taken
+        from ``iterables``, in the managed executor of the service.
+
+        :param func: the service method
+        :keyword timeout: (optional) the number of seconds all the calls
+            must be done in; the pending calls are then cancelled
+        :return: an iterator of the results, in order
+        """
+
+    def shutdown(wait=True):
+        """
+        Shut the managed executor down, cancelling its pending calls, and
+        close the connection pool shared by the calls of the service.
+        """
+
+    def start_circuit_breakers(failure_threshold=5, reset_timeout=30,
+                               thresholds=None, families=None):
+        """
+        Shed the calls of a family (by default a service area, plus the
+        launch links) once ``failure_threshold`` of them fail in a row,
+        until a ping succeeds, trying every ``reset_timeout`` seconds.
+        The shed calls raise :class:`.CircuitOpenError` or, if they can,
+        return responses of the ``response_cache``, even expired.
+
+        :param thresholds: (optional) the failure thresholds by family
+        :param families: (optional) the families by method name
+        :return: the :class:`.CircuitBreakers`, whose ``metrics`` are
+            the state and the counters of every circuit
+        """
+
 
 class IDebugService(interface.Interface):
     """
@@ -155,6 +198,21 @@ class ITagService(interface.Interface):
         :param tag: The tag to remove
         """
 
+    def bulk_update_tags(changes, current=None, dry_run=False, max_workers=8,
+                         rate=10):
+        """
+        Change the tags of many courses concurrently, making the fewest
+        add, remove or set calls for each course.
+
+        :param changes: a mapping of course ids to their change, a mapping
+            with optional ``set``, ``add`` and ``remove`` tags
+        :param current: (optional) a mapping of course ids to their current tags
+        :param dry_run: only compute the calls, do not make them
+        :param max_workers: the maximum number of concurrent requests
+        :param rate: the maximum number of requests per second
+        :return: a mapping of course ids to their change results
+        """
+
 
 class IRegistrationService(interface.Interface):
     """
@@ -226,7 +284,8 @@ class IRegistrationService(interface.Interface):
         :type regid: str
         """
 
-    def getRegistrationList(courseid=None, learnerid=None, after=None, until=None):
+    def getRegistrationList(courseid=None, learnerid=None, after=None, until=None,
+                            fields=None):
         """
         Return a list of registrations associated with the given appid.
 
@@ -234,10 +293,44 @@ class IRegistrationService(interface.Interface):
         :param learnerid: limit search to only registrations for the learner specified by this learnerid
         :param after: return registrations updated (strictly) after this timestamp.
         :param until: return registrations updated up to and including this timestamp.
+        :param fields: (optional) the registration attributes to extract; if given,
+            namedtuple records of these fields are returned instead of registrations
         :type courseid: str
         :type learnerid: str
         :type after: str
         :type until: str
+        :type fields: list
+        """
+
+    def iterRegistrationList(after, until=None, courseid=None, learnerid=None, **kwargs):
+        """
+        Return a lazy iterator over the registrations updated between the given
+        timestamps. The range is fetched in adaptive ``after``/``until`` windows
+        ahead of the consumer.
+
+        :param after: return registrations updated (strictly) after this timestamp.
+        :param until: (optional) return registrations updated up to and including
+            this timestamp. Defaults to now
+        :param courseid: limit search to only registrations for the course specified by this courseid
+        :param learnerid: limit search to only registrations for the learner specified by this learnerid
+        :type after: str or datetime
+        :type until: str or datetime
+        :type courseid: str
+        :type learnerid: str
+        """
+
+    def findRegistrations(regids, courseid=None, learnerid=None, after=None, until=None):
+        """
+        Return the registrations with the given ids out of a (possibly cached)
+        registration list, materializing only those registrations.
+
+        :param regids: the registration ids to look for
+        :param courseid: limit search to only registrations for the course specified by this courseid
+        :param learnerid: limit search to only registrations for the learner specified by this learnerid
+        :param after: return registrations updated (strictly) after this timestamp.
+        :param until: return registrations updated up to and including this timestamp.
+        :type regids: list
+        :return: the registrations found, in list order
         """
 
     def getRegistrationDetail(regid):
@@ -248,7 +341,7 @@ class IRegistrationService(interface.Interface):
         :type regid: str
         """
 
-    def getRegistrationResult(regid, resultsformat=None, instanceid=None):
+    def getRegistrationResult(regid, resultsformat=None, instanceid=None, lazy=False):
         """
         Gets information about the specified registration.
 
@@ -256,9 +349,12 @@ class IRegistrationService(interface.Interface):
         :param resultsformat: (optional) can be "course", "activity", or "full" to
             determine the level of detail returned. The default is "course"
         :param instanceid: the ID of a particular registration instance
+        :param lazy: (optional) return a ``LazyRegistrationReport``, whose
+            activity tree is only parsed when accessed
         :type regid: str
         :type resultsformat: str
         :type instanceid: str
+        :type lazy: bool
         """
 
     def launch(regid, redirecturl, cssUrl=None, courseTags=None,
@@ -307,6 +403,27 @@ class IRegistrationService(interface.Interface):
         :type launchid: str
         """
 
+    def iterLaunchHistory(regid):
+        """
+        Stream the launch history for the given registration.
+
+        :param regid: the unique identifier for the registration
+        :type regid: str
+        :return: an iterator of :class:`.LaunchRecord` objects
+        """
+
+    def iterRuntimeEvents(launchid, events=None, start=None, end=None):
+        """
+        Stream the runtime log events for the given launch.
+
+        :param launchid: the unique id of the launch
+        :param events: (optional) only return events of these types
+        :param start: (optional) only return events at or after this time of day
+        :param end: (optional) only return events at or before this time of day
+        :type launchid: str
+        :return: an iterator of :class:`.RuntimeEventRecord` objects
+        """
+
     def resetGlobalObjectives(regid):
         """
         Clears global objective data for the specified registration.
@@ -332,6 +449,20 @@ class IRegistrationService(interface.Interface):
         :type email: str
         """
 
+    def updateLearnerInfoMany(changes, snapshot=None, max_workers=8, rate=10):
+        """
+        Apply many learner changes concurrently under a rate limit.
+
+        :param changes: an iterable of learner changes, mappings with
+            ``learnerid`` and the optional ``fname``, ``lname``, ``email``
+            and ``newid`` keys
+        :param snapshot: (optional) a :class:`.LearnerSnapshot` used to skip
+            the changes that change nothing
+        :param max_workers: the maximum number of concurrent requests
+        :param rate: the maximum number of requests per second
+        :return: a mapping of learner ids to their update results
+        """
+
     def getPostbackInfo(regid):
         """
         Provides a way to retrieve the postback attributes
@@ -470,7 +601,7 @@ class IInvitationService(interface.Interface):
         :type detail: bool
         """
 
-    def getInvitationList(filter_=None, coursefilter=None):
+    def getInvitationList(filter_=None, coursefilter=None, fields=None):
         """
         Retrieves a list of invitations
 
@@ -478,8 +609,11 @@ class IInvitationService(interface.Interface):
         :param coursefilter: A regular express that will be used to filter the list of invitations.
             Specifically only those invitations that are associated with courses whose courseid’s match
             the given expression will be returned in the list
+        :param fields: (optional) the invitation attributes to extract; if given,
+            namedtuple records of these fields are returned instead of invitations
         :type filter_: str
         :type coursefilter: str
+        :type fields: list
         """
 
     def changeStatus(invitationId, enable, open_=True, expirationdate=None):
@@ -570,14 +704,18 @@ class ICourseService(interface.Interface):
             If not provided or is None, all course files will be downloaded.
         """
 
-    def get_course_list(courseIdFilterRegex=None):
+    def get_course_list(courseIdFilterRegex=None, tags=None, fields=None):
         """
         Retrieves a list of CourseData elements for all courses owned by the
         configured AppID that meet the specified filter criteria.
 
         :param courseIdFilterRegex: (optional) Regular expression to filter courses
             by ID
+        :param tags: (optional) only return the courses with all these tags
+        :param fields: (optional) the course attributes to extract; if given,
+            namedtuple records of these fields are returned instead of CourseData
         :type courseIdFilterRegex: str
+        :type fields: list
         """
 
     def get_preview_url(courseid, redirecturl, stylesheeturl=None):
@@ -826,15 +964,111 @@ class IReportingService(interface.Interface):
         """
 
 
+class ICourseEvent(interface.Interface):
+    """
+    A course was changed through a :class:`IScormCloudService`
+    """
+
+    service = Object(IScormCloudService,
+                     title=u"The scorm cloud service")
+
+    courseid = TextLine(title=u"The course id", required=True)
+
+
+class ICourseImportedEvent(ICourseEvent):
+    """
+    A course was imported or updated
+    """
+
+
+class ICourseDeletedEvent(ICourseEvent):
+    """
+    A course was deleted
+    """
+
+
+class ICourseTagsModifiedEvent(ICourseEvent):
+    """
+    The tags of a course were set, added or removed
+    """
+
+    tags = interface.Attribute(u"The new tags, or None if only some were added/removed")
+
+    added = interface.Attribute(u"The tags added")
+
+    removed = interface.Attribute(u"The tags removed")
+
+
+class IRegistrationEvent(interface.Interface):
+    """
+    A registration was changed through a :class:`IScormCloudService`
+    """
+
+    service = Object(IScormCloudService,
+                     title=u"The scorm cloud service")
+
+    regid = TextLine(title=u"The registration id", required=True)
+
+
+class IRegistrationCreatedEvent(IRegistrationEvent):
+    """
+    A registration was created
+    """
+
+    courseid = TextLine(title=u"The course id", required=False)
+
+
+class IRegistrationDeletedEvent(IRegistrationEvent):
+    """
+    A registration was deleted
+    """
+
+
+class IResponseCache(interface.Interface):
+    """
+    A cache of raw SCORM Cloud responses, see :mod:`nti.scorm_cloud.client.cache`
+    """
+
+    def cacheable(method):
+        """
+        Return whether responses of the given web service method may be cached
+
+        :param method: the full name of the web service method
+        """
+
+    def get(key, stale=False):
+        """
+        Return the cached response for the given key or None
+
+        :param stale: whether an expired response may be returned
+        """
+
+    def set(key, response):
+        """
+        Store a cached response under the given key
+        """
+
+    def invalidate(key):
+        """
+        Remove the response stored under the given key
+        """
+
+    def clear():
+        """
+        Remove all responses
+        """
+
+
 class IUnmarshalled(interface.Interface):
 
-    _node = interface.Attribute('Minidom node object')
+    _node = interface.Attribute('Source element object')
 
     def fromMinidom(node):
         """
-        Construct an instance of this object using the minidom source node
+        Construct an instance of this object using the source node, a minidom
+        node or an element of another :mod:`nti.scorm_cloud.parsers` backend
 
-        :param node: Minodom node
+        :param node: Minodom node or element
         :return: A new instance of the implementer object
         """
 
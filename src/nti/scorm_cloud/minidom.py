@@ -1,6 +1,11 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
+Helpers reading the elements of the XML responses.
+
+The helpers take :mod:`xml.dom.minidom` nodes as well as the elements
+of the other :mod:`nti.scorm_cloud.parsers` backends.
+
 .. $Id$
 """
 
@@ -8,15 +13,18 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 
-from dateutil.parser import parse
-
+from xml.dom.minidom import Node
 from xml.dom.minidom import Document
 
+from nti.scorm_cloud.datetimes import parse_timestamp
+
+from nti.scorm_cloud.parsers import parser_for
+
 
 def getData(nodes=(), types=()):
     result = []
     for node in nodes or ():
-        if node.nodeType in types:
+        if getattr(node, 'nodeType', None) in types:
             result.append(node.data)
     return ''.join(result)
 
@@ -33,43 +41,100 @@ def getTextOrCDATA(nodes=()):
     return getData(nodes, (Document.TEXT_NODE, Document.CDATA_SECTION_NODE))
 
 
+def getChildIndex(node):
+    """
+    Return a mapping of the tag names of the child elements of the
+    minidom ``node`` (and of ``*``) to the lists of those elements.
+
+    The index is built in one pass over the children and kept on the
+    node, to be reused by the helpers below for as long as the node has
+    the same number of children. The lists must not be modified.
+    """
+    children = node.childNodes or ()
+    cached = getattr(node, '_v_child_index', None)
+    if cached is not None and cached[0] == len(children):
+        return cached[1]
+    index = {'*': []}
+    everything = index['*']
+    for child in children:
+        if child.nodeType == Node.ELEMENT_NODE:
+            everything.append(child)
+            named = index.get(child.tagName)
+            if named is None:
+                index[child.tagName] = [child]
+            else:
+                named.append(child)
+    node._v_child_index = (len(children), index)
+    return index
+
+
+def _childNodes(node, name):
+    return getChildIndex(node).get(name, ())
+
+
 def getChildNodesByName(node, name):
-    result = []
-    for node in node.childNodes or ():
-        if      node.nodeType == node.ELEMENT_NODE \
-            and (name == "*" or node.tagName == name):
-            result.append(node)
-    return result
+    if not isinstance(node, Node):
+        return parser_for(node).children(node, name)
+    return list(_childNodes(node, name))
+
+
+def getElementsByName(node, name):
+    """
+    Return the descendant elements of ``node`` named ``name``.
+    """
+    if not isinstance(node, Node):
+        return parser_for(node).descendants(node, name)
+    return node.getElementsByTagName(name)
+
 
 def getChildDatetime(node, name):
-    date_str = getChildText(node, name)
-    return parse(date_str)
+    return parse_timestamp(getChildText(node, name))
+
 
 def getChildText(node, name):
-    nodes = getChildNodesByName(node, name)
+    if not isinstance(node, Node):
+        return parser_for(node).child_text(node, name)
+    nodes = _childNodes(node, name)
     return getText(nodes[0].childNodes) if nodes else None
 
 
 def getChildCDATA(node, name):
-    nodes = getChildNodesByName(node, name)
+    if not isinstance(node, Node):
+        return parser_for(node).child_text(node, name)
+    nodes = _childNodes(node, name)
     return getCDATA(nodes[0].childNodes) if nodes else None
 
 
 def getChildTextOrCDATA(node, name):
-    nodes = getChildNodesByName(node, name)
+    if not isinstance(node, Node):
+        return parser_for(node).child_text(node, name)
+    nodes = _childNodes(node, name)
     return getTextOrCDATA(nodes[0].childNodes) if nodes else None
 
 
 def getChildren(node, parent, child):
-    nodes = getChildNodesByName(node, parent)
-    return getChildNodesByName(nodes[0], child) if nodes else None
+    parent = getFirstChild(node, parent)
+    return getChildNodesByName(parent, child) if parent is not None else None
 
 
 def getFirstChild(node, name):
-    nodes = getChildNodesByName(node, name)
+    if not isinstance(node, Node):
+        return parser_for(node).first_child(node, name)
+    nodes = _childNodes(node, name)
     return nodes[0] if nodes else None
 
 
 def getAttributeValue(node, name):
+    if not isinstance(node, Node):
+        return node.get(name)
     attr = node.attributes.get(name)
     return attr.value if attr is not None else None
+
+
+def getAttributes(node):
+    """
+    Return the ``(name, value)`` attribute pairs of ``node``.
+    """
+    if not isinstance(node, Node):
+        return list(node.items())
+    return list(node.attributes.items())
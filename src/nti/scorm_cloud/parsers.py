@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pluggable XML parser backends.
+
+A backend parses a raw response into the root element of its own tree
+type: an :mod:`lxml.etree` element, a (C accelerated)
+:mod:`xml.etree.ElementTree` element or a :mod:`xml.dom.minidom`
+element. The helpers in :mod:`nti.scorm_cloud.minidom` work on the
+elements of any backend, so the models build from either of them.
+
+By default the fastest available backend is used, in the order of
+:data:`PARSERS`; lxml is an optional dependency, used by name or when
+the ElementTree C accelerator is unavailable.
+
+The ElementTree backends do not tell CDATA sections from text, so
+``getChildText`` and ``getChildCDATA`` both return the whole text of
+the child with them.
+
+.. $Id$
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import threading
+from xml.dom import minidom
+from xml.parsers.expat import ExpatError
+
+import six
+
+from nti.scorm_cloud.compat import bytes_
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The names of the backends, fastest first. lxml parses faster than
+#: ElementTree but its elements are slower to read, and reading them
+#: dominates building the models.
+PARSERS = ('etree', 'lxml', 'minidom')
+
+
+class MinidomParser(object):
+    """
+    The pure Python :mod:`xml.dom.minidom` backend.
+    """
+
+    name = 'minidom'
+    errors = (ExpatError,)
+
+    def parse(self, raw):
+        return minidom.parseString(raw).documentElement
+
+    def element_types(self):
+        return (minidom.Element,)
+
+
+class ElementTreeParser(object):
+    """
+    The :mod:`xml.etree.ElementTree` backend, using its C accelerator
+    (``cElementTree`` on Python 2).
+    """
+
+    name = 'etree'
+
+    def __init__(self):
+        try:
+            from xml.etree import cElementTree as etree
+        except ImportError:
+            # pylint: disable=unused-import
+            import _elementtree  # the pure Python version is too slow
+            from xml.etree import ElementTree as etree
+        self.etree = etree
+        self.errors = (etree.ParseError, ExpatError)
+
+    def parse(self, raw):
+        return self.etree.fromstring(bytes_(raw))
+
+    def element_types(self):
+        return (type(self.etree.Element('e')),)
+
+    # element protocol
+
+    def children(self, node, name):
+        if name == '*':
+            return [n for n in node if isinstance(n.tag, six.string_types)]
+        return node.findall(name)
+
+    def first_child(self, node, name):
+        return node.find(name)
+
+    def text(self, node):
+        result = node.text or ''
+        if len(node):
+            result += ''.join(n.tail or '' for n in node)
+        return result
+
+    def child_text(self, node, name):
+        child = self.first_child(node, name)
+        if child is None:
+            return None
+        if len(child):
+            return self.text(child)
+        return child.text or ''
+
+    def descendants(self, node, name):
+        return node.findall('.//' + name)
+
+
+class LxmlParser(ElementTreeParser):
+    """
+    The :mod:`lxml.etree` backend. Entities are not resolved, and no
+    network access is allowed.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):  # pylint: disable=super-init-not-called
+        from lxml import etree
+        self.etree = etree
+        self.errors = (etree.XMLSyntaxError,)
+        self._local = threading.local()
+
+    @property
+    def parser(self):
+        # lxml parsers must not be shared between threads
+        result = getattr(self._local, 'parser', None)
+        if result is None:
+            result = self._local.parser = \
+                self.etree.XMLParser(resolve_entities=False, no_network=True,
+                                     remove_comments=True, huge_tree=True)
+        return result
+
+    def parse(self, raw):
+        return self.etree.fromstring(bytes_(raw), self.parser)
+
+    def element_types(self):
+        return (self.etree._Element,)  # pylint: disable=protected-access
+
+    def children(self, node, name):
+        if name == '*':
+            return list(node.iterchildren(self.etree.Element))
+        return list(node.iterchildren(name))
+
+    def first_child(self, node, name):
+        return next(node.iterchildren(name), None)
+
+    def descendants(self, node, name):
+        return list(node.iterdescendants(name))
+
+
+_FACTORIES = {
+    'lxml': LxmlParser,
+    'etree': ElementTreeParser,
+    'minidom': MinidomParser,
+}
+
+_parsers = {}
+_element_types = {}
+_default = None
+
+
+def get_parser(name=None):
+    """
+    Return the parser backend called ``name``, or the default one.
+
+    :raises ValueError: if the backend is unknown or unavailable
+    """
+    if name is None:
+        return default_parser()
+    result = _parsers.get(name)
+    if result is None:
+        factory = _FACTORIES.get(name)
+        if factory is None:
+            raise ValueError('Unknown parser %r; the parsers are %s'
+                             % (name, ', '.join(PARSERS)))
+        try:
+            result = factory()
+        except ImportError:
+            raise ValueError('Parser %r is not available' % name)
+        for type_ in result.element_types():
+            _element_types[type_] = result
+        _parsers[name] = result
+    return result
+
+
+def available_parsers():
+    """
+    Return the names of the available backends, fastest first.
+    """
+    result = []
+    for name in PARSERS:
+        try:
+            get_parser(name)
+        except ValueError:
+            continue
+        result.append(name)
+    return tuple(result)
+
+
+def default_parser():
+    """
+    Return the default backend, the fastest available one unless set
+    with :func:`set_default_parser`.
+    """
+    global _default
+    if _default is None:
+        _default = get_parser(available_parsers()[0])
+    return _default
+
+
+def set_default_parser(name=None):
+    """
+    Set the default backend by name; ``None`` restores the fastest
+    available one.
+    """
+    global _default
+    _default = get_parser(name) if name is not None else None
+
+
+def parser_for(node):
+    """
+    Return the backend that built the element ``node``.
+    """
+    try:
+        return _element_types[type(node)]
+    except KeyError:
+        pass
+    available_parsers()  # load them all
+    for type_, parser in list(_element_types.items()):
+        if isinstance(node, type_):
+            _element_types[type(node)] = parser
+            return parser
+    raise TypeError('Not an element of a parser backend: %r' % (node,))
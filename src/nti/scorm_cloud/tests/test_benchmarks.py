@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_not
+from hamcrest import has_item
+from hamcrest import assert_that
+from hamcrest import greater_than
+
+import sys
+import unittest
+
+from nti.scorm_cloud.utils.benchmarks import import_time
+from nti.scorm_cloud.utils.benchmarks import parser_times
+from nti.scorm_cloud.utils.benchmarks import decoder_times
+from nti.scorm_cloud.utils.benchmarks import LAZY_MODULES
+from nti.scorm_cloud.utils.benchmarks import imported_modules
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_lazy_imports(self):
+        loaded = imported_modules('nti.scorm_cloud.client')
+        assert_that(loaded, has_item('nti.scorm_cloud.client'))
+        for name in LAZY_MODULES:
+            assert_that(loaded, is_not(has_item(name)))
+
+    @unittest.skipIf(sys.version_info < (3, 7), "-X importtime unavailable")
+    def test_import_time(self):
+        assert_that(import_time('nti.scorm_cloud.client', repeat=1),
+                    greater_than(0))
+
+    def test_decoder_times(self):
+        times = decoder_times(count=100, repeat=1)
+        for name in ('dateutil', 'timestamps', 'durations'):
+            assert_that(times[name], greater_than(0))
+
+    def test_parser_times(self):
+        times = parser_times(activities=2, repeat=1)
+        assert_that(times, has_item('minidom'))
+        for elapsed in times.values():
+            assert_that(elapsed, greater_than(0))
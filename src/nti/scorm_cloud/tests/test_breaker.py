@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import has_key
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_entries
+from hamcrest import greater_than
+from hamcrest import same_instance
+from hamcrest import has_properties
+
+import time
+import unittest
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from nti.scorm_cloud.client.breaker import OPEN
+from nti.scorm_cloud.client.breaker import CLOSED
+from nti.scorm_cloud.client.breaker import HALF_OPEN
+from nti.scorm_cloud.client.breaker import is_failure
+from nti.scorm_cloud.client.breaker import CircuitBreaker
+from nti.scorm_cloud.client.breaker import CircuitBreakers
+
+from nti.scorm_cloud.client.cache import MemoryResponseCache
+
+from nti.scorm_cloud.client.invitation import InvitationChangeTracker
+
+from nti.scorm_cloud.client.request import ScormCloudError
+from nti.scorm_cloud.client.request import ScormUpdateError
+from nti.scorm_cloud.client.request import CircuitOpenError
+from nti.scorm_cloud.client.request import ScormCloudTimeoutError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestBreaker(unittest.TestCase):
+
+    def _fail(self, breaker, exc=None):
+        with self.assertRaises(ScormCloudError):
+            with breaker:
+                raise exc or ScormCloudTimeoutError('timed out')
+
+    def test_failures(self):
+        assert_that(is_failure(ScormCloudTimeoutError('timed out')), is_(True))
+        assert_that(is_failure(ScormCloudTimeoutError('late', sent=False)), is_(False))
+        assert_that(is_failure(ScormUpdateError('500')), is_(True))
+        assert_that(is_failure(RequestsConnectionError()), is_(True))
+        assert_that(is_failure(ScormCloudError('Bad', code='100')), is_(False))
+        assert_that(is_failure(CircuitOpenError('open')), is_(False))
+        error = ValueError()
+        error.status = 404
+        assert_that(is_failure(error), is_(False))
+        error.status = 503
+        assert_that(is_failure(error), is_(True))
+
+    def test_trial_call(self):
+        breaker = CircuitBreaker('registration', failure_threshold=2, reset_timeout=0.05)
+        self._fail(breaker)
+        with breaker:
+            pass
+        self._fail(breaker)
+        # a SCORM Cloud error is an answer
+        self._fail(breaker, ScormCloudError('Bad', code='100'))
+        assert_that(breaker.state, is_(CLOSED))
+        self._fail(breaker)
+        self._fail(breaker)
+        assert_that(breaker.state, is_(OPEN))
+        try:
+            with breaker:
+                self.fail('not shed')  # pragma: no cover
+        except CircuitOpenError as e:
+            assert_that(e.retry_after, is_(greater_than(0)))
+
+        time.sleep(0.06)
+        with breaker:
+            assert_that(breaker.state, is_(HALF_OPEN))
+            with self.assertRaises(CircuitOpenError):
+                breaker.before()
+        assert_that(breaker.state, is_(CLOSED))
+        assert_that(breaker.metrics(),
+                    has_entries('family', 'registration', 'state', CLOSED,
+                                'calls', 7, 'successes', 3, 'failures', 4,
+                                'rejections', 2, 'opens', 1, 'probes', 1,
+                                'consecutive_failures', 0, 'retry_after', 0))
+
+    def test_probe(self):
+        healthy = []
+        breaker = CircuitBreaker('course', failure_threshold=1, reset_timeout=0,
+                                 probe=lambda: bool(healthy))
+        self._fail(breaker)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before()
+        assert_that(breaker.state, is_(OPEN))
+        healthy.append(True)
+        with breaker:
+            assert_that(breaker.state, is_(CLOSED))
+        assert_that(breaker.metrics(), has_entries('probes', 2, 'opens', 2))
+
+    def test_families(self):
+        breakers = CircuitBreakers(failure_threshold=3, thresholds={'launch': 1},
+                                   families={'rustici.course.getCourseDetail': 'detail'})
+        guard = breakers.guard('rustici.registration.getRegistrationResult')
+        assert_that(guard, has_properties('family', 'registration',
+                                          'failure_threshold', 3))
+        assert_that(breakers.guard('rustici.registration.exists'),
+                    is_(same_instance(guard)))
+        assert_that(breakers.guard('launch'), has_properties('failure_threshold', 1))
+        assert_that(breakers.guard('rustici.course.getCourseDetail').family, is_('detail'))
+        assert_that(breakers.guard('rustici.debug.ping'), is_(none()))
+        assert_that(breakers.metrics(), has_key('detail'))
+
+
+class TestServiceBreakers(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=1, registrations=2, seed=1)
+        self.app = StandinApplication('appid', 'secret', self.store)
+        self.server = serve_in_thread(self.app)
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_shedding(self):
+        breakers = self.service.start_circuit_breakers(failure_threshold=2,
+                                                       reset_timeout=0.05)
+        registrations = self.service.get_registration_service()
+        courses = self.service.get_course_service()
+        self.app.http_error_rate = 1.0
+        for _ in range(2):
+            with self.assertRaises(ScormUpdateError):
+                registrations.getRegistrationResult('reg-1')
+        requests = self.app.stats['requests']
+        with self.assertRaises(CircuitOpenError):
+            registrations.getRegistrationResult('reg-1')
+        assert_that(self.app.stats['requests'], is_(requests))
+        # the other families are still called
+        with self.assertRaises(ScormUpdateError):
+            courses.get_course_detail('course-0')
+
+        # the probe fails while the SCORM Cloud is down
+        time.sleep(0.06)
+        with self.assertRaises(CircuitOpenError):
+            registrations.getRegistrationResult('reg-1')
+        self.app.http_error_rate = 0.0
+        time.sleep(0.06)
+        assert_that(registrations.getRegistrationResult('reg-1'),
+                    has_properties('regid', 'reg-1'))
+        assert_that(breakers.metrics()['registration'],
+                    has_entries('state', CLOSED, 'opens', 2, 'probes', 2,
+                                'rejections', 2, 'failures', 2))
+
+    def test_cached_fallback(self):
+        self.service.start_circuit_breakers(failure_threshold=1, reset_timeout=60)
+        self.service.response_cache = MemoryResponseCache(ttl=0)
+        registrations = self.service.get_registration_service()
+        courses = self.service.get_course_service()
+        report = registrations.getRegistrationResult('reg-1', 'full')
+        detail = courses.get_course_detail('course-0')
+        time.sleep(0.01)
+
+        self.app.http_error_rate = 1.0
+        with self.assertRaises(ScormUpdateError):
+            registrations.getRegistrationResult('reg-1', 'full')
+        with self.assertRaises(ScormUpdateError):
+            courses.get_course_detail('course-0')
+        # the expired responses are served while the circuits are open
+        assert_that(registrations.getRegistrationResult('reg-1', 'full').regid,
+                    is_(report.regid))
+        assert_that(courses.get_course_detail('course-0').courseId,
+                    is_(detail.courseId))
+        with self.assertRaises(CircuitOpenError):
+            registrations.getRegistrationResult('reg-0', 'full')
+
+    def test_direct_calls(self):
+        breakers = self.service.start_circuit_breakers(failure_threshold=1,
+                                                       reset_timeout=60)
+        registrations = self.service.get_registration_service()
+        records = registrations.getRegistrationList(fields=('registrationId',))
+        assert_that(records, has_length(2))
+
+        self.app.http_error_rate = 1.0
+        with self.assertRaises(ScormUpdateError):
+            registrations.getRegistrationList(fields=('registrationId',))
+        tracker = InvitationChangeTracker(self.service)
+        with self.assertRaises(ScormUpdateError):
+            tracker.poll('inv-0')
+        requests = self.app.stats['requests']
+        with self.assertRaises(CircuitOpenError):
+            registrations.getRegistrationList(fields=('registrationId',))
+        with self.assertRaises(CircuitOpenError):
+            tracker.poll('inv-0')
+        assert_that(self.app.stats['requests'], is_(requests))
+        assert_that(breakers.metrics()['registration'],
+                    has_entries('successes', 1, 'failures', 1, 'rejections', 1))
+        assert_that(breakers.metrics()['invitation'],
+                    has_entries('failures', 1, 'rejections', 1))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import instance_of
+from hamcrest import has_property
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+import fudge
+
+from nti.scorm_cloud.client.cache import cache_key
+from nti.scorm_cloud.client.cache import CachedResponse
+from nti.scorm_cloud.client.cache import index_elements
+from nti.scorm_cloud.client.cache import MemoryResponseCache
+from nti.scorm_cloud.client.cache import MappedFileResponseCache
+
+from nti.scorm_cloud.client.request import ScormCloudError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.tests import fake_response
+from nti.scorm_cloud.tests import SharedConfiguringTestLayer
+
+REGISTRATIONS = b"""<rsp stat="ok"><registrationlist>
+<registration id="reg1" courseid="c1">
+    <registrationId>reg1</registrationId>
+    <learnerFirstName>Ichigo</learnerFirstName>
+    <instances/>
+</registration>
+<registration id="reg2" courseid="c1" note="a > b">
+    <registrationId>reg2</registrationId>
+    <learnerFirstName>Rukia</learnerFirstName>
+    <instances/>
+</registration>
+<registration id="reg3" courseid="c1"/>
+</registrationlist></rsp>"""
+
+
+class TestCache(unittest.TestCase):
+
+    def test_index_elements(self):
+        stat, index = index_elements(REGISTRATIONS)
+        assert_that(stat, is_('ok'))
+        assert_that([key for key, _, _ in index['registration']],
+                    contains('reg1', 'reg2', 'reg3'))
+        _, start, end = index['registration'][2]
+        assert_that(REGISTRATIONS[start:end],
+                    is_(b'<registration id="reg3" courseid="c1"/>'))
+
+    def test_cached_response(self):
+        response = CachedResponse.fromRaw(REGISTRATIONS)
+        assert_that(response.keys('registration'), has_length(3))
+        node = response.element('registration', 'reg2')
+        assert_that(node.getAttribute('note'), is_('a > b'))
+        assert_that(response.element('registration', 'reg4'), is_(none()))
+        assert_that([key for key, _ in response.elements('registration', ('reg3',))],
+                    contains('reg3'))
+
+        loaded = CachedResponse.fromBytes(response.toBytes())
+        assert_that(loaded.raw, is_(REGISTRATIONS))
+        assert_that(loaded.index, is_(response.index))
+        assert_that(loaded.document().documentElement.tagName, is_('rsp'))
+
+    def test_cache_key(self):
+        key = cache_key('m', {'a': '1', 'ts': '1'})
+        assert_that(cache_key('m', {'a': '1', 'ts': '2', 'sig': 'x'}), is_(key))
+        assert_that(cache_key('m', {'a': '2'}) == key, is_(False))
+
+    def test_memory_cache(self):
+        cache = MemoryResponseCache(maxsize=2, ttl=60)
+        response = CachedResponse.fromRaw(REGISTRATIONS)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, response)
+        assert_that(cache.get('a'), is_(none()))
+        cached = cache.get('c')
+        assert_that(cached.raw, is_(REGISTRATIONS))
+        # the cached responses do not keep the raw response
+        assert_that(cached._raw, is_(none()))
+        assert_that(cached.raw, is_(REGISTRATIONS))
+        assert_that(cached._raw, is_(none()))
+        cached.created = time.time() - 120
+        assert_that(cache.get('c'), is_(none()))
+        cache.clear()
+        assert_that(cache, has_length(0))
+
+    def test_mapped_file_cache(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache = MappedFileResponseCache(directory, ttl=60)
+            cache.set('a', CachedResponse.fromRaw(REGISTRATIONS))
+            other = MappedFileResponseCache(directory)
+            response = other.get('a')
+            # the compressed body is read from the map, not copied
+            assert_that(response.compressed, is_(instance_of(memoryview)))
+            assert_that(response.raw, is_(REGISTRATIONS))
+            assert_that(response.element('registration', 'reg1'),
+                        has_property('tagName', 'registration'))
+            assert_that(other.get('b'), is_(none()))
+            cache.clear()
+            assert_that(other.get('a'), is_(none()))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_mapped_file_eviction(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache = MappedFileResponseCache(directory, ttl=60, maxsize=2, max_stale=60)
+            response = CachedResponse.fromRaw(REGISTRATIONS)
+            for key in ('a', 'b'):
+                cache.set(key, response)
+            os.utime(cache._path('a'), (time.time() - 10,) * 2)
+            os.utime(cache._path('b'), (time.time() - 5,) * 2)
+            assert_that(cache.get('a'), is_(instance_of(CachedResponse)))
+            cache.set('c', response)
+            # the least recently used response is evicted
+            assert_that(sorted(os.listdir(directory)), contains('a.nscr', 'c.nscr'))
+
+            cache.maxbytes = len(response.toBytes())
+            cache.set('d', response)
+            assert_that(os.listdir(directory), contains('d.nscr'))
+
+            # expired responses are kept max_stale seconds
+            expired = CachedResponse(response.compressed, response.index,
+                                     time.time() - 90)
+            cache.set('d', expired)
+            assert_that(cache.get('d'), is_(none()))
+            assert_that(cache.get('d', stale=True), is_(instance_of(CachedResponse)))
+            cache.max_stale = 0
+            assert_that(cache.get('d', stale=True), is_(none()))
+            assert_that(os.listdir(directory), is_([]))
+
+            cache.set('e', expired)
+            os.utime(cache._path('e'), (time.time() - 90,) * 2)
+            cache.set('f', response)
+            assert_that(os.listdir(directory), contains('f.nscr'))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_corrupt_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache = MappedFileResponseCache(directory, ttl=60)
+            data = CachedResponse.fromRaw(REGISTRATIONS).toBytes()
+            for corrupt in (b'NSCR\x01', data[:30], data[:17] + b'[' * 20, b'x' * 40):
+                with open(cache._path('a'), 'wb') as fp:
+                    fp.write(corrupt)
+                assert_that(cache.get('a'), is_(none()))
+                # the corrupt entry is dropped
+                assert_that(os.path.exists(cache._path('a')), is_(False))
+            cache.set('a', CachedResponse.fromRaw(REGISTRATIONS))
+            assert_that(cache.get('a').raw, is_(REGISTRATIONS))
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestCachedService(unittest.TestCase):
+
+    layer = SharedConfiguringTestLayer
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_call_service_cached(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        service.response_cache = MemoryResponseCache()
+        reg = service.get_registration_service()
+
+        calls = []
+        def get(*unused_args, **unused_kwargs):
+            calls.append(1)
+            return fake_response(content=REGISTRATIONS)
+        session = fudge.Fake().expects('get').calls(get)
+        mock_ss.is_callable().returns(session)
+
+        assert_that(reg.getRegistrationList(courseid='c1'), has_length(3))
+        found = reg.findRegistrations(['reg2'], courseid='c1')
+        assert_that(found, contains(has_property('learnerFirstName', 'Rukia')))
+        assert_that(calls, has_length(1))
+
+        # writes are never cached
+        reply = '<rsp stat="ok"><success/></rsp>'
+        session = fudge.Fake().expects('get').returns(fake_response(content=reply))
+        mock_ss.is_callable().returns(session)
+        reg.deleteRegistration('reg1')
+        reg.deleteRegistration('reg1')
+        assert_that(service.response_cache, has_length(1))
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_call_service_raw_error(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        service.response_cache = MemoryResponseCache()
+        reply = '<rsp stat="fail"><err code="1" msg="bad"/></rsp>'
+        session = fudge.Fake().expects('get').returns(fake_response(content=reply))
+        mock_ss.is_callable().returns(session)
+        with self.assertRaises(ScormCloudError):
+            service.get_registration_service().findRegistrations(['reg1'])
+        assert_that(service.response_cache, has_length(0))
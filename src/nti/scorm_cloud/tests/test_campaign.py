@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_entries
+from hamcrest import has_property
+
+import unittest
+
+from six import StringIO
+
+from nti.scorm_cloud.client.campaign import batch_addresses
+from nti.scorm_cloud.client.campaign import InvitationCampaign
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestCampaign(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', seed=1)
+        self.store.add_course('c1')
+        self.app = StandinApplication('appid', 'secret', self.store)
+        self.server = serve_in_thread(self.app)
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batch_addresses(self):
+        addresses = ['u%d@example.com' % i for i in range(10)]
+        batches = list(batch_addresses(addresses + [' u1@example.com', ''], 4))
+        assert_that([len(b) for b in batches], contains(4, 4, 2))
+        # u0%40example.com%2Cu1%40example.com is 35 characters long
+        batches = list(batch_addresses(addresses[:3], max_length=35))
+        assert_that([len(b) for b in batches], contains(2, 1))
+
+    def test_campaign(self):
+        campaign = InvitationCampaign(self.service, 'c1', async_threshold=3,
+                                      rate=None)
+        campaign.max_addresses = 5
+        addresses = ['u%d@example.com' % i for i in range(7)]
+        invitations = campaign.send(addresses)
+        assert_that(invitations, has_length(2))
+        assert_that(campaign.summary(), has_entries(u'pending', 5, u'invited', 2))
+        assert_that(campaign.send(addresses[:2]), has_length(0))
+
+        # the stand-in completes async invitations after a first check
+        assert_that(campaign.poll(), is_(1))
+        assert_that(campaign.poll(), is_(0))
+        assert_that(campaign.summary(), has_entries(u'invited', 7))
+
+        started = campaign.status('u0@example.com').invitationId
+        regid = 'inv-%s-u0@example.com' % started
+        self.store.add_registration('c1', regid, u'U', u'Zero', 'u0')
+        self.store.registrations[regid]['complete'] = 'complete'
+        assert_that(campaign.refresh(), is_(2))
+        assert_that(campaign.status('u0@example.com'),
+                    has_property('status', u'completed'))
+        assert_that(campaign.status('u0@example.com'),
+                    has_property('registrationId', regid))
+
+        buf = StringIO()
+        campaign.dump(buf)
+        buf.seek(0)
+        loaded = InvitationCampaign(self.service, 'c1').load(buf)
+        assert_that(loaded.summary(), is_(campaign.summary()))
+
+    def test_retry_failed(self):
+        campaign = InvitationCampaign(self.service, 'c1', rate=None)
+        addresses = ['u0@example.com', ' u1@example.com']
+        self.app.http_error_rate = 1.0
+        assert_that(campaign.send(addresses), has_length(0))
+        assert_that(campaign.summary(), has_entries(u'failed', 2))
+        assert_that(sorted(campaign.addresses), contains('u0@example.com', 'u1@example.com'))
+
+        # the failed addresses are sent again
+        self.app.http_error_rate = 0.0
+        assert_that(campaign.send(addresses), has_length(1))
+        assert_that(campaign.summary(), has_entries(u'invited', 2))
+        assert_that(campaign.send(addresses), has_length(0))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import is_not
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_property
+
+import unittest
+from io import BytesIO
+
+from nti.scorm_cloud.client.catalog import tokenize
+from nti.scorm_cloud.client.catalog import CourseCatalog
+
+from nti.scorm_cloud.client.course import CourseService
+
+from nti.scorm_cloud.client.request import ScormUpdateError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', seed=1)
+        self.store.add_course('intro-101', u'Intro to Kido', tags=['kido', 'term1'])
+        self.store.add_course('intro-201', u'Advanced Kido', tags=['kido'])
+        self.store.add_course('zan-101', u'Intro to Zanjutsu', tags=['term1'])
+        self.store.courses['zan-101']['learningStandard'] = 'cmi5'
+        self.server = serve_in_thread(StandinApplication('appid', 'secret', self.store))
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+        self.catalog = CourseCatalog(self.service).attach()
+
+    def tearDown(self):
+        self.catalog.detach()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def ids(self, **kwargs):
+        return [c.courseId for c in self.catalog.query(**kwargs)]
+
+    def test_tokenize(self):
+        assert_that(tokenize(u'Intro to  Kido-101'),
+                    is_(set(['intro', 'to', 'kido', '101'])))
+
+    def test_query(self):
+        assert_that(self.catalog.sync(), is_(3))
+        assert_that(self.ids(), contains('intro-101', 'intro-201', 'zan-101'))
+        assert_that(self.ids(tags='kido,term1'), contains('intro-101'))
+        assert_that(self.ids(tags=['term1'], courseIdFilterRegex='^zan'),
+                    contains('zan-101'))
+        assert_that(self.ids(title=u'intro'), contains('intro-101', 'zan-101'))
+        assert_that(self.ids(learningStandard='cmi5'), contains('zan-101'))
+        assert_that(self.ids(tags='missing'), has_length(0))
+        assert_that(self.catalog.get('intro-201'),
+                    has_property('title', u'Advanced Kido'))
+
+    def test_incremental(self):
+        self.catalog.sync()
+        tags = self.service.get_tag_service()
+        tags.add_scorm_tag('intro-201', 'term1')
+        tags.remove_scorm_tag('intro-101', 'term1')
+        assert_that(self.ids(tags='term1'), contains('intro-201', 'zan-101'))
+        tags.set_scorm_tags('zan-101', ['sword'])
+        assert_that(self.catalog.get('zan-101').tags, contains('sword'))
+
+        courses = self.service.get_course_service()
+        courses.delete_course('intro-101')
+        assert_that('intro-101' in self.catalog, is_(False))
+        courses.import_uploaded_course('new-101', BytesIO(b'zip'))
+        assert_that(self.catalog.get('new-101'), has_property('courseId', 'new-101'))
+
+        # other applications are ignored
+        other = ScormCloudService.withargs('other', 'secret',
+                                           self.service.config.serviceurl)
+        self.catalog.notify(type('Event', (), {'service': other})())
+        assert_that(self.catalog, has_length(3))
+
+        self.catalog.detach()
+        tags.add_scorm_tag('new-101', 'late')
+        assert_that(self.catalog.get('new-101').tags, has_length(0))
+        assert_that(self.catalog.get('missing'), is_(none()))
+
+    def test_refresh_failure(self):
+        self.catalog.sync()
+        courses = self.service.get_course_service()
+
+        def failing(unused_self, unused_courseid):
+            raise ScormUpdateError('500 Server Error')
+
+        original = CourseService.get_course_detail
+        CourseService.get_course_detail = failing
+        try:
+            # the import succeeds, the course is loaded later
+            assert_that(courses.import_uploaded_course('new-101', BytesIO(b'zip')),
+                        is_not(none()))
+            assert_that(self.catalog.stale, contains('new-101'))
+            assert_that(self.catalog.get('new-101'), is_(none()))
+            assert_that(self.catalog.stale, contains('new-101'))
+        finally:
+            CourseService.get_course_detail = original
+        assert_that(self.catalog.get('new-101'), has_property('courseId', 'new-101'))
+        assert_that(self.catalog.stale, has_length(0))
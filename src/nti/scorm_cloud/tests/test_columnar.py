@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_entries
+
+import math
+import unittest
+from xml.dom import minidom
+
+from nti.scorm_cloud.client.columnar import ReportColumns
+
+from nti.scorm_cloud.client.registration import RegistrationReport
+
+ACTIVITY = """<activity id="%s"><title>T</title><attempts>%s</attempts>
+<complete>%s</complete><success>unknown</success><time>0000:01:30.00</time>
+<score>%s</score><objectives><objective id="obj">
+<measurestatus>%s</measurestatus><normalizedmeasure>0.5</normalizedmeasure>
+<satisfiedstatus>true</satisfiedstatus></objective></objectives>
+<children>%s</children></activity>"""
+
+REPORT = """<registrationreport format="activity" regid="%s" instanceid="0">
+<complete>%s</complete><success>passed</success><totaltime>90</totaltime>
+<score>%s</score>%s</registrationreport>"""
+
+
+def report(regid, complete, score):
+    sco = ACTIVITY % ('sco', 1, complete, score, 'false', '')
+    root = ACTIVITY % ('course', 2, complete, score, 'true', sco)
+    return REPORT % (regid, complete, score, root)
+
+
+RAW = '<rsp stat="ok"><reports>%s%s</reports></rsp>' % (
+    report('reg1', 'complete', 80), report('reg2', 'incomplete', 'unknown'))
+
+
+class TestColumnar(unittest.TestCase):
+
+    def test_raw(self):
+        columns = ReportColumns()
+        columns.add_raw(RAW)
+        assert_that(columns.regid, contains('reg1', 'reg2'))
+        assert_that(list(columns.report_complete), contains(1, 0))
+        assert_that(math.isnan(columns.report_score[1]), is_(True))
+        assert_that(columns.activity_ids, contains('course', 'sco'))
+        assert_that(list(columns.activity_parent), contains(-1, 0, -1, 2))
+        assert_that(list(columns.activity_attempts), contains(2, 1, 2, 1))
+        assert_that(columns.activity_time[0], is_(90.0))
+        assert_that(list(columns.objective_activity), contains(0, 1, 2, 3))
+        assert_that(columns.objective_measure[0], is_(0.5))
+        assert_that(math.isnan(columns.objective_measure[1]), is_(True))
+
+        assert_that(columns.completion_rate_by_activity(),
+                    is_({'course': 0.5, 'sco': 0.5}))
+        assert_that(columns.score_distribution(bins=5), contains(0, 0, 0, 0, 1))
+        assert_that(columns.score_distribution(bins=2, activityid='sco'),
+                    contains(0, 1))
+        assert_that(columns.mean_objective_measure(), has_entries('obj', 0.5))
+        assert_that(columns.to_numpy()['activity_score'].tolist()[0], is_(80.0))
+
+    def test_reports(self):
+        raw = ReportColumns()
+        raw.add_raw(RAW)
+        nodes = minidom.parseString(RAW).getElementsByTagName('registrationreport')
+        parsed = ReportColumns.fromReports(RegistrationReport.fromMinidom(n)
+                                           for n in nodes)
+        for name in ('activity_code', 'activity_parent', 'activity_complete',
+                     'objective_activity', 'objective_satisfied', 'report_time'):
+            assert_that(getattr(parsed, name), is_(getattr(raw, name)), name)
+
+    def test_numpy_views(self):
+        columns = ReportColumns()
+        columns.add_raw(RAW)
+        views = columns.to_numpy()
+        with self.assertRaises(BufferError):
+            columns.add_raw(RAW)
+        # the failed add left the tables consistent
+        assert_that(columns.regid, has_length(2))
+        assert_that(columns.report_score, has_length(2))
+
+        copies = columns.to_numpy(copy=True)
+        del views
+        columns.add_raw(RAW)
+        assert_that(columns.report_score, has_length(4))
+        assert_that(copies['report_score'].tolist(), has_length(2))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import contains
+from hamcrest import assert_that
+from hamcrest import instance_of
+from hamcrest import greater_than_or_equal_to
+
+import time
+import unittest
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+
+class TestConcurrency(unittest.TestCase):
+
+    def test_run_concurrently(self):
+        def call(item):
+            if item == 3:
+                raise ValueError(item)
+            return item * 2
+        results = run_concurrently(call, range(5), max_workers=3)
+        assert_that([r.item for r in results], contains(0, 1, 2, 3, 4))
+        assert_that([r.result for r in results], contains(0, 2, 4, None, 8))
+        assert_that(results[3].error, is_(instance_of(ValueError)))
+        assert_that(run_concurrently(call, ()), is_([]))
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(50, burst=1)
+        start = time.time()
+        run_concurrently(lambda x: x, range(6), max_workers=3,
+                         rate_limiter=limiter)
+        assert_that(time.time() - start, is_(greater_than_or_equal_to(0.09)))
+        limiter = RateLimiter(1, burst=1)
+        assert_that(limiter.try_acquire(), is_(True))
+        assert_that(limiter.try_acquire(), is_(False))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import close_to
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import same_instance
+
+import math
+import pickle
+import datetime
+import unittest
+
+from nti.scorm_cloud.client.registration import Launch
+from nti.scorm_cloud.client.registration import Activity
+from nti.scorm_cloud.client.registration import RegistrationReport
+
+from nti.scorm_cloud.datetimes import UTC
+from nti.scorm_cloud.datetimes import fixed_offset
+from nti.scorm_cloud.datetimes import parse_duration
+from nti.scorm_cloud.datetimes import parse_durations
+from nti.scorm_cloud.datetimes import parse_timestamp
+from nti.scorm_cloud.datetimes import parse_timestamps
+from nti.scorm_cloud.datetimes import timestamp_seconds
+
+
+class TestDatetimes(unittest.TestCase):
+
+    def test_parse_duration(self):
+        assert_that(parse_duration('PT1H2M3S'), is_(3723.0))
+        assert_that(parse_duration('PT0.5S'), is_(0.5))
+        assert_that(parse_duration('P1DT12H'), is_(129600.0))
+        assert_that(parse_duration('P1W'), is_(604800.0))
+        assert_that(parse_duration('0000:01:30.00'), is_(90.0))
+        assert_that(parse_duration('0001:00:04.47'), close_to(3604.47, 1e-9))
+        assert_that(parse_duration('12.5'), is_(12.5))
+        assert_that(parse_duration(0), is_(0.0))
+        assert_that(parse_duration(''), is_(none()))
+        assert_that(parse_duration(None), is_(none()))
+        assert_that(parse_duration('P'), is_(none()))
+        assert_that(parse_duration('PT'), is_(none()))
+        assert_that(parse_duration('soon'), is_(none()))
+
+    def test_parse_timestamp(self):
+        value = parse_timestamp('2011-04-05T19:06:37.780+0000')
+        assert_that(value, is_(datetime.datetime(2011, 4, 5, 19, 6, 37, 780000, UTC)))
+        assert_that(value.tzinfo, is_(same_instance(UTC)))
+
+        value = parse_timestamp('2009-10-22T08:55:08-0500')
+        assert_that(value.utcoffset(), is_(datetime.timedelta(hours=-5)))
+        assert_that(value.tzinfo, is_(same_instance(fixed_offset(-18000))))
+        assert_that(parse_timestamp('2018-01-01T10:00:00Z'),
+                    is_(datetime.datetime(2018, 1, 1, 10, tzinfo=UTC)))
+        assert_that(parse_timestamp('2018-01-01T10:00:00+05:30').utcoffset(),
+                    is_(datetime.timedelta(hours=5, minutes=30)))
+        assert_that(parse_timestamp('20180101100000'),
+                    is_(datetime.datetime(2018, 1, 1, 10)))
+        # other formats fall back to dateutil
+        assert_that(parse_timestamp('January 1, 2018'),
+                    is_(datetime.datetime(2018, 1, 1)))
+        assert_that(parse_timestamp(''), is_(none()))
+        assert_that(parse_timestamp(None), is_(none()))
+        with self.assertRaises(ValueError):
+            parse_timestamp('2018-13-01T10:00:00Z')
+
+    def test_pickle(self):
+        value = parse_timestamp('2009-10-22T08:55:08-0500')
+        assert_that(pickle.loads(pickle.dumps(value)), is_(value))
+
+    def test_timestamp_seconds(self):
+        assert_that(timestamp_seconds('1970-01-01T00:00:00Z'), is_(0.0))
+        assert_that(timestamp_seconds('1970-01-01T00:00:00-0100'), is_(3600.0))
+        assert_that(timestamp_seconds('2011-04-05T19:06:37.780+0000'),
+                    close_to(1302030397.78, 1e-6))
+        assert_that(timestamp_seconds('January 1, 1970'), is_(0.0))
+        assert_that(math.isnan(timestamp_seconds('never')), is_(True))
+        assert_that(math.isnan(timestamp_seconds(None)), is_(True))
+
+    def test_vectorized(self):
+        seconds = parse_durations(['PT1M', '0000:00:02.00', None, 'bad'])
+        assert_that(seconds, has_length(4))
+        assert_that(list(seconds[:2]), contains(60.0, 2.0))
+        assert_that([math.isnan(s) for s in seconds[2:]], contains(True, True))
+
+        times = parse_timestamps(['1970-01-01T00:01:00Z', '19700101000002', ''])
+        assert_that(list(times[:2]), contains(60.0, 2.0))
+        assert_that(math.isnan(times[2]), is_(True))
+
+    def test_models(self):
+        report = RegistrationReport('course', totaltime='0000:01:30.00')
+        assert_that(report.totaltime_seconds, is_(90.0))
+        assert_that(RegistrationReport('course').totaltime_seconds, is_(0.0))
+
+        activity = Activity('a', 'A', time_='PT2M')
+        assert_that(activity.time_seconds, is_(120.0))
+
+        launch = Launch('l', launch_time='2011-04-05T19:06:37.780+0000',
+                        update_dt='2011-04-05T19:07:06.616+0000')
+        assert_that(launch.launch_datetime,
+                    is_(datetime.datetime(2011, 4, 5, 19, 6, 37, 780000, UTC)))
+        assert_that(launch.update_datetime - launch.launch_datetime,
+                    is_(datetime.timedelta(seconds=28, microseconds=836000)))
+        assert_that(launch.exit_datetime, is_(none()))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import contains
+from hamcrest import less_than
+from hamcrest import starts_with
+from hamcrest import assert_that
+from hamcrest import instance_of
+from hamcrest import has_properties
+
+import time
+import threading
+import unittest
+
+import fudge
+
+from nti.scorm_cloud.client.concurrency import run_concurrently
+
+from nti.scorm_cloud.client.deadlines import deadline
+from nti.scorm_cloud.client.deadlines import remaining
+from nti.scorm_cloud.client.deadlines import propagating
+from nti.scorm_cloud.client.deadlines import current_deadline
+
+from nti.scorm_cloud.client.executor import ServiceExecutor
+
+from nti.scorm_cloud.client.request import ScormCloudTimeoutError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestDeadlines(unittest.TestCase):
+
+    def test_nesting(self):
+        assert_that(current_deadline(), is_(none()))
+        assert_that(remaining(), is_(none()))
+        with deadline(10) as outer:
+            assert_that(remaining(), is_(less_than(10.001)))
+            with deadline(60) as inner:
+                # the enclosing deadline is earlier
+                assert_that(inner, is_(outer))
+            with deadline(1) as inner:
+                assert_that(inner, is_(less_than(outer)))
+            with deadline():
+                assert_that(current_deadline(), is_(outer))
+            assert_that(current_deadline(), is_(outer))
+        assert_that(current_deadline(), is_(none()))
+
+    def test_propagating(self):
+        seen = []
+
+        def record():
+            seen.append(current_deadline())
+
+        with deadline(10) as value:
+            thread = threading.Thread(target=propagating(record))
+        thread.start()
+        thread.join()
+        assert_that(seen, contains(value))
+        assert_that(propagating(record), is_(record))
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_fail_fast(self, mock_session):
+        # no request is sent once the deadline has passed
+        mock_session.is_callable().returns(fudge.Fake('Session'))
+        service = ScormCloudService.withargs('appid', 'secret', 'http://localhost/api')
+        request = service.request()
+        with deadline(0):
+            with self.assertRaises(ScormCloudTimeoutError):
+                request.call_service('rustici.debug.ping')
+
+    def test_timeouts(self):
+        service = ScormCloudService.withargs('appid', 'secret', 'http://localhost/api',
+                                             connect_timeout=3, read_timeout=30)
+        request = service.request()
+        assert_that(request.timeouts(), is_((3, 30)))
+        request.timeout = 5
+        assert_that(request.timeouts(), is_((5, 5)))
+        with deadline(10):
+            assert_that(request.timeouts(), is_((5, 5)))
+            request.timeout = None
+            connect, read = request.timeouts()
+            assert_that(connect, is_(3))
+            assert_that(read, is_(less_than(10.001)))
+
+
+class TestServiceDeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=1, registrations=4, seed=1)
+        self.app = StandinApplication('appid', 'secret', self.store)
+        self.server = serve_in_thread(self.app)
+        self.url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', self.url)
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_read_timeout(self):
+        self.app.latency = 0.3
+        service = ScormCloudService.withargs('appid', 'secret', self.url,
+                                             read_timeout=0.05)
+        with self.assertRaises(ScormCloudTimeoutError):
+            service.get_registration_service().exists('reg-1')
+
+        registrations = self.service.get_registration_service()
+        start = time.time()
+        with deadline(0.05):
+            with self.assertRaises(ScormCloudTimeoutError):
+                registrations.exists('reg-1')
+        assert_that(time.time() - start, is_(less_than(0.3)))
+
+    def test_propagation(self):
+        self.app.latency = 0.1
+        registrations = self.service.get_registration_service()
+        regids = ['reg-0', 'reg-1', 'reg-2', 'reg-3']
+        with deadline(0.05):
+            results = run_concurrently(registrations.exists, regids, max_workers=2)
+        timed_out = has_properties('error', instance_of(ScormCloudTimeoutError))
+        assert_that(results, contains(*[timed_out for _ in regids]))
+
+        with deadline(0.05):
+            futures = [self.service.submit(registrations.exists, r) for r in regids]
+        for future in futures:
+            with self.assertRaises(ScormCloudTimeoutError):
+                future.result()
+
+        with ServiceExecutor(max_workers=2) as executor:
+            self.app.latency = 0.0
+            with deadline(5):
+                assert_that(list(executor.map(registrations.exists, regids)),
+                            contains(True, True, True, True))
+
+    def test_v2_timeouts(self):
+        service = ScormCloudService.withargs('appid', 'secret', self.url,
+                                             read_timeout=0.05)
+        service.v2config.host = self.url + '/v2/'
+        registrations = service.get_registration_service()
+        courses = service.get_course_service()
+        assert_that(registrations.launch('reg-1', 'http://localhost/done'),
+                    starts_with('http://standin.invalid/launch/'))
+
+        self.app.latency = 0.3
+        with self.assertRaises(ScormCloudTimeoutError):
+            registrations.launch('reg-1', 'http://localhost/done')
+        with self.assertRaises(ScormCloudTimeoutError):
+            courses.get_preview_url('course-0', 'http://localhost/done')
+        with deadline(0):
+            with self.assertRaises(ScormCloudTimeoutError):
+                registrations.launch('reg-1', 'http://localhost/done')
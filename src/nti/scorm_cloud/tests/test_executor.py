@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import is_not
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import same_instance
+from hamcrest import has_properties
+from hamcrest import greater_than_or_equal_to
+
+import time
+import threading
+import unittest
+
+from nti.scorm_cloud.client.executor import ServiceExecutor
+from nti.scorm_cloud.client.executor import ConcurrencyLimit
+
+from nti.scorm_cloud.client.request import ScormCloudError
+from nti.scorm_cloud.client.request import ScormCloudTimeoutError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=1, registrations=4, seed=1)
+        self.app = StandinApplication('appid', 'secret', self.store)
+        self.server = serve_in_thread(self.app)
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_submit_and_map(self):
+        registrations = self.service.get_registration_service()
+        future = self.service.submit(registrations.getRegistrationResult, 'reg-1', 'full')
+        assert_that(future.result(), has_properties('regid', 'reg-1'))
+        assert_that(self.service.executor, is_not(none()))
+
+        regids = ['reg-0', 'reg-1', 'reg-2', 'reg-3']
+        results = self.service.map(registrations.getRegistrationResult, regids)
+        assert_that([r.regid for r in results], contains(*regids))
+
+        future = self.service.submit(registrations.getRegistrationResult, 'missing')
+        with self.assertRaises(ScormCloudError):
+            future.result()
+        with self.assertRaises(TypeError):
+            self.service.map(registrations.exists, regids, retries=2)
+
+    def test_shared_session(self):
+        session = self.service.get_session()
+        assert_that(self.service.request().session(), is_(same_instance(session)))
+        self.service.start_executor(max_workers=16)
+        assert_that(self.service.get_session(), is_(same_instance(session)))
+        assert_that(session.get_adapter('http://x')._pool_maxsize, is_(16))
+        with self.assertRaises(ValueError):
+            self.service.start_executor()
+        self.service.shutdown()
+        assert_that(self.service.executor, is_(none()))
+        assert_that(self.service.get_session(), is_not(same_instance(session)))
+
+    def test_concurrency_limit(self):
+        self.app.latency = 0.05
+        self.service.start_executor(max_workers=4, max_concurrency=1)
+        registrations = self.service.get_registration_service()
+        start = time.time()
+        results = self.service.map(registrations.exists, ['reg-0', 'reg-1', 'reg-2', 'reg-3'])
+        assert_that(list(results), contains(True, True, True, True))
+        assert_that(time.time() - start, is_(greater_than_or_equal_to(0.2)))
+
+    def test_deadline(self):
+        release = threading.Event()
+        calls = []
+
+        def call(item):
+            calls.append(item)
+            release.wait(1)
+            return item
+
+        with ServiceExecutor(max_workers=1) as executor:
+            results = executor.map(call, range(4), timeout=0.05)
+            with self.assertRaises(ScormCloudTimeoutError):
+                list(results)
+            release.set()
+            # the calls not started in time are never made
+            future = executor.call(call, (9,), deadline=time.time() - 1)
+            with self.assertRaises(ScormCloudTimeoutError):
+                future.result()
+        assert_that(calls, has_length(1))
+
+    def test_limit(self):
+        limit = ConcurrencyLimit(1)
+        with limit:
+            assert_that(limit._semaphore.acquire(False), is_(False))
+        assert_that(limit._semaphore.acquire(False), is_(True))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import less_than
+from hamcrest import contains_string
+
+import unittest
+
+from nti.scorm_cloud.client.existence import BloomFilter
+from nti.scorm_cloud.client.existence import RegistrationOracle
+from nti.scorm_cloud.client.existence import ExistenceCheckError
+
+from nti.scorm_cloud.client.request import ScormCloudError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestExistence(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=1, registrations=20, seed=1)
+        self.server = serve_in_thread(StandinApplication('appid', 'secret', self.store))
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def oracle(self, **kwargs):
+        oracle = RegistrationOracle(self.service, **kwargs)
+        checked = []
+        check = oracle._check
+        def counted(regid):
+            checked.append(regid)
+            return check(regid)
+        oracle._check = counted
+        return oracle, checked
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add('reg-%d' % i)
+        assert_that(all('reg-%d' % i in bloom for i in range(1000)), is_(True))
+        false_positives = sum(1 for i in range(1000, 11000) if 'reg-%d' % i in bloom)
+        assert_that(false_positives, is_(less_than(200)))
+        assert_that(bloom, has_length(1000))
+
+    def test_exact(self):
+        oracle, checked = self.oracle()
+        assert_that(oracle.known('reg-1'), is_(none()))
+        assert_that(oracle.sync(), is_(20))
+        result = oracle.exists_many(['reg-1', 'reg-19', 'reg-20'])
+        assert_that(result, is_({'reg-1': True, 'reg-19': True, 'reg-20': False}))
+        assert_that(checked, has_length(0))
+
+        oracle.attach()
+        try:
+            registrations = self.service.get_registration_service()
+            registrations.createRegistration('course-0', 'reg-20', u'F', u'L', 'l')
+            registrations.deleteRegistration('reg-1')
+        finally:
+            oracle.detach()
+        assert_that(oracle.exists('reg-20'), is_(True))
+        assert_that(oracle.exists('reg-1'), is_(False))
+
+    def test_bloom(self):
+        oracle, checked = self.oracle(exact=False)
+        oracle.sync()
+        oracle.attach()
+        try:
+            registrations = self.service.get_registration_service()
+            registrations.deleteRegistration('reg-1')
+        finally:
+            oracle.detach()
+        result = oracle.exists_many(['reg-1', 'reg-2', 'missing'])
+        assert_that(result, is_({'reg-1': False, 'reg-2': True, 'missing': False}))
+        # positives are verified, negatives are not
+        assert_that(sorted(checked), is_(['reg-1', 'reg-2']))
+
+    def test_failed_checks(self):
+        oracle, checked = self.oracle()
+        check = oracle._check
+
+        def failing(regid):
+            if regid == 'reg-2':
+                raise ScormCloudError('down')
+            return check(regid)
+        oracle._check = failing
+        with self.assertRaises(ExistenceCheckError) as context:
+            oracle.exists_many(['reg-1', 'reg-2', 'reg-3', 'missing'])
+        error = context.exception
+        # the other checks are kept
+        assert_that(error.result, is_({'reg-1': True, 'reg-3': True, 'missing': False}))
+        assert_that(sorted(checked), is_(['missing', 'reg-1', 'reg-3']))
+        assert_that(error.errors, has_length(1))
+        assert_that(str(error), contains_string('reg-2'))
+        # single checks raise the error of the check
+        with self.assertRaises(ScormCloudError) as context:
+            oracle.exists('reg-2')
+        assert_that(str(context.exception), is_('down'))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_entries
+
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+
+from nti.scorm_cloud.client.gradebook import CSVWriter
+from nti.scorm_cloud.client.gradebook import ParquetWriter
+from nti.scorm_cloud.client.gradebook import GradebookExport
+from nti.scorm_cloud.client.gradebook import JSONLinesWriter
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+try:
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+
+class Crash(Exception):
+    pass
+
+
+class TestGradebook(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=2, registrations=10, seed=1)
+        self.server = serve_in_thread(StandinApplication('appid', 'secret', self.store))
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.directory, 'checkpoint.json')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def export(self, writer, **kwargs):
+        return GradebookExport(self.service, writer, self.checkpoint,
+                               rate=None, chunk=2, **kwargs)
+
+    def crash_after_first_chunk(self, writer, path):
+        def progress(unused_exported):
+            with open(path, 'ab') as fp:
+                fp.write(b'partial row')
+            raise Crash()
+        with self.assertRaises(Crash):
+            self.export(writer).run('course-0', progress)
+
+    def test_csv_resume(self):
+        path = os.path.join(self.directory, 'gradebook.csv')
+        self.crash_after_first_chunk(CSVWriter(path), path)
+        result = self.export(CSVWriter(path)).run('course-0')
+        assert_that(result, has_entries('exported', 3, 'skipped', 2))
+        with open(path) as fp:
+            rows = list(csv.DictReader(fp))
+        assert_that(sorted(r['regid'] for r in rows),
+                    is_(['reg-0', 'reg-2', 'reg-4', 'reg-6', 'reg-8']))
+        row = [r for r in rows if r['regid'] == 'reg-0'][0]
+        assert_that(row, has_entries('learnerid', 'learner-0',
+                                     'complete', self.store.registrations['reg-0']['complete']))
+        assert_that(json.loads(row['objectives']), has_length(1))
+
+    def test_retry_failed(self):
+        path = os.path.join(self.directory, 'gradebook.csv')
+        export = self.export(CSVWriter(path))
+        fetch = export._result
+
+        def _result(registration):
+            if registration.registrationId == 'reg-2':
+                raise ValueError('down')
+            return fetch(registration)
+        export._result = _result
+        result = export.run('course-0')
+        assert_that(result, has_entries('exported', 4, 'failed', {'reg-2': 'down'}))
+        with open(self.checkpoint) as fp:
+            assert_that(json.load(fp), has_entries('position', 5,
+                                                   'failed', {'reg-2': 'down'}))
+
+        result = self.export(CSVWriter(path)).run('course-0')
+        assert_that(result, has_entries('exported', 1, 'skipped', 4, 'failed', {}))
+        with open(path) as fp:
+            rows = list(csv.DictReader(fp))
+        assert_that(sorted(r['regid'] for r in rows),
+                    is_(['reg-0', 'reg-2', 'reg-4', 'reg-6', 'reg-8']))
+
+    def test_jsonl(self):
+        path = os.path.join(self.directory, 'gradebook.jsonl')
+        result = self.export(JSONLinesWriter(path), resultsformat='course').run()
+        assert_that(result, has_entries('exported', 10, 'failed', {}))
+        with open(path) as fp:
+            rows = [json.loads(line) for line in fp]
+        assert_that(rows, has_length(10))
+        assert_that(rows[0], has_entries('objectives', {}))
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_resume(self):
+        path = os.path.join(self.directory, 'gradebook')
+        self.crash_after_first_chunk(ParquetWriter(path), os.path.join(path, 'part-00001.parquet'))
+        self.export(ParquetWriter(path)).run('course-0')
+        table = pyarrow.parquet.read_table(path)
+        assert_that(table.num_rows, is_(5))
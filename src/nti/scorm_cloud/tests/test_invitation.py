@@ -8,6 +8,7 @@ from __future__ import absolute_import
 # pylint: disable=protected-access,too-many-public-methods
 
 from hamcrest import is_
+from hamcrest import contains
 from hamcrest import has_length
 from hamcrest import assert_that
 from hamcrest import has_properties
@@ -17,6 +18,7 @@ import unittest
 import fudge
 
 from nti.scorm_cloud.client.invitation import InvitationInfo
+from nti.scorm_cloud.client.invitation import InvitationChangeTracker
 
 from nti.scorm_cloud.client.request import ScormCloudError
 
@@ -191,3 +193,71 @@ class TestInvitationService(unittest.TestCase):
 
         with self.assertRaises(ScormCloudError):
             service.changeStatus('35568984-16cf-4d81-92dd-ea69eb4dacd4', True)
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_invitation_change_tracker(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        user = ('<userInvitation><email><![CDATA[%s]]></email>'
+                '<isStarted>%s</isStarted><registrationId/></userInvitation>')
+        replies = [(user % ('a@scorm.com', 'false') + user % ('b@scorm.com', 'false')),
+                   (user % ('a@scorm.com', 'true') + user % ('b@scorm.com', 'false')
+                    + user % ('c@scorm.com', 'false')),
+                   user % ('a@scorm.com', 'true')]
+
+        def get(*unused_args, **unused_kwargs):
+            users = replies.pop(0)
+            return fake_response(content='<rsp stat="ok"><invitationInfo><id>inv</id>'
+                                 '<userInvitations>%s</userInvitations>'
+                                 '</invitationInfo></rsp>' % users)
+        session = fudge.Fake().expects('get').calls(get)
+        mock_ss.is_callable().returns(session)
+
+        tracker = InvitationChangeTracker(service)
+        changes = tracker.poll('inv')
+        assert_that(changes.added, has_length(2))
+
+        changes = tracker.poll('inv')
+        assert_that(changes,
+                    has_properties('added', contains(has_properties('email', 'c@scorm.com')),
+                                   'changed', contains(has_properties('email', 'a@scorm.com',
+                                                                      'isStarted', True)),
+                                   'removed', has_length(0),
+                                   'unchanged', 1))
+
+        changes = tracker.poll('inv')
+        assert_that(changes,
+                    has_properties('removed', contains('b@scorm.com', 'c@scorm.com'),
+                                   'unchanged', 1))
+        assert_that(bool(changes), is_(True))
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_invitation_change_tracker_shapes(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        users = ('<userInvitation/>'
+                 '<userInvitation ><isStarted>false</isStarted></userInvitation>'
+                 '<userInvitation />'
+                 '<userInvitation><email><![CDATA[a&amp;b@scorm.com]]></email>'
+                 '<isStarted>false</isStarted></userInvitation>'
+                 '<userInvitation><email>c&amp;d@scorm.com</email></userInvitation>')
+
+        def get(*unused_args, **unused_kwargs):
+            return fake_response(content='<rsp stat="ok"><invitationInfo><id>inv</id>'
+                                 '<email><![CDATA[owner@scorm.com]]></email>'
+                                 '<userInvitations>%s</userInvitations>'
+                                 '</invitationInfo></rsp>' % users)
+        session = fudge.Fake().expects('get').calls(get)
+        mock_ss.is_callable().returns(session)
+
+        tracker = InvitationChangeTracker(service)
+        changes = tracker.poll('inv')
+        assert_that(changes.added, has_length(5))
+        # the keys are the emails the user invitations report
+        assert_that(changes.added[3], has_properties('email', 'a&amp;b@scorm.com'))
+        assert_that(sorted(tracker.snapshots['inv'], key=str),
+                    contains(0, 1, 2, 4, 'a&amp;b@scorm.com'))
+        changes = tracker.poll('inv')
+        assert_that(changes, has_properties('added', has_length(0),
+                                            'changed', has_length(0),
+                                            'unchanged', 5))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import is_not
+from hamcrest import has_key
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import instance_of
+from hamcrest import has_properties
+
+import pickle
+import unittest
+from xml.dom import minidom
+
+from nti.scorm_cloud.client.lazy import scan
+
+from nti.scorm_cloud.client.registration import LazyRuntime
+from nti.scorm_cloud.client.registration import LazyActivity
+from nti.scorm_cloud.client.registration import RegistrationReport
+from nti.scorm_cloud.client.registration import LazyRegistrationReport
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.client.serialization import PICKLE
+from nti.scorm_cloud.client.serialization import dumps
+from nti.scorm_cloud.client.serialization import loads
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+RUNTIME = b"""<runtime><completion_status>completed</completion_status>
+<credit>Credit</credit><entry>AbInitio</entry><exit/><location>p&amp;2</location>
+<mode>Normal</mode><score_raw>80</score_raw><total_time>0000:00:04.47</total_time>
+<timetracked>0000:00:04.47</timetracked><success_status>passed</success_status>
+<suspend_data><![CDATA[<state a="1"/>]]></suspend_data>
+<learnerpreference><audio_level>1</audio_level><language/></learnerpreference>
+<static><learner_id>learner</learner_id><learner_name>Name</learner_name></static>
+<comments_from_learner><comment><value>Hi</value><location/><date_time/></comment>
+</comments_from_learner><comments_from_lms/>
+<interactions><interaction id="q1"><timestamp>2011-04-05T19:06:37.780+0000</timestamp>
+<result>correct</result><latency>PT2S</latency><objectives/>
+<correct_responses><response id="0"><value>a</value></response></correct_responses>
+</interaction></interactions>
+<objectives><objective id="rt"><measurestatus>true</measurestatus>
+<normalizedmeasure>0.8</normalizedmeasure></objective></objectives></runtime>"""
+
+REPORT = b"""<registrationreport format="full" regid="reg1" instanceid="0">
+<complete>complete</complete><success>passed</success>
+<totaltime>0000:01:30.00</totaltime><score>80</score>
+<activity id="course"><title>Course</title><attempts>2</attempts>
+<complete>complete</complete><success>passed</success><time>0000:01:30.00</time>
+<score>80</score><satisfied>true</satisfied><completed>true</completed>
+<progressstatus>true</progressstatus><suspended>false</suspended>
+<objectives><objective id="PRIMARYOBJ"><measurestatus>true</measurestatus>
+<normalizedmeasure>0.8</normalizedmeasure><satisfiedstatus>true</satisfiedstatus>
+</objective></objectives>
+<children><activity id="sco1"><title>SCO 1</title><attempts>1</attempts>
+<objectives/><children/>%s</activity><activity id="sco2"><title>SCO 2</title>
+<attempts>0</attempts><objectives/><children/></activity></children>
+</activity></registrationreport>""" % RUNTIME
+
+
+def eager(raw):
+    node = minidom.parseString(raw).documentElement
+    return RegistrationReport.fromMinidom(node)
+
+
+class TestLazy(unittest.TestCase):
+
+    def test_scan(self):
+        attrs, fields, parts = scan(RUNTIME)
+        assert_that(attrs, is_({}))
+        assert_that(fields['exit'], is_(u''))
+        assert_that(fields['location'], is_(u'p&2'))
+        assert_that(fields['suspend_data'], is_(u'<state a="1"/>'))
+        assert_that(fields, is_not(has_key('interactions')))
+        assert_that(fields['comments_from_lms'], is_(u''))
+        assert_that(parts['comments_from_lms'], has_length(1))
+        assert_that(parts['comments_from_learner/comment'], has_length(1))
+        start, end = parts['interactions/interaction'][0]
+        assert_that(RUNTIME[start:end].startswith(b'<interaction id="q1">'), is_(True))
+        assert_that(RUNTIME[start:end].endswith(b'</interaction>'), is_(True))
+
+        raw = b'<r><a><b/></a><c/><d></d></r>'
+        _, fields, parts = scan(raw)
+        assert_that(fields, is_({'c': u'', 'd': u''}))
+        assert_that([raw[s:e] for s, e in parts['a'] + parts['a/b'] + parts['c'] + parts['d']],
+                    contains(b'<a><b/></a>', b'<b/>', b'<c/>', b'<d></d>'))
+
+    def test_report(self):
+        report = LazyRegistrationReport.fromBytes(REPORT)
+        assert_that(report,
+                    has_properties('format', 'full',
+                                   'regid', 'reg1',
+                                   'instanceid', '0',
+                                   'complete', 'complete',
+                                   'success', 'passed',
+                                   'totaltime', '0000:01:30.00',
+                                   'score', '80'))
+        # the activity is neither scanned nor parsed yet
+        parts = report._v_retained.parts
+        assert_that(parts, has_key('activity'))
+        assert_that(parts, is_not(has_key('activity/title')))
+        assert_that(report.materialized, is_(False))
+
+        activity = report.activity
+        assert_that(activity, instance_of(LazyActivity))
+        assert_that(report.__dict__, has_key('activity'))
+        assert_that(report.activity, is_(activity))
+        assert_that(activity,
+                    has_properties('id', 'course',
+                                   'title', 'Course',
+                                   'attempts', 2,
+                                   'satisfied', True,
+                                   'suspended', False,
+                                   'time_seconds', 90.0))
+        assert_that(activity.objectives, has_length(1))
+        assert_that(activity.objectives[0],
+                    has_properties('id', 'PRIMARYOBJ', 'normalizedmeasure', 0.8))
+        assert_that(activity.runtime, is_(none()))
+        assert_that([c.id for c in activity.children], contains('sco1', 'sco2'))
+
+        runtime = activity.children[0].runtime
+        assert_that(runtime, instance_of(LazyRuntime))
+        assert_that(runtime, has_properties('exit', u'', 'timetracked_seconds', 4.47))
+        assert_that(runtime.interactions[0],
+                    has_properties('id', 'q1', 'latency_seconds', 2.0))
+        assert_that(runtime.comments_from_lms, is_(()))
+        assert_that(activity.children[1].runtime, is_(none()))
+
+    def test_same_as_eager(self):
+        lazy = LazyRegistrationReport.fromBytes(REPORT)
+        assert_that(dumps(lazy, PICKLE), is_(dumps(eager(REPORT), PICKLE)))
+        loaded = loads(dumps(LazyRegistrationReport.fromBytes(REPORT)))
+        assert_that(loaded, instance_of(RegistrationReport))
+        assert_that(loaded.activity.children[0].runtime.interactions, has_length(1))
+
+    def test_pickle(self):
+        report = LazyRegistrationReport.fromBytes(REPORT)
+        loaded = pickle.loads(pickle.dumps(report))
+        assert_that(report.materialized, is_(True))
+        assert_that(loaded.__dict__, is_not(has_key('_v_retained')))
+        assert_that(loaded.activity.children[0].runtime.static,
+                    has_properties('learner_id', 'learner'))
+
+    def test_service(self):
+        store = StandinStore('appid', courses=1, registrations=2, seed=1)
+        server = serve_in_thread(StandinApplication('appid', 'secret', store))
+        try:
+            url = 'http://%s:%s/api' % server.server_address[:2]
+            service = ScormCloudService.withargs('appid', 'secret', url)
+            registrations = service.get_registration_service()
+            report = registrations.getRegistrationResult('reg-1', 'full', lazy=True)
+            expected = registrations.getRegistrationResult('reg-1', 'full')
+            assert_that(report, instance_of(LazyRegistrationReport))
+            assert_that(dumps(report, PICKLE), is_(dumps(expected, PICKLE)))
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_properties
+
+import unittest
+
+from nti.scorm_cloud.client.learners import summarize
+from nti.scorm_cloud.client.learners import LearnerSnapshot
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestLearners(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=1, registrations=4, seed=1)
+        self.server = serve_in_thread(StandinApplication('appid', 'secret', self.store))
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_update_learner_info_many(self):
+        snapshot = LearnerSnapshot.fromService(self.service)
+        assert_that(snapshot, has_length(4))
+        changes = [{'learnerid': 'learner-0', 'fname': u'First0'},
+                   {'learnerid': 'learner-1', 'email': 'new@example.com'},
+                   {'learnerid': 'learner-1', 'lname': u'Kurosaki'},
+                   {'learnerid': 'learner-2', 'newid': 'learner-22'},
+                   {'learnerid': 'missing', 'fname': u'Nobody'}]
+        registrations = self.service.get_registration_service()
+        results = registrations.updateLearnerInfoMany(changes, snapshot, rate=None)
+        assert_that(summarize(results),
+                    is_({'unchanged': 1, 'updated': 2, 'failed': 1}))
+        reg = self.store.registrations['reg-1']
+        assert_that((reg['fname'], reg['lname'], reg['email']),
+                    is_((u'First1', u'Kurosaki', 'new@example.com')))
+        assert_that(self.store.registrations['reg-2']['learnerid'], is_('learner-22'))
+        assert_that(snapshot.get('learner-1'),
+                    has_properties('lastName', u'Kurosaki',
+                                   'email', 'new@example.com'))
+        assert_that(snapshot.get('learner-22'), has_properties('firstName', u'First2'))
+        assert_that(results['missing'].status, is_('failed'))
+
+        # a second run changes nothing
+        results = registrations.update_learner_info_many(changes[:3], snapshot)
+        assert_that(summarize(results), is_({'unchanged': 2}))
+
+        loaded = LearnerSnapshot.fromDict(snapshot.toDict())
+        assert_that(loaded, has_length(4))
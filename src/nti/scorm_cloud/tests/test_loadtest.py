@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import has_key
+from hamcrest import has_length
+from hamcrest import has_entries
+from hamcrest import assert_that
+from hamcrest import greater_than
+
+import unittest
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.loadtest import LoadTest
+from nti.scorm_cloud.utils.loadtest import parse_mix
+from nti.scorm_cloud.utils.loadtest import percentile
+from nti.scorm_cloud.utils.loadtest import format_report
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_parse_mix(self):
+        assert_that(parse_mix('create=1, result=6,list'),
+                    is_({'create': 1.0, 'result': 6.0, 'list': 1.0}))
+        with self.assertRaises(ValueError):
+            parse_mix('delete=1')
+        with self.assertRaises(ValueError):
+            parse_mix('create=0')
+
+    def test_percentile(self):
+        ordered = list(range(1, 101))
+        assert_that(percentile(ordered, 0.5), is_(50))
+        assert_that(percentile(ordered, 0.99), is_(99))
+        assert_that(percentile(ordered, 1.0), is_(100))
+        assert_that(percentile([], 0.5), is_(none()))
+
+    def test_run(self):
+        store = StandinStore('appid', courses=1, registrations=5, seed=1)
+        server = serve_in_thread(StandinApplication('appid', 'secret', store))
+        try:
+            url = 'http://%s:%s/api' % server.server_address[:2]
+            service = ScormCloudService.withargs('appid', 'secret', url)
+            service.v2config.host = url + '/v2/'
+            test = LoadTest(service, 'course-0', 'create=1,result=2,launch=1,list=1',
+                            rps=100, workers=2, duration=None, requests=20, seed=1)
+            assert_that(test.prime(), is_(5))
+            report = test.run()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert_that(report, has_entries('requests', 20,
+                                        'errors', 0,
+                                        'throughput', greater_than(0)))
+        assert_that(report['operations'], has_key('create'))
+        assert_that(report['operations']['create'],
+                    has_entries('count', greater_than(0),
+                                'p50', greater_than(0)))
+        assert_that(format_report(report).splitlines(), has_length(6))
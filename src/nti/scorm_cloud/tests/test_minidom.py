@@ -9,14 +9,23 @@ from __future__ import absolute_import
 
 from hamcrest import is_
 from hamcrest import none
+from hamcrest import is_not
+from hamcrest import contains
+from hamcrest import has_length
 from hamcrest import assert_that
+from hamcrest import same_instance
 
 import unittest
 
 from xml.dom import minidom
 
+from nti.scorm_cloud.minidom import getChildren
 from nti.scorm_cloud.minidom import getChildText
 from nti.scorm_cloud.minidom import getChildCDATA
+from nti.scorm_cloud.minidom import getFirstChild
+from nti.scorm_cloud.minidom import getChildIndex
+from nti.scorm_cloud.minidom import getChildNodesByName
+from nti.scorm_cloud.minidom import getChildTextOrCDATA
 
 
 class TestMinidom(unittest.TestCase):
@@ -25,3 +34,25 @@ class TestMinidom(unittest.TestCase):
         dom = minidom.parseString('<slideshow />')
         assert_that(getChildText(dom, 'a'), is_(none()))
         assert_that(getChildCDATA(dom, 'a'), is_(none()))
+
+    def test_child_index(self):
+        node = minidom.parseString('<r><a>1</a>t<b><![CDATA[2]]></b><a>3</a>'
+                                   '<c><d/><d/></c></r>').documentElement
+        index = getChildIndex(node)
+        assert_that([n.tagName for n in index['*']], contains('a', 'b', 'a', 'c'))
+        assert_that(index['a'], has_length(2))
+        assert_that(getChildIndex(node), is_(same_instance(index)))
+        assert_that(getChildText(node, 'a'), is_('1'))
+        assert_that(getChildCDATA(node, 'b'), is_('2'))
+        assert_that(getChildTextOrCDATA(node, 'b'), is_('2'))
+        assert_that(getChildren(node, 'c', 'd'), has_length(2))
+        assert_that(getChildren(node, 'x', 'd'), is_(none()))
+        # callers get their own lists
+        getChildNodesByName(node, 'a').pop()
+        assert_that(getChildNodesByName(node, 'a'), has_length(2))
+
+        # adding children rebuilds the index
+        node.appendChild(node.ownerDocument.createElement('e'))
+        assert_that(getChildIndex(node), is_not(same_instance(index)))
+        assert_that(getFirstChild(node, 'e').tagName, is_('e'))
+        assert_that(getChildNodesByName(node, '*'), has_length(5))
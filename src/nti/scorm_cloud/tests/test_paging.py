@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+
+import time
+import datetime
+import threading
+import unittest
+
+from nti.scorm_cloud.client.paging import parse_timestamp
+from nti.scorm_cloud.client.paging import format_timestamp
+from nti.scorm_cloud.client.paging import AdaptiveWindowIterator
+
+
+class TestPaging(unittest.TestCase):
+
+    def test_timestamps(self):
+        dt = parse_timestamp('2011-02-01T21:39:23Z')
+        assert_that(dt, is_(datetime.datetime(2011, 2, 1, 21, 39, 23)))
+        assert_that(format_timestamp(dt), is_('2011-02-01T21:39:23Z'))
+        assert_that(format_timestamp('20110201'), is_('20110201'))
+        assert_that(parse_timestamp('2011-02-01T16:39:23-05:00'), is_(dt))
+
+    def test_windows(self):
+        calls = []
+
+        def fetch(after, until):
+            calls.append((after, until))
+            return [after] * (len(calls) * 5)
+
+        it = AdaptiveWindowIterator(fetch, '2011-01-01T00:00:00Z',
+                                    '2011-01-10T00:00:00Z',
+                                    window=datetime.timedelta(days=1),
+                                    target_size=20)
+        windows = list(it.windows())
+        # 5 items grows the window, 10 through 40 keep it
+        assert_that([until - after for after, until, _ in windows][:3],
+                    contains(datetime.timedelta(days=1),
+                             datetime.timedelta(days=2),
+                             datetime.timedelta(days=2)))
+        assert_that(calls[0], is_(('2011-01-01T00:00:00Z', '2011-01-02T00:00:00Z')))
+        assert_that(windows[-1][1], is_(datetime.datetime(2011, 1, 10)))
+
+        for after, until in zip(calls, calls[1:]):
+            assert_that(after[1], is_(until[0]))
+
+    def test_iteration(self):
+
+        def fetch(after, unused_until):
+            return [after, after]
+
+        it = AdaptiveWindowIterator(fetch, '2011-01-01T00:00:00Z',
+                                    '2011-01-03T00:00:00Z',
+                                    window=datetime.timedelta(days=1),
+                                    target_size=2)
+        assert_that(list(it), contains('2011-01-01T00:00:00Z',
+                                       '2011-01-01T00:00:00Z',
+                                       '2011-01-02T00:00:00Z',
+                                       '2011-01-02T00:00:00Z'))
+
+    def test_error(self):
+
+        def fetch(unused_after, unused_until):
+            raise ValueError()
+
+        it = AdaptiveWindowIterator(fetch, '2011-01-01T00:00:00Z',
+                                    '2011-01-03T00:00:00Z')
+        with self.assertRaises(ValueError):
+            list(it)
+
+    def test_early_close(self):
+
+        def fetch(after, unused_until):
+            return [after] * 5
+
+        it = iter(AdaptiveWindowIterator(fetch, '2011-01-01T00:00:00Z',
+                                         '2011-03-01T00:00:00Z',
+                                         window=datetime.timedelta(hours=1),
+                                         prefetch=1))
+        assert_that([next(it) for _ in range(3)], has_length(3))
+        it.close()
+
+    def test_abandoned(self):
+        fetched = threading.Event()
+
+        def fetch(after, unused_until):
+            if after != '2011-01-01T00:00:00Z':
+                fetched.set()
+            return [after]
+
+        def producers():
+            return [t for t in threading.enumerate()
+                    if t.name == 'scorm-cloud-window-prefetch']
+
+        it = iter(AdaptiveWindowIterator(fetch, '2011-01-01T00:00:00Z',
+                                         '2011-01-03T00:00:00Z',
+                                         window=datetime.timedelta(days=1),
+                                         prefetch=1))
+        next(it)
+        fetched.wait(1)
+        time.sleep(0.2)
+        # the producer is left waiting to put the end of the iteration
+        it.close()
+        for thread in producers():
+            thread.join(1)
+        assert_that(producers(), has_length(0))
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import contains
+from hamcrest import has_item
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_properties
+
+import pickle
+import unittest
+
+from nti.scorm_cloud.client.invitation import InvitationInfo
+
+from nti.scorm_cloud.client.registration import Launch
+from nti.scorm_cloud.client.registration import Registration
+from nti.scorm_cloud.client.registration import LaunchHistory
+from nti.scorm_cloud.client.registration import RegistrationReport
+
+from nti.scorm_cloud.client.request import ScormCloudError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.minidom import getChildText
+from nti.scorm_cloud.minidom import getAttributes
+from nti.scorm_cloud.minidom import getFirstChild
+from nti.scorm_cloud.minidom import getElementsByName
+from nti.scorm_cloud.minidom import getChildNodesByName
+
+from nti.scorm_cloud.parsers import PARSERS
+from nti.scorm_cloud.parsers import get_parser
+from nti.scorm_cloud.parsers import parser_for
+from nti.scorm_cloud.parsers import default_parser
+from nti.scorm_cloud.parsers import available_parsers
+from nti.scorm_cloud.parsers import set_default_parser
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+REGISTRATION = b"""<registration id="reg1" courseid="course1">
+<appId>app</appId><registrationId>reg1</registrationId><courseId>course1</courseId>
+<courseTitle><![CDATA[Course & <One>]]></courseTitle>
+<lastCourseVersionLaunched>0</lastCourseVersionLaunched>
+<learnerId>learner</learnerId><learnerFirstName>Ichigo</learnerFirstName>
+<learnerLastName>Kurosaki</learnerLastName><email/>
+<createDate>2018-01-01T10:00:00.000+0000</createDate>
+<firstAccessDate/><lastAccessDate/><completedDate/>
+<instances><instance><instanceId>0</instanceId><courseVersion>0</courseVersion>
+<updateDate>2018-01-01T10:00:00.000+0000</updateDate></instance>
+<instance><instanceId>1</instanceId><courseVersion>1</courseVersion>
+<updateDate/></instance></instances></registration>"""
+
+REPORT = b"""<registrationreport format="full" regid="reg1" instanceid="0">
+<complete>complete</complete><success>passed</success>
+<totaltime>0000:01:30.00</totaltime><score>80</score>
+<activity id="course"><title>Course</title><attempts>2</attempts>
+<complete>complete</complete><success>passed</success><time>0000:01:30.00</time>
+<score>80</score><satisfied>true</satisfied><completed>true</completed>
+<progressstatus>true</progressstatus><suspended>false</suspended>
+<objectives><objective id="PRIMARYOBJ"><measurestatus>true</measurestatus>
+<normalizedmeasure>0.8</normalizedmeasure><satisfiedstatus>true</satisfiedstatus>
+</objective></objectives>
+<children><activity id="sco1"><title>SCO 1</title><attempts>1</attempts>
+<objectives/><children/><runtime><completion_status>completed</completion_status>
+<credit>Credit</credit><entry>AbInitio</entry><exit/><location>p&amp;2</location>
+<mode>Normal</mode><score_raw>80</score_raw><total_time>0000:00:04.47</total_time>
+<timetracked>0000:00:04.47</timetracked><success_status>passed</success_status>
+<suspend_data><![CDATA[<state a="1"/>]]></suspend_data>
+<learnerpreference><audio_level>1</audio_level><language/></learnerpreference>
+<static><learner_id>learner</learner_id><learner_name>Name</learner_name></static>
+<comments_from_learner><comment><value>Hi <!-- there --></value><location/>
+<date_time/></comment></comments_from_learner><comments_from_lms/>
+<interactions><interaction id="q1"><timestamp>2011-04-05T19:06:37.780+0000</timestamp>
+<result>correct</result><latency>PT2S</latency><objectives/>
+<correct_responses><response id="0"><value>a</value></response></correct_responses>
+</interaction></interactions><objectives><objective id="rt">
+<measurestatus>true</measurestatus><normalizedmeasure>0.8</normalizedmeasure>
+</objective></objectives></runtime></activity>
+<activity id="sco2"><title>SCO 2</title><attempts>0</attempts><objectives/>
+<children/><runtime/></activity></children></activity></registrationreport>"""
+
+LAUNCHES = b"""<launchhistory regid="reg1">
+<launch id="l1"><completion>complete</completion><satisfaction>failed</satisfaction>
+<measure_status>1</measure_status><normalized_measure>0.2</normalized_measure>
+<experienced_duration_tracked>2628</experienced_duration_tracked>
+<launch_time>2011-04-05T19:06:37.780+0000</launch_time>
+<exit_time>2011-04-05T19:07:06.616+0000</exit_time>
+<update_dt>2011-04-05T19:07:06.616+0000</update_dt>
+<log><RuntimeLog browser="Mozilla/4.0" version="2009.1.0.15538">
+<RuntimeEvent attemptNo="1" event="AttemptStart" id="0" timestamp="14:07:06.97"/>
+<RuntimeEvent attemptNo="1" event="Exit" id="1" timestamp="14:07:36.21"/>
+</RuntimeLog></log></launch>
+<launch id="l2"><completion>unknown</completion><log/></launch></launchhistory>"""
+
+INVITATION = b"""<invitationInfo>
+<id><![CDATA[inv1]]></id><body><![CDATA[Dear [USER],<p>Play</p>]]></body>
+<courseId><![CDATA[course1]]></courseId><subject><![CDATA[Subject]]></subject><url/>
+<allowLaunch>true</allowLaunch><allowNewRegistrations>true</allowNewRegistrations>
+<public>false</public><created>true</created>
+<createdDate>2012-05-02T22:13:47.503+0000</createdDate>
+<userInvitations><userInvitation><email><![CDATA[email1@scorm.com]]></email>
+<url><![CDATA[http://cloud.scorm.com/launch?id=1&amp=2]]></url>
+<isStarted>false</isStarted><registrationId><![CDATA[reg1]]></registrationId>
+<registrationreport format="course" regid="reg1" instanceid="0">
+<complete>unknown</complete><success>unknown</success><totaltime>0</totaltime>
+<score>unknown</score></registrationreport></userInvitation>
+</userInvitations></invitationInfo>"""
+
+#: The shared fixtures every backend must build the same models from
+FIXTURES = (
+    (Registration, REGISTRATION),
+    (RegistrationReport, REPORT),
+    (LaunchHistory, LAUNCHES),
+    (InvitationInfo, INVITATION),
+)
+
+
+class TestParsers(unittest.TestCase):
+
+    def tearDown(self):
+        set_default_parser(None)
+
+    def test_available(self):
+        names = available_parsers()
+        assert_that(names, has_item('minidom'))
+        assert_that(default_parser().name, is_(names[0]))
+        assert_that(list(PARSERS), has_item(names[0]))
+        set_default_parser('minidom')
+        assert_that(default_parser().name, is_('minidom'))
+        with self.assertRaises(ValueError):
+            get_parser('expat')
+        with self.assertRaises(TypeError):
+            parser_for(object())
+
+    def test_same_models(self):
+        minidom = get_parser('minidom')
+        for name in available_parsers():
+            parser = get_parser(name)
+            for model, raw in FIXTURES:
+                node = parser.parse(raw)
+                assert_that(parser_for(node), is_(parser))
+                assert_that(pickle.dumps(model.fromMinidom(node), 2),
+                            is_(pickle.dumps(model.fromMinidom(minidom.parse(raw)), 2)),
+                            '%s %s' % (name, model.__name__))
+
+    def test_element_protocol(self):
+        raw = b'<r a="1" b="2"><x>one</x><!-- c --><y><x>two</x></y><x/>t</r>'
+        for name in available_parsers():
+            node = get_parser(name).parse(raw)
+            assert_that(sorted(getAttributes(node)), contains(('a', '1'), ('b', '2')))
+            assert_that(getChildNodesByName(node, '*'), has_length(3))
+            assert_that(getChildNodesByName(node, 'x'), has_length(2))
+            assert_that(getElementsByName(node, 'x'), has_length(3))
+            assert_that(getChildText(node, 'x'), is_('one'))
+            assert_that(getChildText(node, 'z'), is_(none()))
+            assert_that(getChildText(getFirstChild(node, 'y'), 'x'), is_('two'))
+            assert_that(getFirstChild(node, 'z'), is_(none()))
+
+        report = RegistrationReport.fromMinidom(get_parser().parse(REPORT))
+        runtime = report.activity.children[0].runtime
+        assert_that(runtime, has_properties('location', 'p&2',
+                                            'suspend_data', '<state a="1"/>'))
+        assert_that(runtime.comments_from_learner[0].value, is_('Hi '))
+        launch = Launch.fromMinidom(getFirstChild(get_parser().parse(LAUNCHES), 'launch'))
+        assert_that(launch.runtimelog.events, has_length(2))
+
+    def test_service(self):
+        store = StandinStore('appid', courses=1, registrations=2, invitations=1, seed=1)
+        server = serve_in_thread(StandinApplication('appid', 'secret', store))
+        try:
+            url = 'http://%s:%s/api' % server.server_address[:2]
+            service = ScormCloudService.withargs('appid', 'secret', url)
+            registrations = service.get_registration_service()
+            results = {}
+            for name in available_parsers():
+                service.parser = name
+                results[name] = pickle.dumps(
+                    (registrations.getRegistrationList(),
+                     registrations.getRegistrationResult('reg-1', 'full'),
+                     service.get_invitation_service().getInvitationList()), 2)
+            assert_that(set(results.values()), has_length(1))
+
+            service = ScormCloudService.withargs('appid', 'wrong', url)
+            with self.assertRaises(ScormCloudError):
+                service.get_registration_service().getRegistrationList()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_invalid_response(self):
+        service = ScormCloudService.withargs('appid', 'secret', 'http://localhost/api')
+        request = service.request()
+        for name in available_parsers():
+            service.parser = name
+            with self.assertRaises(ScormCloudError):
+                request.get_element(b'<rsp stat="ok"><unclosed></rsp>')
+            try:
+                request.get_element(b'<rsp stat="fail"><err code="100" msg="Bad"/></rsp>')
+            except ScormCloudError as e:
+                assert_that(e, has_properties('code', '100', 'json', 'Bad'))
+            else:  # pragma: no cover
+                self.fail('no error raised')
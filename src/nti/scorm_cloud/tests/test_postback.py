@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_properties
+
+import os
+import base64
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+
+from six.moves import urllib_parse
+
+from nti.scorm_cloud.client.postback import PostbackManager
+from nti.scorm_cloud.client.postback import PostbackApplication
+
+from nti.scorm_cloud.client.registration import PostbackInfo
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+REPORT = """<?xml version="1.0" encoding="utf-8" ?>
+<registrationreport format="course" regid="reg1" instanceid="0">
+    <complete>complete</complete>
+    <success>passed</success>
+    <totaltime>120</totaltime>
+    <score>87</score>
+</registrationreport>"""
+
+
+class TestPostback(unittest.TestCase):
+
+    def post(self, app, form=None, method='POST', **environ):
+        body = urllib_parse.urlencode(form or {}).encode('ascii')
+        environ.update({'REQUEST_METHOD': method,
+                        'CONTENT_LENGTH': str(len(body)),
+                        'wsgi.input': BytesIO(body)})
+        statuses = []
+        app(environ, lambda status, headers: statuses.append(status))
+        return statuses[0]
+
+    def test_form(self):
+        app = PostbackApplication('form', 'ichigo', 'zangetsu', maxsize=1)
+        assert_that(self.post(app, method='GET'), is_('405 Method Not Allowed'))
+        assert_that(self.post(app, {'data': REPORT}), is_('401 Unauthorized'))
+        form = {'data': REPORT, 'username': 'ichigo', 'password': 'zangetsu'}
+        assert_that(self.post(app, form), is_('200 OK'))
+        postback = app.queue.get_nowait()
+        assert_that(postback.regid, is_('reg1'))
+        assert_that(postback.report,
+                    has_properties('complete', 'complete',
+                                   'success', 'passed',
+                                   'score', '87'))
+
+        assert_that(self.post(app, dict(form, data='<bad')), is_('400 Bad Request'))
+        assert_that(self.post(app, form), is_('200 OK'))
+        assert_that(self.post(app, form), is_('503 Service Unavailable'))
+
+    def test_httpbasic(self):
+        info = PostbackInfo('reg1', 'http://example.com', 'httpbasic',
+                            'ichigo', 'zangetsu')
+        app = PostbackApplication.fromPostbackInfo(info)
+        assert_that(self.post(app, {'data': REPORT}), is_('401 Unauthorized'))
+        auth = 'Basic ' + base64.b64encode(b'ichigo:zangetsu').decode('ascii')
+        assert_that(self.post(app, {'data': REPORT}, HTTP_AUTHORIZATION=auth),
+                    is_('200 OK'))
+        auth = 'Basic ' + base64.b64encode(b'ichigo:bankai').decode('ascii')
+        assert_that(self.post(app, {'data': REPORT}, HTTP_AUTHORIZATION=auth),
+                    is_('401 Unauthorized'))
+        with self.assertRaises(ValueError):
+            PostbackApplication('digest')
+
+
+class TestPostbackManager(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=2, registrations=10, seed=1)
+        self.server = serve_in_thread(StandinApplication('appid', 'secret', self.store))
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def test_run(self):
+        new = {'url': 'http://new.example.com', 'authtype': 'form',
+               'login': 'ichigo', 'password': 'zangetsu'}
+        self.store.postbacks['reg-0'] = dict(new)
+        checkpoint = os.path.join(self.directory, 'postbacks.json')
+        manager = PostbackManager(self.service, checkpoint=checkpoint,
+                                  chunk=2, rate=None, **new)
+        regids = manager.select(courseid='course-0')
+        assert_that(regids, has_length(5))
+
+        # fail the last chunk
+        self.store.registrations.pop('reg-8')
+        chunks = []
+        state = manager.run(regids, progress=lambda s: chunks.append(len(s.done)))
+        assert_that(chunks, is_([2, 4, 4]))
+        assert_that(state.updated, is_(set(['reg-2', 'reg-4', 'reg-6'])))
+        assert_that(sorted(state.failed), is_(['reg-8']))
+        assert_that(self.store.postbacks['reg-2'], is_(new))
+
+        # resume: only the failed registration is retried
+        self.store.add_registration('course-0', 'reg-8', u'F', u'L', 'learner-8')
+        state = manager.run(courseid='course-0')
+        assert_that(state.failed, has_length(0))
+        assert_that(state.done, has_length(5))
+        assert_that(state.remaining, is_(0))
+        assert_that(state.updated, has_length(4))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import same_instance
+from hamcrest import has_properties
+from hamcrest import contains_inanyorder
+
+import unittest
+
+from nti.scorm_cloud.client.cache import MemoryResponseCache
+
+from nti.scorm_cloud.client.projection import COURSE
+from nti.scorm_cloud.client.projection import REGISTRATION
+
+from nti.scorm_cloud.client.request import ScormCloudError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestProjection(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', courses=2, registrations=5,
+                                  invitations=2, seed=1)
+        self.server = serve_in_thread(StandinApplication('appid', 'secret', self.store))
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_parse(self):
+        raw = (b'<rsp stat="ok"><courselist>'
+               b'<course id="c1" title="One &amp; Only" versions="2" registrations="3">'
+               b'<tags><tag>a</tag><tag>b</tag></tags><learningStandard/></course>'
+               b'<course id="c2" title="Two" versions="1" registrations="0"/>'
+               b'</courselist></rsp>')
+        records, stat = COURSE.parse(raw, ('courseId', 'title', 'tags',
+                                           'learningStandard'))
+        assert_that(stat, is_('ok'))
+        assert_that(records, contains((u'c1', u'One & Only', [u'a', u'b'], None),
+                                      (u'c2', u'Two', [], None)))
+        assert_that(records[0]._fields,
+                    is_(('courseId', 'title', 'tags', 'learningStandard')))
+        assert_that(type(records[0]),
+                    is_(same_instance(COURSE.record_type(records[0]._fields))))
+
+        raw = (b'<rsp stat="ok"><registrationlist><registration id="r1">'
+               b'<registrationId>r1</registrationId><instances><instance>'
+               b'<registrationId>nested</registrationId></instance></instances>'
+               b'<learnerId><![CDATA[l1]]></learnerId></registration>'
+               b'</registrationlist></rsp>')
+        records, _ = REGISTRATION.parse(raw, 'registrationId')
+        assert_that(records, contains((u'r1',)))
+        records, _ = REGISTRATION.parse(raw, ('learnerId', 'email'))
+        assert_that(records, contains((u'l1', None)))
+
+    def test_invalid_fields(self):
+        with self.assertRaises(ValueError):
+            REGISTRATION.validate(('registrationId', 'instances'))
+        with self.assertRaises(ValueError):
+            REGISTRATION.validate(())
+
+    def test_registrations(self):
+        service = self.service.get_registration_service()
+        records = service.getRegistrationList(courseid='course-0',
+                                              fields=('registrationId', 'learnerId'))
+        expected = service.getRegistrationList(courseid='course-0')
+        assert_that(records, has_length(3))
+        assert_that(records,
+                    contains_inanyorder(*[(r.registrationId, r.learnerId) for r in expected]))
+        assert_that(records[0], has_properties('registrationId', expected[0].registrationId))
+
+        # served from the response cache
+        self.service.response_cache = MemoryResponseCache()
+        records = service.get_registration_list(fields=['email'])
+        assert_that(records, has_length(5))
+        assert_that(service.get_registration_list(fields=['email']), is_(records))
+
+    def test_invitations(self):
+        service = self.service.get_invitation_service()
+        fields = ('id', 'courseId', 'public', 'allowLaunch', 'createdDate')
+        records = service.getInvitationList(fields=fields)
+        expected = service.getInvitationList()
+        assert_that(records,
+                    contains_inanyorder(*[tuple(getattr(i, f) for f in fields)
+                                          for i in expected]))
+
+    def test_courses(self):
+        service = self.service.get_course_service()
+        fields = ('courseId', 'title', 'numberOfVersions', 'numberOfRegistrations',
+                  'tags', 'learningStandard')
+        records = service.get_course_list(fields=fields)
+        expected = service.get_course_list()
+        assert_that(records,
+                    contains_inanyorder(*[tuple(getattr(c, f) for f in fields)
+                                          for c in expected]))
+
+    def test_error(self):
+        service = ScormCloudService.withargs('appid', 'wrong', self.service.config.serviceurl)
+        with self.assertRaises(ScormCloudError):
+            service.get_registration_service().getRegistrationList(fields='registrationId')
@@ -8,6 +8,7 @@ from __future__ import absolute_import
 # pylint: disable=protected-access,too-many-public-methods
 
 from hamcrest import is_
+from hamcrest import contains
 from hamcrest import not_none
 from hamcrest import has_length
 from hamcrest import assert_that
@@ -15,6 +16,7 @@ from hamcrest import starts_with
 from hamcrest import has_property
 from hamcrest import has_properties
 
+import datetime
 import unittest
 
 import fudge
@@ -226,6 +228,33 @@ class TestRegistrationService(unittest.TestCase):
                                    'createDate', '2011-03-23T14:00:45.000+0000',
                                    'instances', has_length(0)))
 
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_iter_registration_list(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        reg = service.get_registration_service()
+
+        reply = """
+        <registrationlist>
+            <registration id="reg4" courseid="test321">
+                <registrationId>reg4</registrationId>
+                <courseId>test321</courseId>
+            </registration>
+        </registrationlist>
+        """
+        reply = '<rsp stat="ok">%s</rsp>' % reply
+        data = fake_response(content=reply)
+        session = fudge.Fake().expects('get').returns(data)
+        mock_ss.is_callable().returns(session)
+
+        registrations = reg.iterRegistrationList("2011-02-01T00:00:00Z",
+                                                 "2011-02-03T00:00:00Z",
+                                                 courseid="test321",
+                                                 window=datetime.timedelta(days=1))
+        assert_that(list(registrations),
+                    contains(has_property('registrationId', 'reg4'),
+                             has_property('registrationId', 'reg4')))
+
     @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
     def test_get_registration_detail(self, mock_ss):
         service = ScormCloudService.withargs("appid", "secret",
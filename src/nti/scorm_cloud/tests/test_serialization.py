@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_property
+from hamcrest import has_properties
+
+import pickle
+import unittest
+from xml.dom import minidom
+
+from nti.scorm_cloud.client.course import CourseData
+
+from nti.scorm_cloud.client.invitation import InvitationInfo
+
+from nti.scorm_cloud.client.registration import Registration
+from nti.scorm_cloud.client.registration import RegistrationReport
+
+from nti.scorm_cloud.client.reporting import AccountInfo
+
+from nti.scorm_cloud.client.serialization import PICKLE
+from nti.scorm_cloud.client.serialization import MSGPACK
+from nti.scorm_cloud.client.serialization import dumps
+from nti.scorm_cloud.client.serialization import loads
+from nti.scorm_cloud.client.serialization import SerializationError
+
+REPORT = u"""
+<registrationreport format="full" regid="myreg001" instanceid="0">
+    <complete>complete</complete>
+    <success>failed</success>
+    <totaltime>19</totaltime>
+    <score>0</score>
+    <activity id="TOC1">
+        <title>Photoshop Example -- Competency</title>
+        <attempts>1</attempts>
+        <complete>complete</complete>
+        <success>unknown</success>
+        <time>0000:00:00.00</time>
+        <score>unknown</score>
+        <satisfied>true</satisfied>
+        <objectives>
+            <objective id="PRIMARYOBJ">
+                <measurestatus>false</measurestatus>
+                <normalizedmeasure>0.5</normalizedmeasure>
+                <progressstatus>true</progressstatus>
+                <satisfiedstatus>true</satisfiedstatus>
+            </objective>
+        </objectives>
+        <children>
+            <activity id="preTEST">
+                <title>Pre Assessment</title>
+                <attempts>1</attempts>
+                <runtime>
+                    <completion_status>completed</completion_status>
+                    <credit>Credit</credit>
+                    <score_raw>534</score_raw>
+                    <timetracked>0000:00:04.47</timetracked>
+                    <suspend_data><![CDATA[ab]]></suspend_data>
+                    <comments_from_learner>
+                        <comment>
+                            <value><![CDATA[ouch]]></value>
+                            <location>p1</location>
+                        </comment>
+                    </comments_from_learner>
+                    <interactions>
+                        <interaction id="1">
+                            <timestamp>2011-04-05T19:06:37.780+0000</timestamp>
+                            <result>correct</result>
+                            <objectives>
+                                <objective id="PRIMARYOBJ"/>
+                            </objectives>
+                            <correct_responses>
+                                <response id="0"><![CDATA[a]]></response>
+                            </correct_responses>
+                        </interaction>
+                    </interactions>
+                    <learnerpreference>
+                        <audio_level>1.0</audio_level>
+                        <language/>
+                    </learnerpreference>
+                    <static>
+                        <learner_id>daveid</learner_id>
+                        <learner_name>dave e</learner_name>
+                    </static>
+                </runtime>
+            </activity>
+        </children>
+    </activity>
+</registrationreport>
+"""
+
+REGISTRATION = u"""
+<registration id="reg4" courseid="test321">
+    <appId>myappid</appId>
+    <registrationId>reg4</registrationId>
+    <courseId>test321</courseId>
+    <learnerFirstName>Ichigo</learnerFirstName>
+    <email>ichigo@bleach.org</email>
+    <instances>
+        <instance>
+            <instanceId>0</instanceId>
+            <courseVersion>1</courseVersion>
+        </instance>
+    </instances>
+</registration>
+"""
+
+INVITATION = u"""
+<invitationInfo>
+    <id><![CDATA[7a7f7a3b]]></id>
+    <courseId><![CDATA[course-0]]></courseId>
+    <public>true</public>
+    <userInvitations>
+        <userInvitation>
+            <email><![CDATA[a@example.org]]></email>
+            <isStarted>true</isStarted>
+            <registrationreport format="course" regid="r1" instanceid="0">
+                <complete>complete</complete>
+            </registrationreport>
+        </userInvitation>
+    </userInvitations>
+</invitationInfo>
+"""
+
+COURSE = u"""
+<course id="c1" title="Course" versions="2" registrations="5">
+    <tags><tag>a</tag><tag>b</tag></tags>
+    <learningStandard>scorm_12</learningStandard>
+</course>
+"""
+
+ACCOUNT = u"""
+<account>
+    <email>ichigo@bleach.org</email>
+    <accounttype>trial</accounttype>
+    <reglimit>10</reglimit>
+    <strictlimit>false</strictlimit>
+    <createdate>2018-01-01T10:00:00.000-0600</createdate>
+    <usage>
+        <monthstart>2018-02-01T00:00:00.000+0000</monthstart>
+        <regcount>3</regcount>
+        <totalregistrations>4</totalregistrations>
+        <totalcourses>2</totalcourses>
+    </usage>
+</account>
+"""
+
+
+def element(xml):
+    return minidom.parseString(xml.encode('utf-8')).documentElement
+
+
+def state(obj):
+    """
+    The comparable state of a model tree, ignoring volatile attributes.
+    """
+    if isinstance(obj, (list, tuple)):
+        return [state(x) for x in obj]
+    if hasattr(obj, '__dict__'):
+        return dict((k, state(v)) for k, v in obj.__dict__.items()
+                    if not k.startswith('_'))
+    return obj
+
+
+class TestSerialization(unittest.TestCase):
+
+    def roundtrip(self, obj):
+        for codec in (MSGPACK, PICKLE):
+            loaded = loads(dumps(obj, codec))
+            assert_that(state(loaded), is_(state(obj)))
+            self.assertIs(type(loaded), type(obj))
+        return loads(dumps(obj))
+
+    def test_registration_report(self):
+        report = RegistrationReport.fromMinidom(element(REPORT))
+        loaded = self.roundtrip(report)
+        assert_that(loaded._node, is_(none()))
+        runtime = loaded.activity.children[0].runtime
+        assert_that(runtime,
+                    has_properties('suspend_data', 'ab',
+                                   'static', has_property('learner_id', 'daveid'),
+                                   'comments_from_learner', has_length(1),
+                                   'comments_from_lms', is_(())))
+        assert_that(runtime.interactions[0].correct_responses[0],
+                    has_property('id', '0'))
+        assert_that(loaded.activity.objectives[0],
+                    has_property('normalizedmeasure', 0.5))
+
+    def test_registrations(self):
+        registrations = [Registration.fromMinidom(element(REGISTRATION))] * 3
+        loaded = self.roundtrip(registrations)
+        assert_that(loaded, has_length(3))
+        assert_that(loaded[0].instances[0], has_property('courseVersion', '1'))
+        assert_that(loads(dumps([])), is_([]))
+
+    def test_invitation(self):
+        info = InvitationInfo.fromMinidom(element(INVITATION))
+        loaded = self.roundtrip(info)
+        assert_that(loaded.userInvitations[0],
+                    has_property('registrationreport',
+                                 has_property('regid', 'r1')))
+
+    def test_course(self):
+        loaded = self.roundtrip(CourseData(element(COURSE)))
+        assert_that(loaded, has_properties('tags', ['a', 'b'],
+                                           'learningStandard', 'scorm_12'))
+
+    def test_account(self):
+        info = AccountInfo.createFromMinidom(element(ACCOUNT))
+        loaded = self.roundtrip(info)
+        assert_that(loaded.create_date, is_(info.create_date))
+        assert_that(loaded.create_date.utcoffset(),
+                    is_(info.create_date.utcoffset()))
+        assert_that(loaded.usage, has_property('total_courses', 2))
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            dumps(object())
+        with self.assertRaises(SerializationError):
+            loads(b'garbage')
+        data = dumps(CourseData(element(COURSE)))
+        with self.assertRaises(SerializationError):
+            loads(data[:3] + b'\xff' + data[4:])
+
+    def test_pickle_drops_node(self):
+        report = RegistrationReport.fromMinidom(element(REPORT))
+        loaded = pickle.loads(pickle.dumps(report))
+        assert_that(loaded._node, is_(none()))
+        assert_that(state(loaded), is_(state(report)))
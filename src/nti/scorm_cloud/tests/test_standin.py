@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import is_not
+from hamcrest import has_item
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_entries
+from hamcrest import has_property
+from hamcrest import has_properties
+from hamcrest import contains_inanyorder
+
+import unittest
+
+from nti.scorm_cloud.client.request import ScormCloudError
+from nti.scorm_cloud.client.request import ScormUpdateError
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
+
+class TestStandin(unittest.TestCase):
+
+    def setUp(self):
+        store = StandinStore('appid', courses=2, registrations=10,
+                             invitations=1, events=3, seed=1)
+        self.app = StandinApplication('appid', 'secret', store, seed=1)
+        self.server = serve_in_thread(self.app)
+        self.url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', self.url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_debug(self):
+        debug = self.service.get_debug_service()
+        assert_that(debug.ping(), is_(True))
+        assert_that(debug.authping(), is_(True))
+        assert_that(debug.gettime(), is_not(none()))
+
+    def test_signature(self):
+        service = ScormCloudService.withargs('appid', 'wrong', self.url)
+        with self.assertRaises(ScormCloudError):
+            service.get_registration_service().exists('reg-0')
+
+    def test_registrations(self):
+        reg = self.service.get_registration_service()
+        assert_that(reg.getRegistrationList(), has_length(10))
+        assert_that(reg.getRegistrationList(courseid='course-0'), has_length(5))
+
+        reg.createRegistration('course-1', 'bankai', 'Ichigo', 'Kurosaki',
+                               'ichigo', 'ichigo@bleach.org')
+        assert_that(reg.exists('bankai'), is_(True))
+        assert_that(reg.getRegistrationDetail('bankai'),
+                    has_properties('learnerFirstName', 'Ichigo',
+                                   'courseId', 'course-1'))
+
+        report = reg.getRegistrationResult('bankai', 'full')
+        assert_that(report,
+                    has_properties('complete', 'unknown',
+                                   'activity', has_property('runtime', is_not(none()))))
+
+        history = reg.getLaunchHistory('bankai')
+        launchid = history.launches[0].id
+        assert_that(reg.getLaunchInfo(launchid),
+                    has_property('runtimelog', has_property('events', has_length(3))))
+
+        reg.updatePostbackInfo('bankai', 'http://example.org', 'user', 'pass', 'form')
+        assert_that(reg.getPostbackInfo('bankai'),
+                    has_properties('url', 'http://example.org',
+                                   'login', 'user'))
+
+        reg.deleteRegistration('bankai')
+        assert_that(reg.exists('bankai'), is_(False))
+        with self.assertRaises(ScormCloudError):
+            reg.deleteRegistration('bankai')
+
+    def test_courses_and_tags(self):
+        courses = self.service.get_course_service()
+        assert_that(courses.get_course_list(), has_length(2))
+        assert_that(courses.get_course_list(tags='term1'),
+                    contains_inanyorder(has_property('courseId', 'course-1')))
+        assert_that(courses.update_attributes('course-0', {'showNav': 'true'}),
+                    has_entries('showNav', 'true'))
+
+        tags = self.service.get_tag_service()
+        tags.set_scorm_tags('course-0', ['a', 'b'])
+        tags.add_scorm_tag('course-0', 'c')
+        tags.remove_scorm_tag('course-0', 'a')
+        assert_that(tags.get_scorm_tags('course-0'),
+                    contains_inanyorder('b', 'c'))
+
+    def test_invitations(self):
+        invitations = self.service.get_invitation_service()
+        invitationid = invitations.createInvitation('course-0',
+                                                    addresses=['a@example.org',
+                                                               'b@example.org'])
+        assert_that(invitations.getInvitationStatus(invitationid), is_('complete'))
+        info = invitations.getInvitationInfo(invitationid, True)
+        assert_that(info, has_property('userInvitations', has_length(2)))
+        assert_that(invitations.getInvitationList(),
+                    has_item(has_property('id', invitationid)))
+
+    def test_reporting(self):
+        info = self.service.get_reporting_service().get_account_info()
+        assert_that(info, has_property('usage',
+                                       has_properties('total_courses', 2,
+                                                      'total_registrations', 10)))
+
+    def test_faults(self):
+        self.app.error_rate = 1.0
+        with self.assertRaises(ScormCloudError):
+            self.service.get_registration_service().exists('reg-0')
+
+        self.app.error_rate = 0.0
+        self.app.http_error_rate = 1.0
+        with self.assertRaises(ScormUpdateError):
+            self.service.get_registration_service().exists('reg-0')
+        assert_that(self.app.stats, has_entries('errors', 2))
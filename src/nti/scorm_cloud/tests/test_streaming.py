@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+# pylint: disable=protected-access,too-many-public-methods
+
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import contains
+from hamcrest import has_length
+from hamcrest import assert_that
+from hamcrest import has_property
+from hamcrest import has_properties
+
+import unittest
+from io import BytesIO
+
+import fudge
+
+from nti.scorm_cloud.client.request import ScormCloudError
+from nti.scorm_cloud.client.request import _ResponseStream
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+from nti.scorm_cloud.client.streaming import iter_launches
+from nti.scorm_cloud.client.streaming import parse_time_of_day
+from nti.scorm_cloud.client.streaming import iter_runtime_events
+
+from nti.scorm_cloud.tests import SharedConfiguringTestLayer
+
+LAUNCH_INFO = b"""<rsp stat="ok">
+<launch id="d6f31a43">
+    <completion>complete</completion>
+    <log>
+        <RuntimeLog browser="Mozilla/4.0" version="2009.1.0.15538">
+            <RuntimeEvent attemptNo="1" event="AttemptStart" id="0" timestamp="14:07:06.97" title="Golf"/>
+            <RuntimeEvent event="ApiCall" id="1" timestamp="14:07:07.10" method="GetValue"/>
+            <RuntimeEvent event="ApiCall" id="2" timestamp="14:09:00.00" method="SetValue"/>
+            <RuntimeEvent event="AttemptEnd" id="3" timestamp="14:10:00.00"/>
+        </RuntimeLog>
+    </log>
+</launch>
+</rsp>"""
+
+
+def fake_stream_response(content):
+    return fudge.Fake().has_attr(raw=BytesIO(content)) \
+                       .provides('raise_for_status').calls(lambda: None) \
+                       .provides('close')
+
+
+class FakeResponse(object):
+
+    closed = False
+
+    def __init__(self, content):
+        self.raw = BytesIO(content)
+
+    def close(self):
+        self.closed = True
+
+
+class TestStreaming(unittest.TestCase):
+
+    def test_parse_time_of_day(self):
+        assert_that(parse_time_of_day('14:07:06.97'), is_(50826.97))
+        assert_that(parse_time_of_day('2011-04-05T19:06:37.780+0000'),
+                    is_(68797.78))
+        assert_that(parse_time_of_day(10), is_(10.0))
+        assert_that(parse_time_of_day(None), is_(none()))
+
+    def test_iter_runtime_events(self):
+        events = list(iter_runtime_events(BytesIO(LAUNCH_INFO)))
+        assert_that(events, has_length(4))
+        assert_that(events[0],
+                    has_properties('id', '0',
+                                   'event', 'AttemptStart',
+                                   'attemptNo', '1',
+                                   'title', 'Golf',
+                                   'extra', is_(none())))
+        assert_that(events[1], has_property('method', 'GetValue'))
+        with self.assertRaises(AttributeError):
+            getattr(events[0], 'method')
+
+        events = iter_runtime_events(BytesIO(LAUNCH_INFO), events=('ApiCall',))
+        assert_that([e.id for e in events], contains('1', '2'))
+
+        events = iter_runtime_events(BytesIO(LAUNCH_INFO),
+                                     start='14:07:07', end='14:09:30')
+        assert_that([e.id for e in events], contains('1', '2'))
+
+    def test_iter_launches(self):
+        launches = list(iter_launches(BytesIO(LAUNCH_INFO)))
+        assert_that(launches,
+                    contains(has_properties('id', 'd6f31a43',
+                                            'completion', 'complete',
+                                            'exit_time', is_(none()))))
+
+    def test_error(self):
+        raw = b'<rsp stat="fail"><err code="101" msg="bad launch"/></rsp>'
+        with self.assertRaises(ScormCloudError):
+            list(iter_runtime_events(BytesIO(raw)))
+
+    def test_close(self):
+        response = FakeResponse(LAUNCH_INFO)
+        events = iter_runtime_events(_ResponseStream(response))
+        assert_that(next(events), has_property('id', '0'))
+        assert_that(response.closed, is_(False))
+        events.close()
+        assert_that(response.closed, is_(True))
+
+        response = FakeResponse(LAUNCH_INFO)
+        assert_that(list(iter_launches(_ResponseStream(response))), has_length(1))
+        assert_that(response.closed, is_(True))
+
+        response = FakeResponse(b'<rsp stat="fail"><err code="101" msg="bad"/></rsp>')
+        with self.assertRaises(ScormCloudError):
+            list(iter_launches(_ResponseStream(response)))
+        assert_that(response.closed, is_(True))
+
+
+class TestStreamingService(unittest.TestCase):
+
+    layer = SharedConfiguringTestLayer
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_iter_runtime_events(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        reg = service.get_registration_service()
+
+        data = fake_stream_response(LAUNCH_INFO)
+        session = fudge.Fake().expects('get').returns(data)
+        mock_ss.is_callable().returns(session)
+
+        events = reg.iterRuntimeEvents("d6f31a43", events=('AttemptEnd',))
+        assert_that([e.id for e in events], contains('3'))
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_iter_launch_history(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        reg = service.get_registration_service()
+
+        raw = b"""<rsp stat="ok">
+        <launchhistory regid="e222daf6">
+            <launch id="c7f31a43"><completion>complete</completion></launch>
+            <launch id="c7f31a44"><completion>incomplete</completion></launch>
+        </launchhistory>
+        </rsp>"""
+        data = fake_stream_response(raw)
+        session = fudge.Fake().expects('get').returns(data)
+        mock_ss.is_callable().returns(session)
+
+        launches = reg.iterLaunchHistory("e222daf6")
+        assert_that([l.completion for l in launches],
+                    contains('complete', 'incomplete'))
+
+    @fudge.patch('nti.scorm_cloud.client.request.ServiceRequest.session')
+    def test_lazy_request(self, mock_ss):
+        service = ScormCloudService.withargs("appid", "secret",
+                                             "http://cloud.scorm.com/api")
+        reg = service.get_registration_service()
+
+        responses = []
+
+        def get(*unused_args, **unused_kwargs):
+            responses.append(FakeResponse(LAUNCH_INFO))
+            responses[-1].raise_for_status = lambda: None
+            return responses[-1]
+        session = fudge.Fake().provides('get').calls(get)
+        mock_ss.is_callable().returns(session)
+
+        # no request is made until the iteration starts
+        events = reg.iterRuntimeEvents("d6f31a43")
+        launches = reg.iterLaunchHistory("d6f31a43")
+        assert_that(responses, has_length(0))
+        events.close()
+        launches.close()
+        assert_that(responses, has_length(0))
+
+        events = reg.iterRuntimeEvents("d6f31a43")
+        assert_that(next(events), has_property('id', '0'))
+        events.close()
+        launches = reg.iterLaunchHistory("d6f31a43")
+        assert_that(list(launches), has_length(1))
+        assert_that([r.closed for r in responses], contains(True, True))
@@ -10,7 +10,9 @@ from __future__ import absolute_import
 from hamcrest import is_
 from hamcrest import not_none
 from hamcrest import has_length
+from hamcrest import contains
 from hamcrest import assert_that
+from hamcrest import has_property
 from hamcrest import contains_inanyorder
 
 import unittest
@@ -19,9 +21,16 @@ import fudge
 
 from nti.scorm_cloud.client.scorm import ScormCloudService
 
+from nti.scorm_cloud.client.tag import tag_calls
+from nti.scorm_cloud.client.tag import desired_tags
+
 from nti.scorm_cloud.tests import fake_response
 from nti.scorm_cloud.tests import SharedConfiguringTestLayer
 
+from nti.scorm_cloud.utils.standin import StandinStore
+from nti.scorm_cloud.utils.standin import serve_in_thread
+from nti.scorm_cloud.utils.standin import StandinApplication
+
 
 class TestTagService(unittest.TestCase):
 
@@ -102,3 +111,51 @@ class TestTagService(unittest.TestCase):
         success_nodes = result.getElementsByTagName('success')
         assert_that(success_nodes, is_(not_none()))
 
+
+
+class TestBulkTags(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StandinStore('appid', seed=1)
+        self.store.add_course('c1', tags=['a', 'b'])
+        self.store.add_course('c2', tags=['a'])
+        self.store.add_course('c3', tags=['x', 'y'])
+        self.server = serve_in_thread(StandinApplication('appid', 'secret', self.store))
+        url = 'http://%s:%s/api' % self.server.server_address[:2]
+        self.service = ScormCloudService.withargs('appid', 'secret', url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_tag_calls(self):
+        assert_that(desired_tags(['a', 'b'], {'add': 'c', 'remove': ['a']}),
+                    contains('b', 'c'))
+        assert_that(desired_tags(['a'], {'set': 'x,y', 'add': 'a'}),
+                    contains('x', 'y', 'a'))
+        assert_that(tag_calls(['a'], ['a']), has_length(0))
+        assert_that(tag_calls(['a'], ['a', 'b']), contains(('add_scorm_tag', 'b')))
+        assert_that(tag_calls(['a'], ['b', 'c']), contains(('set_scorm_tags', 'b,c')))
+        assert_that(tag_calls(['a', 'b'], []),
+                    contains(('remove_scorm_tag', 'a'), ('remove_scorm_tag', 'b')))
+
+    def test_bulk_update_tags(self):
+        tags = self.service.get_tag_service()
+        changes = {'c1': {'add': 'term1'},
+                   'c2': {'add': 'a'},
+                   'c3': {'set': ['z'], 'add': ['term1']},
+                   'missing': {'add': 'term1'}}
+        results = tags.bulk_update_tags(changes, dry_run=True)
+        assert_that(results['c1'], has_property('added', ['term1']))
+        assert_that(results['c2'], has_property('changed', False))
+        assert_that(results['c3'], has_property('removed', ['x', 'y']))
+        assert_that(results['missing'], has_property('ok', False))
+        assert_that(self.store.courses['c1']['tags'], contains('a', 'b'))
+
+        results = tags.bulk_update_tags(changes, current={'c1': ['a', 'b']},
+                                        max_workers=4, rate=100)
+        assert_that(results['c3'].calls,
+                    contains(('set_scorm_tags', 'z,term1')))
+        assert_that(self.store.courses['c1']['tags'], contains('a', 'b', 'term1'))
+        assert_that(self.store.courses['c2']['tags'], contains('a'))
+        assert_that(self.store.courses['c3']['tags'], contains('z', 'term1'))
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks guarding against performance regressions.
+
+Import times are measured in a fresh interpreter with ``-X importtime``
+(Python 3.7 or later). Timestamp decoding is compared with ``dateutil``,
+and the XML parser backends with each other.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import os
+import sys
+import timeit
+import argparse
+import datetime
+import subprocess
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The modules whose import time is measured by default
+DEFAULT_MODULES = ('nti.scorm_cloud.client',
+                   'nti.scorm_cloud.client.scorm')
+
+#: Modules that importing ``nti.scorm_cloud.client`` should not load
+LAZY_MODULES = ('rustici_software_cloud_v2',
+                'requests',
+                'dateutil',
+                'lxml',
+                'nti.common')
+
+
+def _environ():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+    return env
+
+
+def _run(code, *options):
+    args = [sys.executable] + list(options) + ['-c', code]
+    process = subprocess.Popen(args, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, env=_environ())
+    out, err = process.communicate()
+    if process.returncode:
+        raise RuntimeError(err.decode('utf-8', 'replace'))
+    return out.decode('utf-8'), err.decode('utf-8')
+
+
+def import_times(module):
+    """
+    Import ``module`` in a fresh interpreter and return a list of
+    ``(name, self_us, cumulative_us)`` tuples, one per imported module,
+    in import completion order.
+    """
+    if sys.version_info < (3, 7):
+        raise RuntimeError('-X importtime requires Python 3.7 or later')
+    _, err = _run('import %s' % module, '-X', 'importtime')
+    result = []
+    for line in err.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header
+        result.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return result
+
+
+def import_time(module, repeat=3):
+    """
+    Return the best cumulative import time of ``module``, in seconds,
+    over ``repeat`` fresh interpreters.
+    """
+    best = None
+    for _ in range(repeat):
+        times = dict((name, cumulative)
+                     for name, _, cumulative in import_times(module))
+        value = times[module] / 1e6
+        best = value if best is None else min(best, value)
+    return best
+
+
+def imported_modules(module):
+    """
+    Return the names of all modules loaded by importing ``module``
+    in a fresh interpreter.
+    """
+    out, _ = _run('import sys, %s; print("\\n".join(sys.modules))' % module)
+    return set(out.split())
+
+
+#: The formats of the timestamps decoded by the decoder benchmarks
+TIMESTAMP_FORMATS = ('%Y-%m-%dT%H:%M:%S.123+0000',
+                     '%Y-%m-%dT%H:%M:%S-0500',
+                     '%Y-%m-%dT%H:%M:%SZ',
+                     '%Y%m%d%H%M%S')
+
+
+def _timestamps(count):
+    # distinct values, so the decoder caches do not hide the parsing
+    start = datetime.datetime(2018, 1, 1)
+    return [(start + datetime.timedelta(seconds=i * 37)).strftime(
+        TIMESTAMP_FORMATS[i % len(TIMESTAMP_FORMATS)]) for i in range(count)]
+
+
+def _durations(count):
+    formats = ('%04d:%02d:%02d.50', 'PT%dH%dM%dS', 'P%dDT%dH%dM', '%d%d%d')
+    return [formats[i % len(formats)] % (i // 3600, i // 60 % 60, i % 60)
+            for i in range(count)]
+
+
+def decoder_times(count=10000, repeat=3):
+    """
+    Return the best times, in seconds, to decode ``count`` distinct
+    timestamps with ``dateutil`` and with :mod:`nti.scorm_cloud.datetimes`
+    (one by one and vectorized) and ``count`` durations, as a dict.
+    """
+    from dateutil.parser import parse
+
+    from nti.scorm_cloud import datetimes
+
+    timestamps = _timestamps(count)
+    durations = _durations(count)
+
+    def each(func):
+        return lambda values: [func(value) for value in values]
+
+    def best(func, values):
+        def run():
+            # pylint: disable=protected-access
+            datetimes._TIMESTAMPS.clear()
+            datetimes._DURATIONS.clear()
+            func(values)
+        return min(timeit.repeat(run, number=1, repeat=repeat))
+
+    return {
+        'dateutil': best(each(parse), timestamps),
+        'timestamps': best(each(datetimes.parse_timestamp), timestamps),
+        'timestamps_vectorized': best(datetimes.parse_timestamps, timestamps),
+        'durations': best(each(datetimes.parse_duration), durations),
+        'durations_vectorized': best(datetimes.parse_durations, durations),
+    }
+
+
+_RUNTIME = (u'<runtime><completion_status>completed</completion_status>'
+            u'<credit>Credit</credit><entry>AbInitio</entry><exit/>'
+            u'<location>%d</location><mode>Normal</mode><score_raw>80</score_raw>'
+            u'<total_time>0000:00:04.47</total_time><timetracked>0000:00:04.47</timetracked>'
+            u'<success_status>passed</success_status>'
+            u'<suspend_data><![CDATA[<state page="%d"/>]]></suspend_data>'
+            u'<learnerpreference><audio_level>1</audio_level><language/></learnerpreference>'
+            u'<static><learner_id>learner</learner_id><learner_name>Name</learner_name></static>'
+            u'<comments_from_learner/><comments_from_lms/><interactions>%s</interactions>'
+            u'<objectives/></runtime>')
+
+_INTERACTION = (u'<interaction id="q%d"><timestamp>2011-04-05T19:06:37.780+0000</timestamp>'
+                u'<result>correct</result><latency>PT2S</latency><objectives/>'
+                u'<correct_responses><response id="0"><value>a</value></response>'
+                u'</correct_responses></interaction>')
+
+
+def _report(activities, interactions=10):
+    children = []
+    for i in range(activities):
+        runtime = _RUNTIME % (i, i, u''.join(_INTERACTION % j for j in range(interactions)))
+        children.append(u'<activity id="sco%d"><title>SCO %d</title><attempts>1</attempts>'
+                        u'<complete>complete</complete><success>passed</success>'
+                        u'<time>0000:00:04.47</time><score>80</score>'
+                        u'<satisfied>true</satisfied><completed>true</completed>'
+                        u'<objectives><objective id="PRIMARYOBJ"><measurestatus>true'
+                        u'</measurestatus><normalizedmeasure>0.8</normalizedmeasure>'
+                        u'</objective></objectives><children/>%s</activity>' % (i, i, runtime))
+    report = (u'<registrationreport format="full" regid="reg" instanceid="0">'
+              u'<complete>complete</complete><success>passed</success>'
+              u'<totaltime>0000:01:30.00</totaltime><score>80</score>'
+              u'<activity id="course"><title>Course</title><attempts>1</attempts>'
+              u'<objectives/><children>%s</children></activity></registrationreport>'
+              % u''.join(children))
+    return (u'<rsp stat="ok">%s</rsp>' % report).encode('utf-8')
+
+
+def parser_times(activities=100, repeat=3):
+    """
+    Return the best times, in seconds, to parse a full registration
+    report of ``activities`` activities (with ten interactions each) and
+    build its :class:`.RegistrationReport` with every available parser
+    backend, as a dict.
+    """
+    from nti.scorm_cloud.client.registration import RegistrationReport
+
+    from nti.scorm_cloud.minidom import getFirstChild
+
+    from nti.scorm_cloud.parsers import get_parser
+    from nti.scorm_cloud.parsers import available_parsers
+
+    raw = _report(activities)
+
+    def build(parser):
+        rsp = parser.parse(raw)
+        return RegistrationReport.fromMinidom(getFirstChild(rsp, 'registrationreport'))
+
+    result = {}
+    for name in available_parsers():
+        parser = get_parser(name)
+        result[name] = min(timeit.repeat(lambda: build(parser), number=1, repeat=repeat))
+    return result
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=u'Measure nti.scorm_cloud import times')
+    parser.add_argument(u'modules', nargs=u'*', default=list(DEFAULT_MODULES),
+                        help=u'The modules to measure')
+    parser.add_argument(u'-r', u'--repeat', dest=u'repeat', type=int, default=3,
+                        help=u'The number of interpreters to take the best of')
+    parser.add_argument(u'-t', u'--top', dest=u'top', type=int, default=10,
+                        help=u'Show the slowest direct and indirect imports')
+    parser.add_argument(u'--max-ms', dest=u'max_ms', type=float, default=None,
+                        help=u'Fail if any module takes longer to import')
+    parser.add_argument(u'--decoders', dest=u'decoders', action=u'store_true',
+                        help=u'Benchmark the timestamp and duration decoders')
+    parser.add_argument(u'--parsers', dest=u'parsers', action=u'store_true',
+                        help=u'Benchmark the XML parser backends')
+    arguments = parser.parse_args(args)
+
+    if arguments.decoders or arguments.parsers:
+        if arguments.decoders:
+            times = decoder_times(repeat=arguments.repeat)
+        else:
+            times = parser_times(repeat=arguments.repeat)
+        for name, elapsed in sorted(times.items()):
+            print('%-24s %8.1f ms' % (name, elapsed * 1000))
+        return 0
+
+    failed = False
+    for module in arguments.modules:
+        elapsed = import_time(module, arguments.repeat) * 1000
+        loaded = imported_modules(module)
+        eager = [name for name in LAZY_MODULES if name in loaded]
+        print('%s: %.1f ms, %d modules loaded' % (module, elapsed, len(loaded)))
+        if eager:
+            print('  eagerly imported: %s' % ', '.join(eager))
+        slowest = sorted(import_times(module), key=lambda x: x[2], reverse=True)
+        for name, _, cumulative in slowest[1:arguments.top + 1]:
+            print('  %8.1f ms  %s' % (cumulative / 1000, name))
+        if arguments.max_ms is not None and elapsed > arguments.max_ms:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A load generator driving the :class:`.RegistrationService` against a
+configurable SCORM Cloud endpoint, such as the local stand-in server
+(:mod:`nti.scorm_cloud.utils.standin`).
+
+It runs a weighted mix of ``createRegistration``, ``getRegistrationResult``,
+``launch`` and ``getRegistrationList`` calls at a target request rate with
+a fixed number of workers, and reports throughput, latency percentiles,
+error rates and client CPU time per request.
+
+*IMPORTANT* Pointed at the real SCORM Cloud this creates registrations
+(which are billed). It is meant to be an ops tool.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import os
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import datetime
+import threading
+
+from nti.scorm_cloud.client.scorm import ScormCloudService
+
+logger = __import__('logging').getLogger(__name__)
+
+#: The operations the load test knows how to run
+OPERATIONS = ('create', 'result', 'launch', 'list')
+
+DEFAULT_MIX = 'create=1,result=6,launch=2,list=1'
+
+
+def parse_mix(mix):
+    """
+    Parse a mix specification such as ``create=1,result=6`` into a
+    dictionary of operation weights.
+    """
+    result = {}
+    for part in mix.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError('Unknown operation %s' % name)
+        result[name] = float(weight or 1)
+    if not result or sum(result.values()) <= 0:
+        raise ValueError('Empty operation mix')
+    return result
+
+
+def percentile(ordered, fraction):
+    """
+    Return the nearest-rank percentile of the already sorted ``ordered`` values.
+    """
+    if not ordered:
+        return None
+    index = max(int(math.ceil(fraction * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def _cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+
+class OperationStats(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.errors = 0
+        self.latencies = []
+        self.error_types = {}
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    def record(self, latency, error=None):
+        self.latencies.append(latency)
+        if error is not None:
+            self.errors += 1
+            name = type(error).__name__
+            self.error_types[name] = self.error_types.get(name, 0) + 1
+
+    def summary(self):
+        ordered = sorted(self.latencies)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'error_rate': self.errors / self.count if self.count else 0.0,
+            'error_types': dict(self.error_types),
+            'p50': percentile(ordered, 0.50),
+            'p90': percentile(ordered, 0.90),
+            'p99': percentile(ordered, 0.99),
+            'max': ordered[-1] if ordered else None,
+        }
+
+
+class LoadTest(object):
+    """
+    Drives a weighted mix of registration operations at ``rps`` requests
+    per second using ``workers`` threads for ``duration`` seconds (or
+    until ``requests`` have been issued).
+    """
+
+    def __init__(self, service, courseid, mix=DEFAULT_MIX, rps=10.0, workers=4,
+                 duration=10.0, requests=None, redirecturl='http://localhost/',
+                 seed=None):
+        self.rps = float(rps)
+        self.service = service
+        self.workers = workers
+        self.courseid = courseid
+        self.duration = duration
+        self.requests = requests
+        self.redirecturl = redirecturl
+        self.mix = parse_mix(mix) if not isinstance(mix, dict) else mix
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.regids = []
+        self.stats = dict((name, OperationStats(name)) for name in self.mix)
+        self._slot = 0
+        self._start = None
+
+    # operations
+
+    def op_create(self, registrations):
+        regid = 'load-%s' % uuid.uuid4()
+        registrations.createRegistration(self.courseid, regid, u'Load', u'Test',
+                                         regid, '%s@example.com' % regid)
+        with self.lock:
+            self.regids.append(regid)
+
+    def _known_regid(self):
+        with self.lock:
+            if not self.regids:
+                raise ValueError('No known registrations')
+            return self.random.choice(self.regids)
+
+    def op_result(self, registrations):
+        registrations.getRegistrationResult(self._known_regid())
+
+    def op_launch(self, registrations):
+        registrations.launch(self._known_regid(), self.redirecturl)
+
+    def op_list(self, registrations):
+        after = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+        registrations.getRegistrationList(courseid=self.courseid,
+                                          after=after.strftime('%Y-%m-%dT%H:%M:%SZ'))
+
+    # driver
+
+    def prime(self):
+        """
+        Seed the known registrations from the course.
+        """
+        registrations = self.service.get_registration_service()
+        self.regids.extend(r.registrationId
+                           for r in registrations.getRegistrationList(courseid=self.courseid))
+        return len(self.regids)
+
+    def _choose(self):
+        total = sum(self.mix.values())
+        with self.lock:
+            draw = self.random.uniform(0, total)
+        for name, weight in sorted(self.mix.items()):
+            draw -= weight
+            if draw <= 0:
+                return name
+        return name  # pylint: disable=undefined-loop-variable
+
+    def _next_slot(self):
+        """
+        Return the scheduled start time of the next request, or None
+        when the test is over.
+        """
+        with self.lock:
+            slot = self._slot
+            self._slot += 1
+        if self.requests is not None and slot >= self.requests:
+            return None
+        when = self._start + slot / self.rps
+        if self.duration is not None and when - self._start >= self.duration:
+            return None
+        return when
+
+    def _work(self):
+        registrations = self.service.get_registration_service()
+        while True:
+            when = self._next_slot()
+            if when is None:
+                return
+            delay = when - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            name = self._choose()
+            error = None
+            started = time.time()
+            try:
+                getattr(self, 'op_' + name)(registrations)
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+            latency = time.time() - started
+            with self.lock:
+                self.stats[name].record(latency, error)
+
+    def run(self):
+        """
+        Run the load test, returning a report dictionary.
+        """
+        cpu = _cpu_time()
+        self._start = time.time()
+        threads = [threading.Thread(target=self._work, name='scorm-cloud-load-%d' % i)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - self._start
+        cpu = _cpu_time() - cpu
+        total = sum(s.count for s in self.stats.values())
+        errors = sum(s.errors for s in self.stats.values())
+        return {
+            'elapsed': elapsed,
+            'requests': total,
+            'errors': errors,
+            'target_rps': self.rps,
+            'throughput': total / elapsed if elapsed else 0.0,
+            'error_rate': errors / total if total else 0.0,
+            'cpu_per_request': cpu / total if total else 0.0,
+            'operations': dict((name, s.summary()) for name, s in self.stats.items()),
+        }
+
+
+def _ms(value):
+    return '%.1f' % (value * 1000) if value is not None else '-'
+
+
+def format_report(report):
+    lines = ['%d requests in %.2fs: %.1f req/s (target %.1f), %.2f%% errors, '
+             '%.2f ms client CPU per request'
+             % (report['requests'], report['elapsed'], report['throughput'],
+                report['target_rps'], report['error_rate'] * 100,
+                report['cpu_per_request'] * 1000),
+             '%-8s %8s %8s %9s %9s %9s %9s' % ('op', 'count', 'errors',
+                                               'p50 ms', 'p90 ms', 'p99 ms', 'max ms')]
+    for name, stats in sorted(report['operations'].items()):
+        lines.append('%-8s %8d %8d %9s %9s %9s %9s'
+                     % (name, stats['count'], stats['errors'], _ms(stats['p50']),
+                        _ms(stats['p90']), _ms(stats['p99']), _ms(stats['max'])))
+    return '\n'.join(lines)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=u'Drive a load test against a SCORM Cloud endpoint')
+    parser.add_argument(u'--serviceurl', dest=u'serviceurl',
+                        default=u'http://127.0.0.1:8080/api',
+                        help=u'The SCORM Cloud service url')
+    parser.add_argument(u'--v2-url', dest=u'v2_url', default=None,
+                        help=u'The SCORM Cloud v2 API url used by launch')
+    parser.add_argument(u'--appid', dest=u'appid', default=u'appid',
+                        help=u'The application id')
+    parser.add_argument(u'--secret', dest=u'secret', default=u'secret',
+                        help=u'The application secret key')
+    parser.add_argument(u'--course', dest=u'courseid', default=None,
+                        help=u'The course to register learners in. '
+                             u'Defaults to the first course')
+    parser.add_argument(u'--mix', dest=u'mix', default=DEFAULT_MIX,
+                        help=u'Weighted operation mix, e.g. %s' % DEFAULT_MIX)
+    parser.add_argument(u'--rps', dest=u'rps', type=float, default=10.0,
+                        help=u'The target requests per second')
+    parser.add_argument(u'-w', u'--workers', dest=u'workers', type=int, default=4,
+                        help=u'The number of worker threads')
+    parser.add_argument(u'-d', u'--duration', dest=u'duration', type=float,
+                        default=30.0, help=u'The test duration in seconds')
+    parser.add_argument(u'-n', u'--requests', dest=u'requests', type=int,
+                        default=None, help=u'Stop after this many requests')
+    parser.add_argument(u'--json', dest=u'json', action=u'store_true',
+                        help=u'Print the report as JSON')
+    arguments = parser.parse_args(args)
+
+    service = ScormCloudService.withargs(arguments.appid, arguments.secret,
+                                         arguments.serviceurl)
+    if arguments.v2_url:
+        service.v2config.host = arguments.v2_url
+    courseid = arguments.courseid
+    if not courseid:
+        courses = service.get_course_service().get_course_list()
+        if not courses:
+            parser.error(u'No course available, use --course')
+        courseid = courses[0].courseId
+    test = LoadTest(service, courseid, arguments.mix, arguments.rps,
+                    arguments.workers, arguments.duration, arguments.requests)
+    test.prime()
+    report = test.run()
+    if arguments.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    else:
+        print(format_report(report))
+    return report
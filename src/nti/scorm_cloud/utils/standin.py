@@ -0,0 +1,903 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A local, in-memory stand-in for the SCORM Cloud web services, meant for
+load testing and benchmarking integrations without network access.
+
+The stand-in implements the ``rustici.*`` methods used by this library
+(plus the v2 launch link endpoints used by ``launch`` and
+``get_preview_url``), verifies request signatures the same way
+:meth:`.ServiceRequest.encode_and_sign` creates them, and can inject
+latency, failures and throttling.
+
+*IMPORTANT* Responses only mimic the shape of real SCORM Cloud responses
+closely enough for this library to parse them.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+
+import re
+import json
+import time
+import uuid
+import base64
+import random
+import argparse
+import datetime
+import threading
+from hashlib import md5
+from wsgiref.simple_server import WSGIServer
+from wsgiref.simple_server import make_server
+from wsgiref.simple_server import WSGIRequestHandler
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
+
+from six.moves import socketserver
+from six.moves import urllib_parse
+
+from nti.scorm_cloud.client.concurrency import RateLimiter
+
+from nti.scorm_cloud.compat import bytes_
+from nti.scorm_cloud.compat import native_
+
+logger = __import__('logging').getLogger(__name__)
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.000+0000'
+
+_V2_PATTERN = re.compile(r'/api/v2/+(registrations|courses)/([^/]+)/(launchLink|preview)$')
+
+
+class StandinError(Exception):
+
+    def __init__(self, code, msg):
+        Exception.__init__(self, msg)
+        self.code = code
+        self.msg = msg
+
+
+def _cdata(value):
+    value = u'' if value is None else u'%s' % value
+    return u'<![CDATA[%s]]>' % value.replace(u']]>', u']]]]><![CDATA[>')
+
+
+def _text(value):
+    return escape(u'' if value is None else u'%s' % value)
+
+
+def _bool(value):
+    return u'true' if value else u'false'
+
+
+def _timestamp(dt):
+    return dt.strftime(TIMESTAMP_FORMAT) if dt is not None else u''
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    value = value.replace('Z', '')[:19]
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y%m%d%H%M%S'):
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise StandinError(4, 'Invalid timestamp %s' % value)
+
+
+def _is_true(value):
+    return (value or '').lower() in ('true', '1', 'yes')
+
+
+class StandinStore(object):
+    """
+    In-memory SCORM Cloud data. All access must hold :attr:`lock`.
+    """
+
+    def __init__(self, appid, courses=0, registrations=0, invitations=0,
+                 events=10, days=30, seed=None):
+        self.appid = appid
+        self.events = events
+        self.lock = threading.RLock()
+        self.random = random.Random(seed)
+        self.courses = {}
+        self.registrations = {}
+        self.invitations = {}
+        self.postbacks = {}
+        self.imports = {}
+        self.uploads = set()
+        self.created = datetime.datetime.utcnow()
+        self.populate(courses, registrations, invitations, days)
+
+    def populate(self, courses, registrations, invitations, days):
+        now = datetime.datetime.utcnow()
+        for i in range(courses):
+            self.add_course('course-%d' % i, u'Course %d' % i,
+                            tags=['term%d' % (i % 4)])
+        course_ids = sorted(self.courses)
+        for i in range(registrations if course_ids else 0):
+            courseid = course_ids[i % len(course_ids)]
+            updated = now - datetime.timedelta(seconds=self.random.uniform(0, days * 86400))
+            self.add_registration(courseid, 'reg-%d' % i, u'First%d' % i,
+                                  u'Last%d' % i, 'learner-%d' % i,
+                                  'learner-%d@example.com' % i, updated)
+            if self.random.random() < 0.5:
+                self.registrations['reg-%d' % i]['complete'] = 'complete'
+                self.registrations['reg-%d' % i]['success'] = 'passed'
+                self.registrations['reg-%d' % i]['score'] = self.random.randint(50, 100)
+        for i in range(invitations if course_ids else 0):
+            self.add_invitation(course_ids[i % len(course_ids)],
+                                ['user%d@example.com' % i])
+
+    def add_course(self, courseid, title=None, tags=()):
+        self.courses[courseid] = {
+            'id': courseid,
+            'title': title or courseid,
+            'versions': 1,
+            'tags': list(tags),
+            'attributes': {},
+            'learningStandard': 'scorm_12',
+        }
+        return self.courses[courseid]
+
+    def add_registration(self, courseid, regid, fname, lname, learnerid,
+                         email=None, updated=None):
+        updated = updated or datetime.datetime.utcnow()
+        self.registrations[regid] = {
+            'regid': regid,
+            'courseid': courseid,
+            'fname': fname,
+            'lname': lname,
+            'learnerid': learnerid,
+            'email': email,
+            'created': updated,
+            'updated': updated,
+            'complete': 'unknown',
+            'success': 'unknown',
+            'score': 'unknown',
+            'totaltime': 0,
+            'launches': [],
+        }
+        return self.registrations[regid]
+
+    def add_invitation(self, courseid, addresses, public=True, status='complete'):
+        invitationid = str(uuid.uuid4())
+        self.invitations[invitationid] = {
+            'id': invitationid,
+            'courseid': courseid,
+            'public': public,
+            'status': status,
+            'enabled': True,
+            'open': True,
+            'subject': u'Invitation',
+            'body': u'Take the course',
+            'created': datetime.datetime.utcnow(),
+            'addresses': list(addresses),
+        }
+        return invitationid
+
+    def course_registration_count(self, courseid):
+        return sum(1 for r in self.registrations.values() if r['courseid'] == courseid)
+
+
+def _method(name):
+    def decorator(func):
+        func.method_name = name
+        return func
+    return decorator
+
+
+class StandinApplication(object):
+    """
+    A WSGI application serving the SCORM Cloud API from a :class:`StandinStore`.
+
+    :param latency: base latency, in seconds, added to every request
+    :param jitter: a random extra latency of up to this many seconds
+    :param error_rate: the fraction of requests answered with a SCORM
+        Cloud error (``stat="fail"``)
+    :param http_error_rate: the fraction of requests answered with an HTTP 500
+    :param throttle: (optional) the number of requests per second allowed
+        before answering HTTP 429
+    :param verify: whether to verify the request signatures
+    """
+
+    def __init__(self, appid, secret, store=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, http_error_rate=0.0, throttle=None,
+                 verify=True, seed=None):
+        self.appid = appid
+        self.secret = bytes_(secret)
+        self.store = store if store is not None else StandinStore(appid, seed=seed)
+        self.verify = verify
+        self.jitter = jitter
+        self.latency = latency
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.random = random.Random(seed)
+        self.bucket = RateLimiter(throttle) if throttle else None
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'throttled': 0}
+        self.methods = {}
+        for name in dir(self):
+            func = getattr(self, name)
+            if getattr(func, 'method_name', None):
+                self.methods[func.method_name] = func
+
+    # WSGI
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            self.stats['requests'] += 1
+            draw = self.random.random()
+        if self.bucket is not None and not self.bucket.try_acquire():
+            with self.lock:
+                self.stats['throttled'] += 1
+            return self._respond(start_response, '429 Too Many Requests',
+                                 'text/plain', 'Too Many Requests')
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        if draw < self.http_error_rate:
+            with self.lock:
+                self.stats['errors'] += 1
+            return self._respond(start_response, '500 Internal Server Error',
+                                 'text/plain', 'Injected failure')
+        self._drain(environ)
+        path = environ.get('PATH_INFO', '')
+        match = _V2_PATTERN.search(path)
+        if match is not None:
+            return self.v2(environ, start_response, *match.groups())
+        params = dict(urllib_parse.parse_qsl(environ.get('QUERY_STRING', ''),
+                                             keep_blank_values=True))
+        try:
+            if draw < self.http_error_rate + self.error_rate:
+                raise StandinError(999, 'Injected failure')
+            body = self.dispatch(params)
+            body = u'<?xml version="1.0" encoding="utf-8" ?><rsp stat="ok">%s</rsp>' % body
+        except StandinError as e:
+            with self.lock:
+                self.stats['errors'] += 1
+            body = (u'<?xml version="1.0" encoding="utf-8" ?><rsp stat="fail">'
+                    u'<err code=%s msg=%s/></rsp>' % (quoteattr(str(e.code)),
+                                                      quoteattr(e.msg)))
+        return self._respond(start_response, '200 OK', 'text/xml; charset=utf-8', body)
+
+    @staticmethod
+    def _drain(environ):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length:
+            environ['wsgi.input'].read(length)
+
+    @staticmethod
+    def _respond(start_response, status, content_type, body):
+        body = bytes_(body)
+        start_response(status, [('Content-Type', content_type),
+                                ('Content-Length', str(len(body)))])
+        return [body]
+
+    def check_signature(self, params):
+        params = dict(params)
+        sig = params.pop('sig', None)
+        if params.get('appid') != self.appid:
+            raise StandinError(100, 'Invalid appid')
+        signing = ''.join(k + params[k] for k in sorted(params, key=str.lower))
+        expected = md5(self.secret + bytes_(signing)).hexdigest()
+        if sig != expected:
+            raise StandinError(3, 'The security signature is invalid')
+
+    def dispatch(self, params):
+        method = params.get('method')
+        handler = self.methods.get(method)
+        if handler is None:
+            raise StandinError(1, 'Invalid method %s' % method)
+        if self.verify and method not in ('rustici.debug.ping',):
+            self.check_signature(params)
+        with self.store.lock:
+            return handler(params)
+
+    def v2(self, environ, start_response, kind, ident, action):
+        auth = environ.get('HTTP_AUTHORIZATION', '')
+        expected = 'Basic ' + native_(base64.b64encode(bytes_(self.appid) + b':' + self.secret))
+        if self.verify and auth != expected:
+            return self._respond(start_response, '401 Unauthorized',
+                                 'application/json', '{"message": "Unauthorized"}')
+        with self.store.lock:
+            store = self.store.registrations if kind == 'registrations' else self.store.courses
+            if ident not in store:
+                return self._respond(start_response, '404 Not Found', 'application/json',
+                                     json.dumps({'message': '%s not found' % ident}))
+        link = 'http://standin.invalid/launch/%s/%s/%s' % (kind, ident, uuid.uuid4())
+        return self._respond(start_response, '200 OK', 'application/json',
+                             json.dumps({'launchLink': link}))
+
+    # helpers
+
+    def _require(self, params, name):
+        value = params.get(name)
+        if not value:
+            raise StandinError(2, 'Missing parameter %s' % name)
+        return value
+
+    def _course(self, params):
+        courseid = self._require(params, 'courseid')
+        try:
+            return self.store.courses[courseid]
+        except KeyError:
+            raise StandinError(1, 'The course %s does not exist' % courseid)
+
+    def _registration(self, params):
+        regid = self._require(params, 'regid')
+        try:
+            return self.store.registrations[regid]
+        except KeyError:
+            raise StandinError(1, 'The registration %s does not exist' % regid)
+
+    def _invitation(self, params):
+        invitationid = self._require(params, 'invitationId')
+        try:
+            return self.store.invitations[invitationid]
+        except KeyError:
+            raise StandinError(1, 'The invitation %s does not exist' % invitationid)
+
+    def course_xml(self, course):
+        tags = u''.join(u'<tag>%s</tag>' % _text(t) for t in course['tags'])
+        return (u'<course id=%s title=%s versions="%d" registrations="%d" size="0">'
+                u'<tags>%s</tags><learningStandard>%s</learningStandard></course>'
+                % (quoteattr(course['id']), quoteattr(course['title']),
+                   course['versions'],
+                   self.store.course_registration_count(course['id']),
+                   tags, _text(course['learningStandard'])))
+
+    def registration_xml(self, reg):
+        course = self.store.courses.get(reg['courseid']) or {}
+        return (u'<registration id=%s courseid=%s>'
+                u'<appId>%s</appId><registrationId>%s</registrationId>'
+                u'<courseId>%s</courseId><courseTitle>%s</courseTitle>'
+                u'<lastCourseVersionLaunched>1</lastCourseVersionLaunched>'
+                u'<learnerId>%s</learnerId><learnerFirstName>%s</learnerFirstName>'
+                u'<learnerLastName>%s</learnerLastName><email>%s</email>'
+                u'<createDate>%s</createDate><firstAccessDate>%s</firstAccessDate>'
+                u'<lastAccessDate>%s</lastAccessDate><completedDate>%s</completedDate>'
+                u'<instances/></registration>'
+                % (quoteattr(reg['regid']), quoteattr(reg['courseid']),
+                   _cdata(self.appid), _cdata(reg['regid']), _cdata(reg['courseid']),
+                   _cdata(course.get('title')), _cdata(reg['learnerid']),
+                   _cdata(reg['fname']), _cdata(reg['lname']), _cdata(reg['email']),
+                   _cdata(_timestamp(reg['created'])), _cdata(_timestamp(reg['updated'])),
+                   _cdata(_timestamp(reg['updated'])),
+                   _cdata(_timestamp(reg['updated']) if reg['complete'] == 'complete' else '')))
+
+    def report_xml(self, reg, resultsformat='course'):
+        body = (u'<complete>%s</complete><success>%s</success>'
+                u'<totaltime>%s</totaltime><score>%s</score>'
+                % (reg['complete'], reg['success'], reg['totaltime'], reg['score']))
+        if resultsformat in ('activity', 'full'):
+            runtime = u''
+            if resultsformat == 'full':
+                runtime = (u'<runtime><completion_status>%s</completion_status>'
+                           u'<credit>Credit</credit><entry>AbInitio</entry><exit/>'
+                           u'<location/><mode>Normal</mode><progress_measure/>'
+                           u'<score_scaled/><score_raw>%s</score_raw>'
+                           u'<total_time>0000:00:%02d.00</total_time>'
+                           u'<timetracked>0000:00:%02d.00</timetracked>'
+                           u'<success_status>%s</success_status><suspend_data/>'
+                           u'<objectives/><interactions/></runtime>'
+                           % (reg['complete'], reg['score'], reg['totaltime'] % 60,
+                              reg['totaltime'] % 60, reg['success']))
+            body += (u'<activity id=%s><title>%s</title><attempts>1</attempts>'
+                     u'<complete>%s</complete><success>%s</success>'
+                     u'<time>0000:00:%02d.00</time><score>%s</score>'
+                     u'<objectives><objective id="PRIMARYOBJ"><measurestatus>true</measurestatus>'
+                     u'<normalizedmeasure>%s</normalizedmeasure><progressstatus>true</progressstatus>'
+                     u'<satisfiedstatus>%s</satisfiedstatus></objective></objectives>'
+                     u'<children/>%s</activity>'
+                     % (quoteattr(reg['courseid']), _text(reg['courseid']),
+                        reg['complete'], reg['success'], reg['totaltime'] % 60,
+                        reg['score'], self._normalized(reg),
+                        _bool(reg['success'] == 'passed'), runtime))
+        return (u'<registrationreport format=%s regid=%s instanceid="0">%s</registrationreport>'
+                % (quoteattr(resultsformat), quoteattr(reg['regid']), body))
+
+    @staticmethod
+    def _normalized(reg):
+        try:
+            return '%.2f' % (float(reg['score']) / 100)
+        except (TypeError, ValueError):
+            return '0.0'
+
+    def invitation_xml(self, invitation, detail=False):
+        users = u''
+        if detail:
+            for address in invitation['addresses']:
+                reg = self.store.registrations.get(self._invitation_regid(invitation, address))
+                report = self.report_xml(reg) if reg is not None else u''
+                users += (u'<userInvitation><email>%s</email><url>%s</url>'
+                          u'<isStarted>%s</isStarted><registrationId>%s</registrationId>'
+                          u'%s</userInvitation>'
+                          % (_cdata(address),
+                             _cdata('http://standin.invalid/invitation/%s' % invitation['id']),
+                             _bool(reg is not None),
+                             _cdata(reg['regid'] if reg is not None else ''), report))
+        return (u'<invitationInfo><id>%s</id><body>%s</body><courseId>%s</courseId>'
+                u'<subject>%s</subject><url>%s</url><allowLaunch>%s</allowLaunch>'
+                u'<allowNewRegistrations>%s</allowNewRegistrations><public>%s</public>'
+                u'<created>%s</created><createdDate>%s</createdDate>'
+                u'<userInvitations>%s</userInvitations></invitationInfo>'
+                % (_cdata(invitation['id']), _cdata(invitation['body']),
+                   _cdata(invitation['courseid']), _cdata(invitation['subject']),
+                   _cdata('http://standin.invalid/invitation/%s' % invitation['id']),
+                   _bool(invitation['enabled']), _bool(invitation['open']),
+                   _bool(invitation['public']), _bool(invitation['status'] == 'complete'),
+                   _timestamp(invitation['created']), users))
+
+    @staticmethod
+    def _invitation_regid(invitation, address):
+        return 'inv-%s-%s' % (invitation['id'], address)
+
+    @staticmethod
+    def _success():
+        return u'<success/>'
+
+    # debug
+
+    @_method('rustici.debug.ping')
+    def ping(self, unused_params):
+        return u'<pong/>'
+
+    @_method('rustici.debug.authPing')
+    def auth_ping(self, unused_params):
+        return u'<pong/>'
+
+    @_method('rustici.debug.getTime')
+    def get_time(self, unused_params):
+        now = datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        return u'<currenttime tz="UTC">%s</currenttime>' % now
+
+    # registration
+
+    @_method('rustici.registration.createRegistration')
+    def create_registration(self, params):
+        regid = self._require(params, 'regid')
+        self._course(params)
+        if regid in self.store.registrations:
+            raise StandinError(1, 'The registration %s already exists' % regid)
+        self.store.add_registration(params['courseid'], regid, params.get('fname'),
+                                    params.get('lname'), params.get('learnerid'),
+                                    params.get('email'))
+        if params.get('postbackurl'):
+            self.store.postbacks[regid] = {'url': params['postbackurl'],
+                                           'authtype': params.get('authtype'),
+                                           'login': params.get('urlname'),
+                                           'password': params.get('urlpass')}
+        return self._success()
+
+    @_method('rustici.registration.exists')
+    def exists(self, params):
+        regid = self._require(params, 'regid')
+        return u'<result>%s</result>' % _bool(regid in self.store.registrations)
+
+    @_method('rustici.registration.deleteRegistration')
+    def delete_registration(self, params):
+        reg = self._registration(params)
+        del self.store.registrations[reg['regid']]
+        self.store.postbacks.pop(reg['regid'], None)
+        return self._success()
+
+    @_method('rustici.registration.resetRegistration')
+    def reset_registration(self, params):
+        reg = self._registration(params)
+        reg.update(complete='unknown', success='unknown', score='unknown', totaltime=0,
+                   updated=datetime.datetime.utcnow())
+        return self._success()
+
+    @_method('rustici.registration.resetGlobalObjectives')
+    def reset_global_objectives(self, params):
+        self._registration(params)
+        return self._success()
+
+    @_method('rustici.registration.getRegistrationList')
+    def get_registration_list(self, params):
+        courseid = params.get('courseid')
+        learnerid = params.get('learnerid')
+        after = _parse_timestamp(params.get('after'))
+        until = _parse_timestamp(params.get('until'))
+        result = []
+        for reg in self.store.registrations.values():
+            if     (courseid and reg['courseid'] != courseid) \
+                or (learnerid and reg['learnerid'] != learnerid) \
+                or (after is not None and reg['updated'] <= after) \
+                or (until is not None and reg['updated'] > until):
+                continue
+            result.append(self.registration_xml(reg))
+        return u'<registrationlist>%s</registrationlist>' % u''.join(result)
+
+    @_method('rustici.registration.getRegistrationDetail')
+    def get_registration_detail(self, params):
+        return self.registration_xml(self._registration(params))
+
+    @_method('rustici.registration.getRegistrationResult')
+    def get_registration_result(self, params):
+        reg = self._registration(params)
+        return self.report_xml(reg, params.get('resultsformat') or 'course')
+
+    def _launches(self, reg):
+        if not reg['launches']:
+            start = reg['updated']
+            reg['launches'].append({'id': '%s-launch-0' % reg['regid'],
+                                    'launch_time': start,
+                                    'exit_time': start + datetime.timedelta(minutes=5)})
+        return reg['launches']
+
+    def launch_xml(self, reg, launch, log=False):
+        events = u''
+        if log:
+            events = u''.join(
+                u'<RuntimeEvent attemptNo="1" event="ApiCall" id="%d" '
+                u'itemIdentifier=%s timestamp="%s" title="Event %d"/>'
+                % (i, quoteattr(reg['courseid']),
+                   (launch['launch_time'] + datetime.timedelta(seconds=i)).strftime('%H:%M:%S.00'),
+                   i)
+                for i in range(self.store.events))
+            events = (u'<log><RuntimeLog browser="standin" version="1">%s'
+                      u'</RuntimeLog></log>' % events)
+        return (u'<launch id=%s><completion>%s</completion><satisfaction>%s</satisfaction>'
+                u'<measure_status>1</measure_status><normalized_measure>%s</normalized_measure>'
+                u'<experienced_duration_tracked>%d</experienced_duration_tracked>'
+                u'<launch_time>%s</launch_time><exit_time>%s</exit_time>'
+                u'<update_dt>%s</update_dt>%s</launch>'
+                % (quoteattr(launch['id']), reg['complete'], reg['success'],
+                   self._normalized(reg), reg['totaltime'] * 100,
+                   _timestamp(launch['launch_time']), _timestamp(launch['exit_time']),
+                   _timestamp(launch['exit_time']), events))
+
+    @_method('rustici.registration.getLaunchHistory')
+    def get_launch_history(self, params):
+        reg = self._registration(params)
+        launches = u''.join(self.launch_xml(reg, l) for l in self._launches(reg))
+        return u'<launchhistory regid=%s>%s</launchhistory>' % (quoteattr(reg['regid']),
+                                                                launches)
+
+    @_method('rustici.registration.getLaunchInfo')
+    def get_launch_info(self, params):
+        launchid = self._require(params, 'launchid')
+        for reg in self.store.registrations.values():
+            for launch in self._launches(reg):
+                if launch['id'] == launchid:
+                    return self.launch_xml(reg, launch, log=True)
+        raise StandinError(1, 'The launch %s does not exist' % launchid)
+
+    @_method('rustici.registration.updateLearnerInfo')
+    def update_learner_info(self, params):
+        learnerid = self._require(params, 'learnerid')
+        found = False
+        for reg in self.store.registrations.values():
+            if reg['learnerid'] == learnerid:
+                found = True
+                reg.update(fname=params.get('fname'), lname=params.get('lname'))
+                if params.get('email'):
+                    reg['email'] = params['email']
+                if params.get('newid'):
+                    reg['learnerid'] = params['newid']
+        if not found:
+            raise StandinError(1, 'The learner %s does not exist' % learnerid)
+        return self._success()
+
+    @_method('rustici.registration.getPostbackInfo')
+    def get_postback_info(self, params):
+        reg = self._registration(params)
+        info = self.store.postbacks.get(reg['regid']) or {}
+        return (u'<postbackinfo regid=%s><url>%s</url><authtype>%s</authtype>'
+                u'<login>%s</login><password>%s</password></postbackinfo>'
+                % (quoteattr(reg['regid']), _text(info.get('url')),
+                   _text(info.get('authtype')), _text(info.get('login')),
+                   _text(info.get('password'))))
+
+    @_method('rustici.registration.updatePostbackInfo')
+    def update_postback_info(self, params):
+        reg = self._registration(params)
+        self.store.postbacks[reg['regid']] = {'url': params.get('url'),
+                                              'authtype': params.get('authtype'),
+                                              'login': params.get('name'),
+                                              'password': params.get('password')}
+        return self._success()
+
+    @_method('rustici.registration.deletePostbackInfo')
+    def delete_postback_info(self, params):
+        reg = self._registration(params)
+        self.store.postbacks.pop(reg['regid'], None)
+        return self._success()
+
+    # course
+
+    def _import(self, params):
+        courseid = self._require(params, 'courseid')
+        course = self.store.add_course(courseid)
+        return (u'<importresult successful="true"><title>%s</title>'
+                u'<message>Import Successful</message><parserwarnings/></importresult>'
+                % _text(course['title']))
+
+    @_method('rustici.course.importCourse')
+    def import_course(self, params):
+        return self._import(params)
+
+    @_method('rustici.course.importCourseAsync')
+    def import_course_async(self, params):
+        token = str(uuid.uuid4())
+        self.store.imports[token] = self._import(params)
+        return u'<token><id>%s</id></token>' % token
+
+    @_method('rustici.course.getAsyncImportResult')
+    def get_async_import_result(self, params):
+        token = self._require(params, 'token')
+        try:
+            result = self.store.imports[token]
+        except KeyError:
+            raise StandinError(1, 'The token %s does not exist' % token)
+        return u'<status>finished</status>%s' % result
+
+    @_method('rustici.course.updateAssets')
+    def update_assets(self, params):
+        course = self._course(params)
+        return (u'<importresult successful="true"><title>%s</title>'
+                u'<message>Import Successful</message><parserwarnings/></importresult>'
+                % _text(course['title']))
+
+    @_method('rustici.course.deleteCourse')
+    def delete_course(self, params):
+        course = self._course(params)
+        del self.store.courses[course['id']]
+        return self._success()
+
+    @_method('rustici.course.getAssets')
+    def get_assets(self, params):
+        self._course(params)
+        return self._success()
+
+    @_method('rustici.course.getCourseList')
+    def get_course_list(self, params):
+        pattern = re.compile(params['filter']) if params.get('filter') else None
+        tags = set(t for t in (params.get('tags') or '').split(',') if t)
+        result = []
+        for courseid in sorted(self.store.courses):
+            course = self.store.courses[courseid]
+            if     (pattern is not None and not pattern.search(courseid)) \
+                or not tags.issubset(course['tags']):
+                continue
+            result.append(self.course_xml(course))
+        return u'<courselist>%s</courselist>' % u''.join(result)
+
+    @_method('rustici.course.getCourseDetail')
+    def get_course_detail(self, params):
+        return self.course_xml(self._course(params))
+
+    @_method('rustici.course.getMetadata')
+    def get_metadata(self, params):
+        course = self._course(params)
+        return (u'<package><metadata><title>%s</title></metadata>'
+                u'<object id=%s title=%s/></package>'
+                % (_text(course['title']), quoteattr(course['id']),
+                   quoteattr(course['title'])))
+
+    def attributes_xml(self, course):
+        return u'<attributes>%s</attributes>' % u''.join(
+            u'<attribute name=%s value=%s/>' % (quoteattr(k), quoteattr(v))
+            for k, v in sorted(course['attributes'].items()))
+
+    @_method('rustici.course.getAttributes')
+    def get_attributes(self, params):
+        return self.attributes_xml(self._course(params))
+
+    @_method('rustici.course.updateAttributes')
+    def update_attributes(self, params):
+        course = self._course(params)
+        ignored = ('method', 'appid', 'origin', 'ts', 'applib', 'sig', 'courseid')
+        for key, value in params.items():
+            if key not in ignored:
+                course['attributes'][key] = value
+        return self.attributes_xml(course)
+
+    # tagging
+
+    @_method('rustici.tagging.getCourseTags')
+    def get_course_tags(self, params):
+        course = self._course(params)
+        return u'<tags>%s</tags>' % u''.join(u'<tag>%s</tag>' % _text(t)
+                                             for t in course['tags'])
+
+    @_method('rustici.tagging.setCourseTags')
+    def set_course_tags(self, params):
+        course = self._course(params)
+        course['tags'] = [t for t in (params.get('tags') or '').split(',') if t]
+        return self._success()
+
+    @_method('rustici.tagging.addCourseTag')
+    def add_course_tag(self, params):
+        course = self._course(params)
+        tag = self._require(params, 'tag')
+        if tag not in course['tags']:
+            course['tags'].append(tag)
+        return self._success()
+
+    @_method('rustici.tagging.removeCourseTag')
+    def remove_course_tag(self, params):
+        course = self._course(params)
+        tag = self._require(params, 'tag')
+        if tag in course['tags']:
+            course['tags'].remove(tag)
+        return self._success()
+
+    # upload
+
+    @_method('rustici.upload.getUploadToken')
+    def get_upload_token(self, unused_params):
+        token = str(uuid.uuid4())
+        self.store.uploads.add(token)
+        return (u'<token><server>http://standin.invalid</server><id>%s</id></token>'
+                % token)
+
+    @_method('rustici.upload.uploadFile')
+    def upload_file(self, params):
+        token = self._require(params, 'tokenid')
+        if token not in self.store.uploads:
+            raise StandinError(1, 'Invalid upload token')
+        return u'<location>%s.zip</location>' % token
+
+    @_method('rustici.upload.deleteFiles')
+    def delete_files(self, unused_params):
+        return u'<results><result deleted="true"/></results>'
+
+    # invitation
+
+    def _create_invitation(self, params, status):
+        course = self._course(params)
+        addresses = [a.strip() for a in (params.get('addresses') or '').split(',')
+                     if a.strip()]
+        return self.store.add_invitation(course['id'], addresses,
+                                         _is_true(params.get('public', 'true')),
+                                         status)
+
+    @_method('rustici.invitation.createInvitation')
+    def create_invitation(self, params):
+        return self._create_invitation(params, 'complete')
+
+    @_method('rustici.invitation.createInvitationAsync')
+    def create_invitation_async(self, params):
+        # Async invitations complete the next time their status is checked
+        return self._create_invitation(params, 'running')
+
+    @_method('rustici.invitation.getInvitationStatus')
+    def get_invitation_status(self, params):
+        invitation = self._invitation(params)
+        status = invitation['status']
+        invitation['status'] = 'complete'
+        return u'<status>%s</status>' % status
+
+    @_method('rustici.invitation.getInvitationInfo')
+    def get_invitation_info(self, params):
+        invitation = self._invitation(params)
+        return self.invitation_xml(invitation, _is_true(params.get('detail')))
+
+    @_method('rustici.invitation.getInvitationList')
+    def get_invitation_list(self, params):
+        pattern = re.compile(params['filter']) if params.get('filter') else None
+        course_pattern = re.compile(params['coursefilter']) if params.get('coursefilter') else None
+        result = []
+        for invitation in self.store.invitations.values():
+            if     (pattern is not None and not pattern.search(invitation['id'])) \
+                or (course_pattern is not None
+                    and not course_pattern.search(invitation['courseid'])):
+                continue
+            result.append(self.invitation_xml(invitation))
+        return u'<invitationlist>%s</invitationlist>' % u''.join(result)
+
+    @_method('rustici.invitation.changeStatus')
+    def change_status(self, params):
+        invitation = self._invitation(params)
+        invitation['enabled'] = _is_true(params.get('enable'))
+        if 'open' in params:
+            invitation['open'] = _is_true(params['open'])
+        return self._success()
+
+    # reporting
+
+    @_method('rustici.reporting.getAccountInfo')
+    def get_account_info(self, unused_params):
+        created = self.store.created
+        month_start = created.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        return (u'<account><email>standin@example.com</email><firstname>Stand</firstname>'
+                u'<lastname>In</lastname><company>Standin</company>'
+                u'<accounttype>enterprise</accounttype><reglimit>0</reglimit>'
+                u'<strictlimit>false</strictlimit><createdate>%s</createdate>'
+                u'<usage><monthstart>%s</monthstart><regcount>%d</regcount>'
+                u'<totalregistrations>%d</totalregistrations>'
+                u'<totalcourses>%d</totalcourses></usage></account>'
+                % (_timestamp(created), _timestamp(month_start),
+                   len(self.store.registrations), len(self.store.registrations),
+                   len(self.store.courses)))
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def make_standin_server(app, host='127.0.0.1', port=0):
+    """
+    Return a threaded WSGI server for ``app``; use port 0 to pick a free port.
+    """
+    return make_server(host, port, app,
+                       server_class=ThreadingWSGIServer,
+                       handler_class=QuietWSGIRequestHandler)
+
+
+def serve_in_thread(app, host='127.0.0.1', port=0):
+    """
+    Start serving ``app`` in a daemon thread, returning the server. The
+    service URL is ``'http://%s:%s/api' % server.server_address``.
+    """
+    server = make_standin_server(app, host, port)
+    thread = threading.Thread(target=server.serve_forever,
+                              name='scorm-cloud-standin')
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=u'Run a local SCORM Cloud stand-in server')
+    parser.add_argument(u'--host', dest=u'host', default=u'127.0.0.1',
+                        help=u'The interface to listen on')
+    parser.add_argument(u'--port', dest=u'port', type=int, default=8080,
+                        help=u'The port to listen on')
+    parser.add_argument(u'--appid', dest=u'appid', default=u'appid',
+                        help=u'The application id clients must use')
+    parser.add_argument(u'--secret', dest=u'secret', default=u'secret',
+                        help=u'The secret key clients must sign with')
+    parser.add_argument(u'--latency', dest=u'latency', type=float, default=0.0,
+                        help=u'Base latency added to each request, in seconds')
+    parser.add_argument(u'--jitter', dest=u'jitter', type=float, default=0.0,
+                        help=u'Maximum random extra latency, in seconds')
+    parser.add_argument(u'--error-rate', dest=u'error_rate', type=float, default=0.0,
+                        help=u'Fraction of requests failing with a SCORM Cloud error')
+    parser.add_argument(u'--http-error-rate', dest=u'http_error_rate', type=float,
+                        default=0.0,
+                        help=u'Fraction of requests failing with HTTP 500')
+    parser.add_argument(u'--throttle', dest=u'throttle', type=float, default=None,
+                        help=u'Requests per second allowed before HTTP 429')
+    parser.add_argument(u'--courses', dest=u'courses', type=int, default=10,
+                        help=u'The number of courses to create')
+    parser.add_argument(u'--registrations', dest=u'registrations', type=int,
+                        default=1000, help=u'The number of registrations to create')
+    parser.add_argument(u'--invitations', dest=u'invitations', type=int, default=0,
+                        help=u'The number of invitations to create')
+    parser.add_argument(u'--events', dest=u'events', type=int, default=10,
+                        help=u'The number of runtime events per launch log')
+    parser.add_argument(u'--seed', dest=u'seed', type=int, default=None,
+                        help=u'The random seed')
+    arguments = parser.parse_args(args)
+
+    store = StandinStore(arguments.appid, arguments.courses, arguments.registrations,
+                         arguments.invitations, arguments.events, seed=arguments.seed)
+    app = StandinApplication(arguments.appid, arguments.secret, store,
+                             latency=arguments.latency, jitter=arguments.jitter,
+                             error_rate=arguments.error_rate,
+                             http_error_rate=arguments.http_error_rate,
+                             throttle=arguments.throttle, seed=arguments.seed)
+    server = make_standin_server(app, arguments.host, arguments.port)
+    print('Serving SCORM Cloud stand-in on http://%s:%s/api' % server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        server.server_close()